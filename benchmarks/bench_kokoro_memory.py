@@ -0,0 +1,112 @@
+"""
+Kokoro 内存基准：每语言各自加载 KModel（旧方式）vs 同仓库共享 KModel + 共享音色缓存
+
+用法（需安装 kokoro，首次运行会下载权重）：
+    python benchmarks/bench_kokoro_memory.py
+    python benchmarks/bench_kokoro_memory.py --voices zf_001 zm_010 af_maple --repo hexgrad/Kokoro-82M-v1.1-zh
+
+每种方式在独立子进程中运行：加载各音色所需的 pipeline 与音色、各合成一句，
+报告进程 RSS 增量、模型参数与音色张量占用。--repo 指定时所有语言使用同一权重仓库
+（对应设置 KOKORO_REPO_ID / KOKORO_REPO_ID_ZH 为同一值）。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def run_separate(voices: list[str]) -> dict:
+    """旧方式：每个语言一个 KPipeline，各自构建 KModel，音色缓存在各 pipeline 上"""
+    from kokoro import KPipeline
+
+    from bookroom_audio.api.routers.tts.engines import _kokoro_hf_env, _kokoro_lang_from_voice, _kokoro_repo_id
+
+    pipelines = {}
+    with _kokoro_hf_env():
+        for voice in voices:
+            lang = _kokoro_lang_from_voice(voice)
+            if lang not in pipelines:
+                pipelines[lang] = KPipeline(lang_code=lang, repo_id=_kokoro_repo_id(lang))
+            for _ in pipelines[lang]("测试" if lang == "z" else "test", voice=voice):
+                pass
+    models = {id(p.model): p.model for p in pipelines.values()}
+    return {
+        "models": len(models),
+        "model_mb": sum(sum(t.nbytes for t in m.parameters()) for m in models.values()) / MB,
+        "voice_mb": sum(t.nbytes for p in pipelines.values() for t in p.voices.values()) / MB,
+    }
+
+
+def run_shared(voices: list[str]) -> dict:
+    """新方式：engines 中按 repo_id 共享 KModel，音色张量跨 pipeline 缓存"""
+    from bookroom_audio.api.routers.tts import engines
+
+    for voice in voices:
+        engines.generate_audio_kokoro("测试" if voice.startswith("z") else "test", voice=voice)
+    memory = engines._kokoro_memory()
+    return {
+        "models": len(memory["models_mb"]),
+        "model_mb": sum(memory["models_mb"].values()),
+        "voice_mb": memory["voices_mb"],
+    }
+
+
+def child(mode: str, voices: list[str]) -> None:
+    import torch  # noqa: F401  先导入 torch，基线不计入框架本身
+
+    before = rss_bytes()
+    result = (run_separate if mode == "separate" else run_shared)(voices)
+    result["rss_mb"] = (rss_bytes() - before) / MB
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voices", nargs="+", default=["zf_001", "zm_010", "af_heart", "bf_emma", "ef_dora"])
+    parser.add_argument("--repo", default=None, help="所有语言使用同一权重仓库")
+    parser.add_argument("--child", choices=["separate", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.voices)
+        return
+
+    env = dict(os.environ)
+    if args.repo:
+        env["KOKORO_REPO_ID"] = env["KOKORO_REPO_ID_ZH"] = args.repo
+
+    print(f"voices: {' '.join(args.voices)}")
+    print(f"{'mode':>10} {'models':>7} {'model_mb':>9} {'voice_mb':>9} {'rss_mb':>8}")
+    for mode in ("separate", "shared"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--voices", *args.voices],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        r = json.loads(out)
+        print(f"{mode:>10} {r['models']:>7} {r['model_mb']:>9.1f} {r['voice_mb']:>9.2f} {r['rss_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+TTS 文本前端基准（100k 字输入）：原逐字 ChatTTS 预处理 vs translate 表，按引擎规范化的冷 / 热缓存
+
+用法：
+    python benchmarks/bench_text_frontend.py
+    python benchmarks/bench_text_frontend.py --chars 200000 --repeat 5 --unique 0.3
+
+合成一段中文“书稿”：句子从句库随机抽取（--unique 为不重复句子占比，其余为重复出现的句子，
+模拟章节标题、对白套话），夹杂全角字符、日期、时间、百分数与数字。
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bookroom_audio.api.routers.tts import text_frontend  # noqa: E402
+from bookroom_audio.api.routers.tts.text_frontend import (  # noqa: E402
+    FULLWIDTH_PUNCTUATION_MAP,
+    normalize_numbers_zh,
+    normalize_text,
+    preprocess_text_for_chattts,
+    split_sentences,
+)
+
+_OLD_ALLOWED = re.compile(r'[^\u4e00-\u9fffA-Za-z0-9，。、,.!?;:"\'()\[\]<>~+\-*/%=&#@ ]')
+
+
+def loop_preprocess_for_chattts(text: str) -> str:
+    """旧实现：逐字查表 + 两遍正则"""
+    result = []
+    for ch in text:
+        mapped = FULLWIDTH_PUNCTUATION_MAP.get(ch)
+        if mapped is not None:
+            result.append(mapped)
+            continue
+        code = ord(ch)
+        if 0xFF01 <= code <= 0xFF5E:
+            result.append(chr(code - 0xFEE0))
+        elif ch == "\u3000":
+            result.append(" ")
+        else:
+            result.append(ch)
+    text = _OLD_ALLOWED.sub("", "".join(result))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_book(chars: int, unique: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    hanzi = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研质"
+    templates = [
+        "{w}年{m}月{d}日，{s}。", "第{n}章\u3000{s}", "“{s}！”他说。", "会议在{h}:{mm}开始，{s}。",
+        "增长了{p}%，{s}？", "共{big}人参加，{s}；", "（{s}）", "{s}……",
+    ]
+
+    def sentence() -> str:
+        body = "".join(rng.choice(hanzi) for _ in range(rng.randint(8, 30)))
+        return rng.choice(templates).format(
+            s=body, w=rng.randint(1900, 2030), m=rng.randint(1, 12), d=rng.randint(1, 28),
+            n=rng.randint(1, 120), h=rng.randint(0, 23), mm=f"{rng.randint(0, 59):02d}",
+            p=f"{rng.uniform(0, 100):.1f}", big=f"{rng.randint(1000, 999999):,}",
+        )
+
+    repeated = [sentence() for _ in range(50)]
+    parts, size = [], 0
+    while size < chars:
+        s = sentence() if rng.random() < unique else rng.choice(repeated)
+        parts.append(s)
+        size += len(s)
+    return "\n".join(parts)[:chars]
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def reset_cache(items: int) -> None:
+    text_frontend._frontend_config = lambda: (True, items)
+    text_frontend._piece_normalizer = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--unique", type=float, default=0.5, help="不重复句子占比")
+    args = parser.parse_args()
+
+    book = make_book(args.chars, args.unique)
+    assert preprocess_text_for_chattts(book) == loop_preprocess_for_chattts(book)
+    print(f"input: {len(book)} chars, {len(split_sentences(book))} sentences")
+
+    def report(name: str, fn) -> None:
+        print(f"{name:>34}: {best_of(args.repeat, fn) * 1000:8.2f} ms")
+
+    report("chattts preprocess (loop)", lambda: loop_preprocess_for_chattts(book))
+    report("chattts preprocess (table)", lambda: preprocess_text_for_chattts(book))
+    report("split_sentences", lambda: split_sentences(book))
+    report("numbers zh (whole text)", lambda: normalize_numbers_zh(book))
+
+    for engine in ("chattts", "kokoro", "edge-tts"):
+        def uncached(engine=engine):
+            reset_cache(0)
+            normalize_text(book, engine)
+
+        def cold(engine=engine):
+            reset_cache(4096)
+            normalize_text(book, engine)
+
+        report(f"normalize {engine} (no cache)", uncached)
+        report(f"normalize {engine} (cold cache)", cold)
+        reset_cache(4096)
+        normalize_text(book, engine)
+        report(f"normalize {engine} (warm cache)", lambda engine=engine: normalize_text(book, engine))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+时间戳基准：原逐字符循环 vs timestamps 模块向量化实现，逐词 JSON vs 二进制时间线体积
+
+用法：
+    python benchmarks/bench_timestamps.py
+    python benchmarks/bench_timestamps.py --words 50000 --repeat 5
+
+以随机“音素串 + pred_dur”模拟章节级 Kokoro 输出（--words 个词），分别计时 Kokoro 词级时间戳
+与 edge-tts 句内均分，并比较 words JSON 与二进制时间线（base64 前后）的字节数。
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bookroom_audio.api.routers.tts.timestamps import Timeline, even_split_timeline, kokoro_timeline  # noqa: E402
+
+
+def loop_kokoro(phonemes: str, pred_dur) -> list:
+    """旧实现：半帧游标逐字符推进"""
+    pd = np.asarray(pred_dur, dtype=np.float64)
+    words, cur = [], None
+    left = right = 2.0 * max(0.0, pd[0] - 3.0)
+    i = 1
+    for ch in phonemes:
+        if i >= len(pd) - 1:
+            break
+        if ch == " ":
+            if cur is not None:
+                cur["end_ms"] = round((left / 80.0) * 1000.0, 2)
+                words.append(cur)
+                cur = None
+            left = right + pd[i]
+            right = left + pd[i]
+            i += 1
+            continue
+        if cur is None:
+            cur = {"text": ch, "start_ms": round((right / 80.0) * 1000.0, 2), "end_ms": 0.0}
+        else:
+            cur["text"] += ch
+        left = right + 2.0 * pd[i]
+        right = left
+        cur["end_ms"] = round((left / 80.0) * 1000.0, 2)
+        i += 1
+    if cur is not None:
+        words.append(cur)
+    return words
+
+
+def loop_even_split(sentence: str, start_ms: float, duration_ms: float) -> list:
+    """旧实现：逐字 re.match 过滤后逐个均分"""
+    units = [ch for ch in sentence if ch.strip() and not re.match(r"[，。！？、；：（）\s]", ch)]
+    seg = duration_ms / len(units)
+    return [
+        {"text": u, "start_ms": round(start_ms + i * seg, 1), "end_ms": round(start_ms + (i + 1) * seg, 1)}
+        for i, u in enumerate(units)
+    ]
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    syllables = ["ni3", "hao3", "ʂɻ4", "tɕie4", "ɕiɑŋ3", "a1"]
+    phonemes = " ".join(syllables[k] for k in rng.integers(0, len(syllables), args.words))
+    pred_dur = rng.integers(1, 12, len(phonemes) + 2)
+    sentence = "".join(rng.choice(list("你好世界今天天气很好，。")) for _ in range(args.words))
+
+    rows = [
+        ("kokoro", loop_kokoro, (phonemes, pred_dur),
+         lambda p, d: kokoro_timeline(p, d).to_words(2), lambda p, d: kokoro_timeline(p, d)),
+        ("even-split", loop_even_split, (sentence, 0.0, args.words * 200.0),
+         lambda s, a, b: even_split_timeline(s, a, b).to_words(1), even_split_timeline),
+    ]
+    print(f"{'case':>10} {'loop_ms':>9} {'words_ms':>9} {'timeline_ms':>12}")
+    for name, loop, fn_args, as_words, as_timeline in rows:
+        t_loop = best_of(args.repeat, loop, *fn_args)
+        t_words = best_of(args.repeat, as_words, *fn_args)
+        t_timeline = best_of(args.repeat, as_timeline, *fn_args)
+        print(f"{name:>10} {t_loop * 1000:>9.1f} {t_words * 1000:>9.1f} {t_timeline * 1000:>12.1f}")
+
+    timeline = kokoro_timeline(phonemes, pred_dur)
+    as_json = json.dumps(timeline.to_words(2), ensure_ascii=False).encode()
+    binary = timeline.to_bytes()
+    print(f"\n{len(timeline)} words: json {len(as_json) / 1024:.1f} KiB, "
+          f"binary {len(binary) / 1024:.1f} KiB, binary+base64 {len(base64.b64encode(binary)) / 1024:.1f} KiB")
+    t_encode = best_of(args.repeat, timeline.to_bytes)
+    t_decode = best_of(args.repeat, Timeline.from_bytes, binary)
+    t_json = best_of(args.repeat, json.loads, as_json)
+    print(f"binary encode {t_encode * 1000:.1f} ms, decode {t_decode * 1000:.1f} ms; json parse {t_json * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
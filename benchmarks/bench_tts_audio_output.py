@@ -0,0 +1,77 @@
+"""
+TTS 音频输出基准：原 pydub 路径 vs audio_output（NumPy 多相重采样 + 预分配 WAV）
+
+用法：
+    python benchmarks/bench_tts_audio_output.py
+    python benchmarks/bench_tts_audio_output.py --durations 5 30 --rates 16000 24000 --repeat 10
+
+输入为 24kHz float32 正弦扫频（与 Kokoro / CosyVoice / ChatTTS 原生输出一致），
+两条路径都以「引擎样本 → 目标采样率 WAV bytes → 路由响应体」计时：
+- pydub：int16 → AudioSegment → set_frame_rate → export 到 BytesIO → getvalue → 路由再包一层 BytesIO
+- audio_output：to_wav（采样率相同跳过重采样）
+"""
+
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bookroom_audio.api.routers.tts.audio_output import to_wav  # noqa: E402
+
+NATIVE_SR = 24000
+
+
+def pydub_path(samples: np.ndarray, target_sr: int) -> bytes:
+    from pydub import AudioSegment
+
+    wav_int16 = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    audio = AudioSegment(data=wav_int16.tobytes(), sample_width=2, frame_rate=NATIVE_SR, channels=1)
+    audio = audio.set_frame_rate(target_sr)
+    out_buf = io.BytesIO()
+    audio.export(out_buf, format="wav")
+    return io.BytesIO(out_buf.getvalue()).read()
+
+
+def new_path(samples: np.ndarray, target_sr: int) -> bytes:
+    return to_wav(samples, NATIVE_SR, target_sr)
+
+
+def sweep(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * NATIVE_SR), dtype=np.float64) / NATIVE_SR
+    freq = 100 + (11000 - 100) * t / max(seconds, 1e-9)
+    return (0.5 * np.sin(2 * np.pi * np.cumsum(freq) / NATIVE_SR)).astype(np.float32)
+
+
+def best_ms(fn, samples: np.ndarray, target_sr: int, repeat: int) -> float:
+    fn(samples, target_sr)  # 预热（滤波器缓存、pydub 导入）
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(samples, target_sr)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 30, 60], help="音频时长（秒）")
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 22050, 24000, 44100], help="目标采样率")
+    parser.add_argument("--repeat", type=int, default=5, help="每组重复次数（取最小值）")
+    args = parser.parse_args()
+
+    print(f"{'seconds':>8} {'target_sr':>10} {'pydub_ms':>10} {'numpy_ms':>10} {'speedup':>8}")
+    for seconds in args.durations:
+        samples = sweep(seconds)
+        for rate in args.rates:
+            old = best_ms(pydub_path, samples, rate, args.repeat)
+            new = best_ms(new_path, samples, rate, args.repeat)
+            print(f"{seconds:>8g} {rate:>10} {old:>10.1f} {new:>10.1f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,12 @@ BookRoom Audio API - 提供完整的语音合成(TTS)、语音识别(ASR)、视
 - `POST /v1/video/analyze` - 视频分析（自定义扩展）
 - `POST /v1/image/analyze` - 图片分析（自定义扩展）
 
+📦 **批量任务**
+- `POST /v1/batches` - 提交批量识别 / 合成任务
+- `GET /v1/batches/{id}` - 查询任务状态
+- `GET /v1/batches/{id}/results` - 获取已完成项的结果（NDJSON）
+- `POST /v1/batches/{id}/cancel` - 取消任务
+
 🏠 **服务器管理**
 - `GET /health` - 健康检查
 
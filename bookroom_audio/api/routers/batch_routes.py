@@ -0,0 +1,248 @@
+"""
+Batch routes - asynchronous bulk transcription / speech synthesis jobs.
+
+Submit a manifest of items for one endpoint, get a job id back, then poll the job and
+fetch per-item results as they finish. Jobs are persisted in a local SQLite store and
+resume after a restart.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+import os
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.services.batch_runner import get_batch_runner
+from bookroom_audio.utils.utils_api import (
+    get_api_key_dependency,
+    logger,
+)
+
+TRANSCRIPTIONS_ENDPOINT = "/v1/audio/transcriptions"
+TTS_ENDPOINT = "/v1/tts/generate"
+BATCH_ENDPOINTS = (TRANSCRIPTIONS_ENDPOINT, TTS_ENDPOINT)
+
+MAX_BATCH_ITEMS = 50000
+
+
+class BatchItem(BaseModel):
+    custom_id: Optional[str] = Field(None, description="Caller-defined id echoed back in the results")
+    body: dict = Field(..., description="Request body for the endpoint")
+
+
+class BatchCreateRequest(BaseModel):
+    endpoint: str = Field(..., description=f"Target endpoint: {', '.join(BATCH_ENDPOINTS)}")
+    items: list[BatchItem] = Field(..., description="Items to process")
+    metadata: Optional[dict] = Field(None, description="Free-form metadata stored with the job")
+
+
+def _transcription_item(args: Any, index: int, body: dict, inputs_dir: str) -> dict:
+    """
+    Validates a transcription item. The audio ('audio_base64') is written under the job's inputs
+    directory so the item can be re-run after a restart. Server-side paths are not accepted:
+    'file' in the stored body always points into the inputs directory.
+    """
+    body = dict(body)
+    if "file" in body:
+        raise HTTPException(status_code=400, detail=f"Item {index}: 'file' is not supported, use 'audio_base64'")
+    audio_b64 = body.pop("audio_base64", None)
+    if not isinstance(audio_b64, str) or not audio_b64:
+        raise HTTPException(status_code=400, detail=f"Item {index}: 'audio_base64' is required")
+    try:
+        data = base64.b64decode(audio_b64, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail=f"Item {index}: invalid audio_base64")
+    os.makedirs(inputs_dir, exist_ok=True)
+    path = os.path.join(inputs_dir, f"{index}.audio")
+    with open(path, "wb") as f:
+        f.write(data)
+    body["file"] = path
+
+    task = body.get("task", "transcribe")
+    if task not in ("transcribe", "translate", "both"):
+        raise HTTPException(status_code=400, detail=f"Item {index}: invalid task '{task}'")
+    engine = body.get("engine") or args.model.asr_engine or "whisper"
+    pack_key = "|".join(str(v) for v in (engine, body.get("model"), body.get("language"), task))
+    return {"body": body, "pack_key": pack_key}
+
+
+def _tts_item(index: int, body: dict) -> dict:
+    try:
+        request = TTSRequest(**body)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Item {index}: {e.errors()}")
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail=f"Item {index}: no text provided")
+    pack_key = "|".join(str(v) for v in (request.engine, request.voice or request.voice_id, request.sample_rate))
+    return {"body": body, "pack_key": pack_key}
+
+
+def create_batch_routes(args: Any, api_key: Optional[str] = None):
+    router = APIRouter(prefix="/v1", tags=["batch"])
+    optional_api_key = get_api_key_dependency(api_key)
+
+    async def run_transcription(item: dict) -> dict:
+        from bookroom_audio.api.routers.transcribe_routes import cached_process_audio_task
+
+        body = item["body"]
+        result, duration = await cached_process_audio_task(
+            args,
+            body["file"],
+            None,
+            body.get("model"),
+            body.get("language"),
+            task=body.get("task", "transcribe"),
+            engine=body.get("engine"),
+        )
+        return {**result, "duration": duration}
+
+    async def run_tts(item: dict) -> dict:
+        from bookroom_audio.api.routers.tts_routes import cached_synthesize_tts
+
+        request = TTSRequest(**item["body"])
+        audio_data, engine, words, _ = await cached_synthesize_tts(args, request)
+        outputs_dir = os.path.join(runner.store.job_dir(item["job_id"]), "outputs")
+
+        def write() -> None:
+            os.makedirs(outputs_dir, exist_ok=True)
+            with open(os.path.join(outputs_dir, f"{item['index']}.wav"), "wb") as f:
+                f.write(audio_data)
+
+        await asyncio.to_thread(write)
+        result = {
+            "audio_url": f"/v1/batches/{item['job_id']}/items/{item['index']}/audio",
+            "bytes": len(audio_data),
+            "engine": engine,
+            "sample_rate": request.sample_rate,
+        }
+        if words is not None:
+            result["words"] = words
+        return result
+
+    runner = get_batch_runner(args, {
+        TRANSCRIPTIONS_ENDPOINT: run_transcription,
+        TTS_ENDPOINT: run_tts,
+    })
+
+    def get_job_or_404(job_id: str) -> dict:
+        job = runner.store.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Batch '{job_id}' not found")
+        return job
+
+    @router.post(
+        "/batches",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="create_batch",
+        summary="Create batch job",
+        description=f"""
+提交批量任务：一次提交多项 {TRANSCRIPTIONS_ENDPOINT} 或 {TTS_ENDPOINT} 请求，立即返回任务 id，
+后台工作协程（BATCH_WORKERS）按同模型分组连续处理。任务保存在本地 SQLite，服务重启后继续执行。
+
+- 识别项 body：audio_base64（音频 base64），可选 model / language / task / engine；输入文件在任务结束后删除
+- 合成项 body：与 /v1/tts/generate 请求体相同；生成的 WAV 通过结果中的 audio_url 下载
+        """,
+    )
+    async def create_batch(request: BatchCreateRequest):
+        if request.endpoint not in BATCH_ENDPOINTS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported endpoint '{request.endpoint}'. Supported: {', '.join(BATCH_ENDPOINTS)}",
+            )
+        if not request.items:
+            raise HTTPException(status_code=400, detail="No items provided")
+        if len(request.items) > MAX_BATCH_ITEMS:
+            raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_BATCH_ITEMS})")
+
+        job_id = runner.store.new_job_id()
+        inputs_dir = runner.store.inputs_dir(job_id)
+
+        def prepare() -> list[dict]:
+            items = []
+            for index, item in enumerate(request.items):
+                if request.endpoint == TRANSCRIPTIONS_ENDPOINT:
+                    prepared = _transcription_item(args, index, item.body, inputs_dir)
+                else:
+                    prepared = _tts_item(index, item.body)
+                items.append({"custom_id": item.custom_id, **prepared})
+            return items
+
+        try:
+            items = await asyncio.to_thread(prepare)
+            job = await asyncio.to_thread(
+                runner.store.create_job, request.endpoint, items, request.metadata, job_id
+            )
+        except BaseException:
+            # 校验失败等：删除已写入的输入文件
+            await asyncio.to_thread(runner.store.remove_inputs, job_id)
+            raise
+        logger.info(f"[batch] Created {job['id']} with {len(items)} items for {request.endpoint}")
+        await runner.start()
+        runner.notify()
+        return job
+
+    @router.get(
+        "/batches",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="list_batches",
+        summary="List batch jobs",
+    )
+    async def list_batches(limit: int = Query(20, ge=1, le=100)):
+        jobs = await asyncio.to_thread(runner.store.list_jobs, limit)
+        return {"object": "list", "data": jobs}
+
+    @router.get(
+        "/batches/{job_id}",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="get_batch",
+        summary="Get batch job status",
+    )
+    async def get_batch(job_id: str):
+        return await asyncio.to_thread(get_job_or_404, job_id)
+
+    @router.post(
+        "/batches/{job_id}/cancel",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="cancel_batch",
+        summary="Cancel batch job",
+        description="未开始的项标记为 cancelled；正在处理的项照常完成。",
+    )
+    async def cancel_batch(job_id: str):
+        await asyncio.to_thread(get_job_or_404, job_id)
+        return await asyncio.to_thread(runner.store.cancel_job, job_id)
+
+    @router.get(
+        "/batches/{job_id}/results",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="get_batch_results",
+        summary="Get batch item results",
+        description="NDJSON，每行一项：{index, custom_id, status, response, error}。只含已结束的项，可在任务进行中反复轮询。",
+    )
+    async def get_batch_results(job_id: str):
+        await asyncio.to_thread(get_job_or_404, job_id)
+        results = await asyncio.to_thread(runner.store.item_results, job_id)
+        return StreamingResponse(
+            iter(json.dumps(r, ensure_ascii=False) + "\n" for r in results),
+            media_type="application/x-ndjson",
+        )
+
+    @router.get(
+        "/batches/{job_id}/items/{index}/audio",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="get_batch_item_audio",
+        summary="Download synthesized audio of a batch item",
+    )
+    async def get_batch_item_audio(job_id: str, index: int):
+        await asyncio.to_thread(get_job_or_404, job_id)
+        path = os.path.join(runner.store.job_dir(job_id), "outputs", f"{index}.wav")
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail="Audio not found")
+        return FileResponse(path, media_type="audio/wav", filename=f"{job_id}_{index}.wav")
+
+    return router
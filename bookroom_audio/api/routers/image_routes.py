@@ -22,6 +22,7 @@ import os
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 
+from bookroom_audio.utils.audio_input import UploadSpoolingRoute
 from bookroom_audio.utils.utils_api import (
     get_api_key_dependency,
     logger,
@@ -66,6 +67,7 @@ def create_image_routes(args: Any, api_key: Optional[str] = None):
     router = APIRouter(
         prefix="/v1/image",
         tags=["image"],
+        route_class=UploadSpoolingRoute,
         responses={
             400: {"description": "Invalid request parameters"},
             401: {"description": "Unauthorized - Invalid API key"},
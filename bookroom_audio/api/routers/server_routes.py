@@ -7,6 +7,9 @@ from typing import Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 
+from bookroom_audio.services.admission import admission_stats
+from bookroom_audio.services.result_cache import cache_stats
+from bookroom_audio.services.vad_prefilter import vad_stats
 from bookroom_audio.utils.utils_api import get_api_key_dependency
 
 
@@ -27,4 +30,15 @@ def create_server_routes(args: Any, api_key: Optional[str] = None):
         """Get current system status"""
         return ServerResponse(status="healthy", message="System is running normally.")
 
+    @router.get(
+        "/v1/metrics",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="get_metrics",
+        summary="Runtime metrics",
+        description="Result cache hit/miss counters, VAD prefilter skipped audio, ASR queue depth and wait times.",
+    )
+    async def get_metrics():
+        """Get runtime metrics"""
+        return {"cache": cache_stats(), "vad": vad_stats(), "admission": admission_stats()}
+
     return router
\ No newline at end of file
@@ -3,12 +3,31 @@ This module contains all transcribe related routes.
 """
 
 import asyncio
-import tempfile
+import json
 import os
-from typing import Any, Optional
-from fastapi import APIRouter, Depends, Form, HTTPException, File, UploadFile
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Form, HTTPException, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from bookroom_audio.utils.audio_input import (
+    ASR_SAMPLE_RATE,
+    UploadSpoolingRoute,
+    decode_audio_source,
+    decode_upload,
+)
+from bookroom_audio.services.admission import QueueFullError, Ticket, get_admission_controller
+from bookroom_audio.services.result_cache import content_key, get_result_cache, hash_file
+from bookroom_audio.services.vad_prefilter import prefilter_audio, restore_result
+from bookroom_audio.utils.audio_ingest import (
+    AudioWindower,
+    ByteStreamPipe,
+    MultipartAudioExtractor,
+    decode_incremental,
+)
 from bookroom_audio.utils.utils_api import (
     get_api_key_dependency,
     logger,
@@ -26,6 +45,12 @@ SUPPORTED_ENGINES = {
     "qwen-asr",
 }
 
+# stream=true 时的输出格式
+STREAM_MEDIA_TYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
 
 def get_available_engines() -> dict:
     """获取可用的引擎列表及其状态"""
@@ -54,122 +79,403 @@ def get_available_engines() -> dict:
     return engines
 
 
-def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
-    router = APIRouter(prefix="/v1/audio", tags=["transcribe"])
-    
+async def process_audio_task(
+    args: Any, file: Any, model: Optional[str], language: Optional[str], task: str, engine: Optional[str]
+):
     """
-    Creates and registers the transcription and translation routes.
+    Internal helper to process audio files for transcription or translation.
     """
-    optional_api_key = get_api_key_dependency(api_key)
+    try:
+        selected_engine = engine or args.model.asr_engine or "whisper"
 
-    async def _process_audio_task(
-        file: Any, model: Optional[str], language: Optional[str], task: str, engine: Optional[str]
-    ):
-        """
-        Internal helper to process audio files for transcription or translation.
-        """
-        try:
-            selected_engine = engine or args.model.asr_engine or "whisper"
-            
-            if selected_engine not in SUPPORTED_ENGINES:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid engine '{selected_engine}'. Supported engines: {', '.join(SUPPORTED_ENGINES)}"
-                )
+        if selected_engine not in SUPPORTED_ENGINES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid engine '{selected_engine}'. Supported engines: {', '.join(SUPPORTED_ENGINES)}"
+            )
 
-            if selected_engine == "qwen-asr":
-                # 检查 Qwen3-ASR 是否可用
-                try:
-                    from bookroom_audio.models.qwen_asr import is_qwen_asr_available
-                    if not is_qwen_asr_available():
-                        raise HTTPException(
-                            status_code=503,
-                            detail="Qwen3-ASR is not available. Please install qwen-asr package: pip install qwen-asr"
-                        )
-                except ImportError:
+        if selected_engine == "qwen-asr":
+            # 检查 Qwen3-ASR 是否可用
+            try:
+                from bookroom_audio.models.qwen_asr import is_qwen_asr_available
+                if not is_qwen_asr_available():
                     raise HTTPException(
                         status_code=503,
                         detail="Qwen3-ASR is not available. Please install qwen-asr package: pip install qwen-asr"
                     )
-                
-                from bookroom_audio.models.qwen_asr import load_model_task as qwen_load_model
-                
-                # 模型名称映射
-                model_mapping = {
-                    "small": "Qwen/Qwen3-ASR-1.7B",
-                    "medium": "Qwen/Qwen3-ASR-1.7B",
-                    "large": "Qwen/Qwen3-ASR-1.7B",
-                }
-                
-                # 获取实际的模型名称
-                raw_model = model or args.model.asr_model or "medium"
-                final_model = model_mapping.get(raw_model, raw_model)
-                
-                params = dict(
-                    audio=file,
-                    model_size_or_path=final_model,
-                    language=language or args.model.asr_language,
-                    task=task,
+            except ImportError:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Qwen3-ASR is not available. Please install qwen-asr package: pip install qwen-asr"
                 )
-                results = await qwen_load_model(args, params)
-                return _format_qwen_result(results)
-            else:
-                from bookroom_audio.models.whisper import ModelQueryResponse, load_model_task as whisper_load_model
-                
-                final_model = model or args.model.model
-
-                if not os.path.exists(final_model) and final_model not in SUPPORTED_MODELS:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Invalid model '{final_model}'. Supported models: {', '.join(sorted(SUPPORTED_MODELS))}"
-                    )
 
-                logger.info(f"Attempting to load model: {final_model}")
+            from bookroom_audio.models.qwen_asr import load_model_task as qwen_load_model
 
-                params = dict(
-                    audio=file,
-                    model_size_or_path=final_model,
-                    language=language or args.model.language,
-                    task=task,
-                )
-                results = await whisper_load_model(args, params)
-                return _format_whisper_result(results)
+            # 模型名称映射
+            model_mapping = {
+                "small": "Qwen/Qwen3-ASR-1.7B",
+                "medium": "Qwen/Qwen3-ASR-1.7B",
+                "large": "Qwen/Qwen3-ASR-1.7B",
+            }
 
-        except asyncio.CancelledError:
-            logger.warning(f"Request cancelled during {task}")
-            raise HTTPException(status_code=499, detail="Request cancelled")
+            # 获取实际的模型名称
+            raw_model = model or args.model.asr_model or "medium"
+            final_model = model_mapping.get(raw_model, raw_model)
 
-        except HTTPException:
-            raise
-        except Exception as e:
-            logger.error(f"Error during {task}: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail=str(e))
+            file, timeline = await apply_vad_prefilter(args, file)
+            if timeline is not None and not len(file):
+                return empty_result(task)
+
+            # qwen-asr 接受 (waveform, sample_rate) 元组输入
+            params = dict(
+                audio=(file, ASR_SAMPLE_RATE),
+                model_size_or_path=final_model,
+                language=language or args.model.asr_language,
+                task=task,
+            )
+            results = await qwen_load_model(args, params)
+            return restore_result(format_qwen_result(results), timeline)
+        else:
+            from bookroom_audio.models.whisper import ModelQueryResponse, load_model_task as whisper_load_model
+
+            final_model = resolve_whisper_model(args, model)
+
+            logger.info(f"Attempting to load model: {final_model}")
+
+            file, timeline = await apply_vad_prefilter(args, file)
+            if timeline is not None and not len(file):
+                return empty_result(task)
+
+            params = dict(
+                audio=file,
+                model_size_or_path=final_model,
+                language=language or args.model.language,
+                task=task,
+            )
+            if task == "both":
+                # 转写 + 英文翻译共享同一次音频解码与 encoder
+                from bookroom_audio.models.whisper_dual import load_model_task_both
+
+                transcribed, translated, detected = await load_model_task_both(args, params)
+                return restore_result({
+                    **format_whisper_result(transcribed),
+                    'language': detected,
+                    'translation': format_whisper_result(translated),
+                }, timeline)
+            results = await whisper_load_model(args, params)
+            return restore_result(format_whisper_result(results), timeline)
+
+    except asyncio.CancelledError:
+        logger.warning(f"Request cancelled during {task}")
+        raise HTTPException(status_code=499, detail="Request cancelled")
 
-    def _format_whisper_result(results):
-        segments = []
-        for segment in results:
-            segments.append({
-                'text': segment.text,
-                'start': segment.start,
-                'end': segment.end,
-                'confidence': segment.probability if hasattr(segment, 'probability') else 1.0,
-            })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during {task}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def apply_vad_prefilter(args: Any, audio: Any):
+    """
+    Drop non-speech before inference when ASR_VAD_FILTER is enabled.
+
+    Returns:
+        (speech-only audio, SpeechTimeline) or (audio, None) when disabled / not a waveform
+    """
+    method = args.model.asr_vad_filter
+    if method == "off" or not isinstance(audio, np.ndarray):
+        return audio, None
+    return await asyncio.to_thread(prefilter_audio, audio, method)
+
+
+def empty_result(task: str) -> dict:
+    """Result for audio in which the VAD found no speech."""
+    result = {'text': '', 'segments': []}
+    if task == "both":
+        result.update(language=None, translation={'text': '', 'segments': []})
+    return result
+
+
+def resolve_whisper_model(args: Any, model: Optional[str]) -> str:
+    final_model = model or args.model.model
+    if not os.path.exists(final_model) and final_model not in SUPPORTED_MODELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid model '{final_model}'. Supported models: {', '.join(sorted(SUPPORTED_MODELS))}"
+        )
+    return final_model
+
+
+def _segment_dict(segment) -> dict:
+    return {
+        'text': segment.text,
+        'start': segment.start,
+        'end': segment.end,
+        'confidence': segment.probability if hasattr(segment, 'probability') else 1.0,
+    }
+
+
+def format_whisper_result(results):
+    segments = [_segment_dict(segment) for segment in results]
+    return {
+        'text': ''.join(s['text'] for s in segments),
+        'segments': segments,
+    }
+
+
+def format_qwen_result(results):
+    if isinstance(results, list):
+        text = ''.join(s.get('text', '') for s in results)
         return {
-            'text': ''.join(s['text'] for s in segments),
-            'segments': segments,
+            'text': text,
+            'segments': results,
         }
+    return {
+        'text': str(results) if results else '',
+        'segments': [],
+    }
 
-    def _format_qwen_result(results):
-        if isinstance(results, list):
-            text = ''.join(s.get('text', '') for s in results)
-            return {
-                'text': text,
-                'segments': results,
-            }
-        return {
-            'text': str(results) if results else '',
-            'segments': [],
+
+async def _audio_digest(file: Optional[Any], file_upload: Optional[UploadFile]) -> Optional[str]:
+    """SHA-256 of the raw uploaded bytes (or of the file at a legacy path); None if unavailable."""
+    upload = file_upload
+    if upload is None and hasattr(file, 'read') and hasattr(file, 'filename'):
+        upload = file
+    if upload is not None:
+        return await asyncio.to_thread(hash_file, upload.file)
+    if isinstance(file, str) and os.path.isfile(file):
+        def _hash_path() -> str:
+            with open(file, "rb") as f:
+                return hash_file(f)
+        return await asyncio.to_thread(_hash_path)
+    return None
+
+
+async def acquire_admission(args: Any, engine: str) -> tuple[AsyncExitStack, Ticket]:
+    """
+    Takes a slot in the engine's admission queue (429 with Retry-After when it is full).
+    The slot is held until the returned stack is closed, so streaming responses can keep it
+    for their whole lifetime (see AdmittedStreamingResponse).
+    """
+    slot = AsyncExitStack()
+    try:
+        ticket = await slot.enter_async_context(get_admission_controller(args, engine).admit())
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many pending {engine} requests, please retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return slot, ticket
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that releases an admission slot once the response is finished,
+    including when the client disconnects before the body is fully sent.
+    """
+
+    def __init__(self, content: Any, slot: AsyncExitStack, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.slot.aclose()
+
+
+async def cached_process_audio_task(
+    args: Any,
+    file: Optional[Any],
+    file_upload: Optional[UploadFile],
+    model: Optional[str],
+    language: Optional[str],
+    task: str,
+    engine: Optional[str],
+) -> tuple[dict, float]:
+    """
+    process_audio_task behind the content-addressed result cache.
+    The key is SHA-256 of the raw audio bytes plus engine, model, language and task, so a hit
+    skips both decoding and inference; identical concurrent requests share one inference.
+    Misses go through the per-engine admission queue (429 with Retry-After when it is full).
+    The upload is decoded by the request itself before joining the shared inference, which
+    outlives the request that started it and must not touch an UploadFile closed on disconnect.
+
+    Returns:
+        (result, audio duration in seconds)
+    """
+    selected_engine = engine or args.model.asr_engine or "whisper"
+    if selected_engine == "qwen-asr":
+        key_model = model or args.model.asr_model
+        key_language = language or args.model.asr_language
+    else:
+        key_model = model or args.model.model
+        key_language = language or args.model.language
+
+    async def compute(audio: np.ndarray) -> bytes:
+        slot, ticket = await acquire_admission(args, selected_engine)
+        async with slot:
+            ticket.audio_seconds = len(audio) / ASR_SAMPLE_RATE
+            result = await process_audio_task(args, audio, model, language, task=task, engine=engine)
+        payload = {'result': result, 'duration': round(len(audio) / ASR_SAMPLE_RATE, 3)}
+        return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+    cache = get_result_cache(args, "transcriptions")
+    digest = await _audio_digest(file, file_upload) if cache.enabled else None
+    if digest is None:
+        data = await compute(await resolve_file_input(file, file_upload))
+    else:
+        key = content_key(
+            digest, selected_engine, key_model, key_language, task, args.model.asr_vad_filter
+        )
+        data = await cache.get(key)
+        if data is None:
+            # 共享计算只持有已解码的样本，发起请求断开后其上传文件被关闭也不影响其他等待方
+            audio = await resolve_file_input(file, file_upload)
+            data = await cache.get_or_compute(key, lambda: compute(audio))
+    payload = json.loads(data)
+    return payload['result'], payload['duration']
+
+
+async def open_whisper_stream(
+    args: Any, audio: Any, model: Optional[str], language: Optional[str], task: str
+):
+    """
+    Starts a Whisper transcription whose segments are delivered as soon as they are decoded.
+    Admission (429 when the whisper queue is full), model loading and language detection
+    errors are raised here, before the response starts.
+
+    Returns:
+        (segment stream, admission slot to hand to the streaming response)
+    """
+    from bookroom_audio.models.whisper import SegmentStream
+
+    slot, ticket = await acquire_admission(args, "whisper")
+    stream = SegmentStream(args, dict(
+        audio=audio,
+        model_size_or_path=resolve_whisper_model(args, model),
+        language=language or args.model.language,
+        task=task,
+    ))
+    try:
+        await stream.start()
+    except Exception as e:
+        await slot.aclose()
+        logger.error(f"Error during {task}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    except BaseException:
+        await slot.aclose()
+        raise
+    ticket.audio_seconds = getattr(stream.info, "duration", None)
+    return stream, slot
+
+
+async def iter_segment_events(stream) -> AsyncIterator[dict]:
+    """
+    Yields one 'segment' event per decoded segment, then a final 'done' summary event
+    (or an 'error' event if decoding fails midway).
+    """
+    texts = []
+    try:
+        async for segment in stream:
+            texts.append(segment.text)
+            yield {'type': 'segment', 'id': len(texts), **_segment_dict(segment)}
+        yield {
+            'type': 'done',
+            'text': ''.join(texts),
+            'language': stream.info.language,
+            'duration': stream.info.duration,
+            'segments': len(texts),
         }
+    except Exception as e:
+        logger.error(f"Error during streaming transcription: {e}", exc_info=True)
+        yield {'type': 'error', 'message': str(e)}
+    finally:
+        await stream.aclose()
+
+
+def event_stream_response(
+    events: AsyncIterator[dict], stream_format: str = "sse", slot: Optional[AsyncExitStack] = None
+) -> StreamingResponse:
+    """
+    Wraps events as SSE ('data: {...}\\n\\n') or NDJSON (one JSON object per line).
+    An admission slot, if given, is released when the response finishes.
+    """
+    async def body():
+        async for event in events:
+            data = json.dumps(event, ensure_ascii=False)
+            yield data + "\n" if stream_format == "ndjson" else f"data: {data}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if slot is not None:
+        return AdmittedStreamingResponse(body(), slot, media_type=STREAM_MEDIA_TYPES[stream_format], headers=headers)
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[stream_format], headers=headers)
+
+
+def check_stream_request(args: Any, engine: Optional[str], stream_format: str) -> None:
+    if stream_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid stream_format '{stream_format}'. Supported: {', '.join(STREAM_MEDIA_TYPES)}"
+        )
+    if (engine or args.model.asr_engine or "whisper") != "whisper":
+        raise HTTPException(status_code=400, detail="Streaming response is only supported by the whisper engine")
+
+
+async def resolve_file_input(
+    file: Optional[Any], file_upload: Optional[UploadFile]
+) -> np.ndarray:
+    """
+    Resolves the input file from either legacy 'file' form field or new 'file_upload',
+    and decodes it in memory into 16 kHz mono float32 samples.
+    """
+    # 优先处理 file_upload (新的文件上传参数)，其次 legacy file 参数中的 UploadFile 对象
+    upload = file_upload
+    if upload is None and hasattr(file, 'read') and hasattr(file, 'filename'):
+        upload = file
+
+    if upload is not None:
+        try:
+            return await decode_upload(upload)
+        except Exception as e:
+            logger.error(f"Failed to decode uploaded file: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=400, detail="Failed to decode uploaded audio file"
+            )
+
+    if file:
+        # 如果是文件路径字符串，直接从路径解码
+        if isinstance(file, str):
+            try:
+                return await asyncio.to_thread(decode_audio_source, file)
+            except Exception as e:
+                logger.error(f"Failed to decode file: {e}", exc_info=True)
+                raise HTTPException(
+                    status_code=400, detail="Failed to decode audio file"
+                )
+        # 其他情况，尝试作为文件内容处理
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file format. Expected file path string or UploadFile.",
+        )
+
+    raise HTTPException(
+        status_code=400,
+        detail="No audio file provided. Use 'file' or 'file_upload'.",
+    )
+
+
+def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
+    router = APIRouter(prefix="/v1/audio", tags=["transcribe"], route_class=UploadSpoolingRoute)
+    
+    """
+    Creates and registers the transcription and translation routes.
+    """
+    optional_api_key = get_api_key_dependency(api_key)
 
     @router.post(
         "/translations",
@@ -185,16 +491,24 @@ def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
         model: Optional[str] = Form(None, description="Model name/path for Whisper: tiny, base, small, medium, large, large-v2, large-v3"),
         language: Optional[str] = Form(None, description="Source language code (e.g., zh for Chinese, en for English). Auto-detected if not provided."),
         engine: Optional[str] = Form(None, description="Speech recognition engine. Only whisper supports translation. Default: whisper"),
+        stream: bool = Form(False, description="Emit each segment as soon as it is decoded, followed by a final summary event"),
+        stream_format: str = Form("sse", description="Streaming output format: sse or ndjson"),
     ):
         """
         Translate audio content to text in a target language (English).
         """
-        actual_file = await _resolve_file_input(file, file_upload)
-        
         if engine == "qwen-asr":
             raise HTTPException(status_code=400, detail="Qwen3-ASR does not support translation task")
-            
-        return await _process_audio_task(actual_file, model, language, task="translate", engine=engine)
+        if stream:
+            check_stream_request(args, "whisper", stream_format)
+            actual_file = await resolve_file_input(file, file_upload)
+            whisper_stream, slot = await open_whisper_stream(args, actual_file, model, language, "translate")
+            return event_stream_response(iter_segment_events(whisper_stream), stream_format, slot)
+
+        result, _ = await cached_process_audio_task(
+            args, file, file_upload, model, language, task="translate", engine=engine
+        )
+        return result
 
     @router.post(
         "/transcriptions",
@@ -210,6 +524,10 @@ def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
         model: Optional[str] = Form(None, description="Model name/path. For Whisper: tiny, base, small, medium, large, large-v2, large-v3. For Qwen3-ASR: qwen3-asr (default)"),
         language: Optional[str] = Form(None, description="Language code (e.g., zh for Chinese, en for English). Auto-detected if not provided."),
         engine: Optional[str] = Form(None, description="Speech recognition engine. Options: whisper, qwen-asr. Default: qwen-asr"),
+        stream: bool = Form(False, description="Emit each segment as soon as it is decoded, followed by a final summary event (whisper only)"),
+        stream_format: str = Form("sse", description="Streaming output format: sse or ndjson"),
+        task: str = Form("transcribe", description="transcribe, or both: transcript plus English translation "
+                                                   "from a single decode and encoder pass (whisper only)"),
     ):
         """
         Transcribe audio content to text in the source language.
@@ -220,11 +538,154 @@ def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
             model: Model name/path (depends on engine)
             language: Language code (e.g., zh, en)
             engine: Speech recognition engine. Options: whisper, qwen-asr
+            stream: Stream segments as SSE / NDJSON events instead of one JSON response
+            stream_format: sse or ndjson
+            task: transcribe, or both (adds a 'translation' object with the English translation)
         """
-        actual_file = await _resolve_file_input(file, file_upload)
-        return await _process_audio_task(
-            actual_file, model, language, task="transcribe", engine=engine
+        if task not in ("transcribe", "both"):
+            raise HTTPException(status_code=400, detail=f"Invalid task '{task}'. Supported: transcribe, both")
+        if task == "both":
+            if (engine or args.model.asr_engine or "whisper") != "whisper":
+                raise HTTPException(status_code=400, detail="task=both is only supported by the whisper engine")
+            if stream:
+                raise HTTPException(status_code=400, detail="task=both does not support streaming")
+
+        if stream:
+            check_stream_request(args, engine, stream_format)
+            actual_file = await resolve_file_input(file, file_upload)
+            whisper_stream, slot = await open_whisper_stream(args, actual_file, model, language, "transcribe")
+            return event_stream_response(iter_segment_events(whisper_stream), stream_format, slot)
+
+        result, _ = await cached_process_audio_task(
+            args, file, file_upload, model, language, task=task, engine=engine
         )
+        return result
+
+    @router.post(
+        "/transcriptions/incremental",
+        dependencies=[Depends(optional_api_key)],
+        operation_id="transcribe_audio_incremental",
+        summary="Transcribe audio while it is being uploaded",
+        description="Same as /transcriptions, but decoding and recognition start on the first complete "
+                    "windows before the request body finishes uploading. Accepts multipart/form-data "
+                    "(form fields must precede the file part) or a raw audio body. Whisper engine only.",
+    )
+    async def transcribe_audio_incremental(
+        request: Request,
+        model: Optional[str] = Query(None, description="Whisper model name/path: tiny, base, small, medium, large, large-v2, large-v3"),
+        language: Optional[str] = Query(None, description="Language code (e.g., zh for Chinese, en for English). Auto-detected if not provided."),
+        engine: Optional[str] = Query(None, description="Speech recognition engine. Only whisper is supported in incremental mode."),
+    ):
+        """
+        Transcribe audio incrementally: multipart chunks are fed into a streaming decoder and
+        each silence-aligned window is transcribed as soon as it is complete.
+        """
+        from bookroom_audio.models.whisper_windows import transcribe_windows
+
+        loop = asyncio.get_running_loop()
+        pipe = ByteStreamPipe(args.server.upload_spool_max_mb * 1024 * 1024)
+        windows: asyncio.Queue = asyncio.Queue()
+        windower = AudioWindower(args.model.whisper_window_s)
+
+        def on_samples(samples: np.ndarray) -> None:
+            for window in windower.push(samples):
+                loop.call_soon_threadsafe(windows.put_nowait, window)
+
+        def decode() -> None:
+            try:
+                decode_incremental(pipe, on_samples)
+                last = windower.flush()
+                if last is not None:
+                    loop.call_soon_threadsafe(windows.put_nowait, last)
+            finally:
+                loop.call_soon_threadsafe(windows.put_nowait, None)
+
+        async def iter_windows():
+            while True:
+                window = await windows.get()
+                if window is None:
+                    return
+                yield window
+
+        content_type = request.headers.get("content-type", "")
+        extractor = None
+        if content_type.startswith("multipart/form-data"):
+            try:
+                extractor = MultipartAudioExtractor(content_type, pipe.feed)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        decode_task: Optional[asyncio.Task] = None
+        transcribe_task: Optional[asyncio.Task] = None
+
+        def start(fields: dict) -> None:
+            nonlocal decode_task, transcribe_task
+            selected_engine = fields.get("engine") or "whisper"
+            if selected_engine != "whisper":
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Engine '{selected_engine}' does not support incremental transcription. Use whisper.",
+                )
+            params = dict(
+                model_size_or_path=resolve_whisper_model(args, fields.get("model")),
+                language=fields.get("language") or args.model.language,
+                task="transcribe",
+            )
+            decode_task = asyncio.create_task(asyncio.to_thread(decode))
+            transcribe_task = asyncio.create_task(
+                transcribe_windows(args, params, iter_windows())
+            )
+
+        # query 参数为默认值，multipart 中位于文件之前的同名文本字段覆盖之
+        fields = {"model": model, "language": language, "engine": engine}
+        # 占用 whisper 准入名额直至识别结束；排队期间不读取请求体（上传随之背压）
+        slot, _ = await acquire_admission(args, "whisper")
+        try:
+            if extractor is None:
+                start(fields)
+            async for chunk in request.stream():
+                if extractor is None:
+                    pipe.feed(chunk)
+                    continue
+                extractor.write(chunk)
+                if decode_task is None and extractor.audio_seen:
+                    start({**fields, **{k: v for k, v in extractor.fields.items() if v}})
+            if extractor is not None:
+                extractor.finalize()
+            pipe.finish()
+
+            if decode_task is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="No audio file provided. Use 'file' or 'file_upload'.",
+                )
+            try:
+                await decode_task
+            except Exception as e:
+                logger.error(f"Failed to decode uploaded file: {e}", exc_info=True)
+                raise HTTPException(
+                    status_code=400, detail="Failed to decode uploaded audio file"
+                )
+            results = await transcribe_task
+            return format_whisper_result(results)
+
+        except asyncio.CancelledError:
+            logger.warning("Request cancelled during incremental transcribe")
+            raise HTTPException(status_code=499, detail="Request cancelled")
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error during incremental transcribe: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            # 上传中断或出错时唤醒解码线程并停止识别；关闭管道即删除溢写的临时文件
+            pipe.abort(RuntimeError("Upload aborted"))
+            pipe.close()
+            if decode_task is not None and not decode_task.done():
+                decode_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            if transcribe_task is not None and not transcribe_task.done():
+                transcribe_task.cancel()
+            await slot.aclose()
 
     @router.get(
         "/engines",
@@ -247,68 +708,4 @@ def create_transcribe_routes(args: Any, api_key: Optional[str] = None):
             },
         }
 
-    async def _resolve_file_input(
-        file: Optional[Any], file_upload: Optional[UploadFile]
-    ) -> Any:
-        """
-        Resolves the input file from either legacy 'file' form field or new 'file_upload'.
-        """
-        # 优先处理 file_upload (新的文件上传参数)
-        if file_upload:
-            try:
-                content = await file_upload.read()
-                original_filename = file_upload.filename or "audio.wav"
-                suffix = os.path.splitext(original_filename)[1]
-
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=suffix
-                ) as tmp_file:
-                    tmp_file.write(content)
-                    tmp_file_path = tmp_file.name
-
-                return tmp_file_path
-
-            except Exception as e:
-                logger.error(f"Failed to process uploaded file: {e}", exc_info=True)
-                raise HTTPException(
-                    status_code=500, detail="Failed to process uploaded file"
-                )
-
-        # 处理 legacy file 参数
-        if file:
-            # 检查是否是 UploadFile 对象
-            if hasattr(file, 'read') and hasattr(file, 'filename'):
-                try:
-                    # 如果是 UploadFile 对象，需要 await read()
-                    content = await file.read() if asyncio.iscoroutinefunction(file.read) else file.read()
-                    original_filename = file.filename or "audio.wav"
-                    suffix = os.path.splitext(original_filename)[1]
-
-                    with tempfile.NamedTemporaryFile(
-                        delete=False, suffix=suffix
-                    ) as tmp_file:
-                        tmp_file.write(content)
-                        tmp_file_path = tmp_file.name
-
-                    return tmp_file_path
-                except Exception as e:
-                    logger.error(f"Failed to process file: {e}", exc_info=True)
-                    raise HTTPException(
-                        status_code=500, detail="Failed to process file"
-                    )
-            # 如果是文件路径字符串，直接返回
-            elif isinstance(file, str):
-                return file
-            # 其他情况，尝试作为文件内容处理
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Invalid file format. Expected file path string or UploadFile.",
-                )
-
-        raise HTTPException(
-            status_code=400,
-            detail="No audio file provided. Use 'file' or 'file_upload'.",
-        )
-
     return router
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+TTS 音频输出
+各引擎共用的「float32 样本 → 目标采样率 16-bit 单声道 WAV」路径，替代 pydub
+（int16 → AudioSegment → set_frame_rate → export 到 BytesIO → getvalue，整段多次拷贝，
+且 audioop.ratecv 逐样本重采样较慢）。
+
+- 重采样：NumPy 向量化多相（polyphase）滤波，上采样 L / 下采样 M，Kaiser 窗 sinc 低通；
+  与 scipy.signal.resample_poly 的滤波器设计一致（半长 10·max(L, M)，beta=5）
+- WAV：预分配 44 字节头 + 数据区的 bytearray，样本 clip 后直接量化写入数据区
+- 目标采样率等于引擎原生采样率时跳过重采样
+- 压缩格式输入（Edge TTS 的 MP3、pyttsx3 的 WAV 文件）用 PyAV 解码为 float32；
+  Edge TTS 流式输出用 StreamingAudioDecoder 边收边解码
+"""
+
+import io
+import struct
+import wave
+from functools import lru_cache
+from math import gcd
+from typing import BinaryIO, Optional, Union
+
+import av
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+WAV_HEADER_SIZE = 44
+
+
+@lru_cache(maxsize=32)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """低通 FIR 按相位拆分：返回 H[p, i] = h[p + i·up]，形状 (up, 每相抽头数)"""
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    n = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    cutoff = 1.0 / max_rate
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(2 * half_len + 1, 5.0)
+    h *= up / h.sum()  # 补偿零插值带来的 1/up 增益
+
+    taps = -(-len(h) // up)
+    padded = np.zeros(up * taps)
+    padded[:len(h)] = h
+    return padded.reshape(taps, up).T.astype(np.float32)
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """多相滤波重采样（单声道 float32）；采样率相同时原样返回（不复制）"""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim != 1:
+        samples = samples.reshape(-1)
+    if orig_sr == target_sr or len(samples) == 0:
+        return samples
+
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    bank = _polyphase_filter(up, down)
+    taps = bank.shape[1]
+    half_len = 10 * max(up, down)
+
+    # 输出 k 对应零插值信号中的位置 t = k·down + half_len（补偿滤波器群延迟）：
+    #   y[k] = Σ_i H[t mod up, i] · x[t // up - i]
+    # 同一余数类 k = r + j·up 的相位固定、输入起点每步前进 down，
+    # 因此每类是一次「滑动窗口视图（步长 down）× 该相抽头」的矩阵向量乘（einsum 直接在
+    # 跨步视图上累加，不复制窗口），无需逐点索引
+    n_out = -(-len(samples) * up // down)
+    last_base = ((n_out - 1) * down + half_len) // up
+    x = np.zeros(taps - 1 + max(len(samples), last_base + 1), dtype=np.float32)
+    x[taps - 1:taps - 1 + len(samples)] = samples
+    windows = sliding_window_view(x, taps)
+
+    out = np.empty(n_out, dtype=np.float32)
+    for r in range(min(up, n_out)):
+        t = r * down + half_len
+        count = len(range(r, n_out, up))
+        # 窗口首元素对应 x[t // up - (taps - 1)]（加上左侧 taps - 1 个零后即下标 t // up）
+        out[r::up] = np.einsum("kt,t->k", windows[t // up::down][:count], bank[t % up, ::-1])
+    return out
+
+
+def wav_bytes(samples: np.ndarray, sample_rate: int) -> bytes:
+    """float32 样本 → 16-bit 单声道 WAV（头与数据写入同一块预分配缓冲区）"""
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+    data_size = 2 * len(samples)
+    buf = bytearray(WAV_HEADER_SIZE + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", buf, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+    pcm = np.frombuffer(buf, dtype="<i2", offset=WAV_HEADER_SIZE)
+    np.multiply(np.clip(samples, -1.0, 1.0), 32767, out=pcm, casting="unsafe")
+    return bytes(buf)
+
+
+def to_wav(samples: np.ndarray, orig_sr: int, target_sr: int) -> bytes:
+    """引擎输出（orig_sr）→ 目标采样率 WAV"""
+    return wav_bytes(resample(samples, orig_sr, target_sr), target_sr)
+
+
+def wav_samples(data: bytes) -> tuple[np.ndarray, int]:
+    """WAV 字节 → 单声道 float32 样本（16-bit PCM 直接解析，其它格式经 PyAV 解码），返回 (样本, 采样率)"""
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            if w.getsampwidth() == 2:
+                channels, sample_rate = w.getnchannels(), w.getframerate()
+                pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+                samples = pcm.reshape(-1, channels).mean(axis=1) if channels > 1 else pcm
+                return (samples / 32768.0).astype(np.float32), sample_rate
+    except wave.Error:
+        pass
+    return decode_audio(data)
+
+
+def decode_audio(source: Union[str, bytes, BinaryIO]) -> tuple[np.ndarray, int]:
+    """解码任意格式音频为单声道 float32 样本，返回 (样本, 采样率)"""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    with av.open(source) as container:
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+        chunks = []
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray().reshape(-1))
+    samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return samples.astype(np.float32, copy=False), sample_rate
+
+
+class StreamingAudioDecoder:
+    """压缩音频增量解码（Edge TTS 的 MP3 流）：按任意切分喂入字节，返回已可解出的单声道 float32 样本"""
+
+    def __init__(self, codec: str = "mp3") -> None:
+        self._codec = av.CodecContext.create(codec, "r")
+        self._resampler: Optional[av.AudioResampler] = None
+        self.sample_rate: Optional[int] = None
+
+    def _convert(self, frames) -> list[np.ndarray]:
+        chunks = []
+        for frame in frames:
+            if self._resampler is None:
+                self.sample_rate = frame.sample_rate
+                self._resampler = av.AudioResampler(format="flt", layout="mono", rate=frame.sample_rate)
+            for out in self._resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        return chunks
+
+    def _decode(self, packets) -> list[np.ndarray]:
+        chunks = []
+        for packet in packets:
+            try:
+                chunks.extend(self._convert(self._codec.decode(packet)))
+            except av.error.InvalidDataError:
+                # 流首的 ID3 标签等非音频帧数据：跳过
+                continue
+        return chunks
+
+    @staticmethod
+    def _join(chunks: list[np.ndarray]) -> np.ndarray:
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+
+    def feed(self, data: bytes) -> np.ndarray:
+        return self._join(self._decode(self._codec.parse(data)))
+
+    def flush(self) -> np.ndarray:
+        """输入结束：冲出解析器与解码器中剩余的样本"""
+        chunks = self._decode(self._codec.parse(None))
+        chunks.extend(self._convert(self._codec.decode(None)))
+        if self._resampler is not None:
+            chunks.extend(out.to_ndarray().reshape(-1) for out in self._resampler.resample(None))
+        return self._join(chunks)
@@ -0,0 +1,138 @@
+"""
+ChatTTS 跨请求合批调度
+
+ChatTTS 的 infer 接受文本列表：在一个时间窗口内收集 /v1/tts/generate 与 /v1/audio/speech
+的并发请求，按推理参数（情感；ChatTTS 固定使用默认音色，voice 不影响推理）分组，同组文本合并为一次 infer(stream=True) 调用，
+再把每一步产出的波形块按下标分发回各请求。
+
+- 同组请求在 CHATTTS_BATCH_WAIT_MS 窗口内收集，满 CHATTTS_BATCH_SIZE 立即出批
+- 始终以流式推理执行：/v1/audio/speech 逐块编码输出，/v1/tts/generate 收齐后拼接
+- 默认关闭（CHATTTS_BATCH_SIZE=1），此时仍走单条 infer
+"""
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+from bookroom_audio.api.routers.tts import engines
+from bookroom_audio.utils.utils_api import logger
+
+# 分组 key：归一化后的情感
+BatchGroupKey = str
+
+_DONE = object()
+
+
+class _PendingRequest:
+    """等待入批的单个请求：推理线程把样本块放入 queue，以 _DONE / 异常结束"""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+
+class _BatchGroup:
+    """同一分组下正在收集的请求"""
+
+    def __init__(self) -> None:
+        self.pending: list[_PendingRequest] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class ChatTTSBatchScheduler:
+    """ChatTTS 跨请求合批调度器（不同分组 / 批次可并行执行）"""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: int) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0, max_wait_ms) / 1000.0
+        self._groups: dict[BatchGroupKey, _BatchGroup] = {}
+        # 事件循环只弱引用任务：持有运行中的批次，避免执行中被回收
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, text: str, emotion: str = "neutral") -> AsyncIterator[np.ndarray]:
+        """提交单条文本，逐块产出其 24kHz float32 样本（推理出错时在迭代中抛出）"""
+        group_key: BatchGroupKey = engines._chattts_emotion(emotion)
+        group = self._groups.get(group_key)
+        if group is None:
+            group = _BatchGroup()
+            self._groups[group_key] = group
+
+        request = _PendingRequest(text)
+        group.pending.append(request)
+
+        if len(group.pending) >= self.max_batch_size:
+            self._dispatch(group_key)
+        elif group.timer is None:
+            loop = asyncio.get_running_loop()
+            group.timer = loop.call_later(self.max_wait_s, self._dispatch, group_key)
+
+        while True:
+            item = await request.queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def synthesize(self, text: str, emotion: str = "neutral") -> np.ndarray:
+        """提交单条文本并等待完整波形"""
+        chunks = [chunk async for chunk in self.submit(text, emotion)]
+        if not chunks:
+            raise Exception("ChatTTS produced no audio")
+        return np.concatenate(chunks)
+
+    def _dispatch(self, group_key: BatchGroupKey) -> None:
+        group = self._groups.pop(group_key, None)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+            group.timer = None
+        if group.pending:
+            task = asyncio.create_task(self._run(group_key, group.pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group_key: BatchGroupKey, batch: list[_PendingRequest]) -> None:
+        emotion = group_key
+        logger.info(f"ChatTTS batch: emotion={emotion} size={len(batch)}")
+        loop = asyncio.get_running_loop()
+
+        def put(request: _PendingRequest, item) -> None:
+            loop.call_soon_threadsafe(request.queue.put_nowait, item)
+
+        def run() -> None:
+            for chunks in engines.iter_audio_chatt_batch(
+                [r.text for r in batch], emotion,
+            ):
+                for request, chunk in zip(batch, chunks):
+                    if chunk is not None:
+                        put(request, chunk)
+
+        # 被取消（如关停）时各请求收到该异常，不会因等不到 _DONE 而永远挂起
+        end: object = RuntimeError("ChatTTS batch was cancelled")
+        try:
+            await asyncio.to_thread(run)
+            end = _DONE
+        except Exception as e:
+            logger.error(f"ChatTTS batch failed: {e}", exc_info=True)
+            end = e
+        finally:
+            for request in batch:
+                request.queue.put_nowait(end)
+
+
+_scheduler: Optional[ChatTTSBatchScheduler] = None
+
+
+def get_chattts_scheduler() -> Optional[ChatTTSBatchScheduler]:
+    """全局 ChatTTS 合批调度器；CHATTTS_BATCH_SIZE<=1（默认）时返回 None，走单条推理"""
+    global _scheduler
+    if _scheduler is None:
+        from bookroom_audio.utils.config import get_config
+
+        config = get_config().model
+        if config.chattts_batch_size > 1:
+            _scheduler = ChatTTSBatchScheduler(config.chattts_batch_size, config.chattts_batch_wait_ms)
+    return _scheduler
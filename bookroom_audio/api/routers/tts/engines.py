@@ -3,14 +3,22 @@ TTS engines - Implementation of various TTS engines.
 """
 
 import asyncio
+import hashlib
 import io
+import json
 import os
+import re
 import threading
 import tempfile
-from typing import Optional
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
 
-from pydub import AudioSegment
+import numpy as np
 
+from bookroom_audio.api.routers.tts.audio_output import StreamingAudioDecoder, decode_audio, to_wav
+from bookroom_audio.api.routers.tts.text_frontend import memoize_g2p, normalize_text
+from bookroom_audio.api.routers.tts.timestamps import even_split_timeline, kokoro_timeline
 from bookroom_audio.utils.utils_api import logger
 
 
@@ -68,6 +76,7 @@ async def generate_audio_edge_tts(
     Returns:
         WAV格式的音频数据
     """
+    text = normalize_text(text, "edge-tts")
     from bookroom_audio.api.routers.tts.constants import EDGE_TTS_VOICES
     from bookroom_audio.api.routers.tts.utils import get_default_edge_voice
 
@@ -86,13 +95,8 @@ async def generate_audio_edge_tts(
 
     audio_bytes.seek(0)
 
-    audio = AudioSegment.from_file(audio_bytes, format="mp3")
-    audio = audio.set_frame_rate(target_sample_rate)
-
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
-
-    return out_buf.getvalue()
+    samples, sample_rate = decode_audio(audio_bytes)
+    return to_wav(samples, sample_rate, target_sample_rate)
 
 
 def _split_sentence_to_visemes(sentence: str, start_ms: float, duration_ms: float) -> list[dict]:
@@ -100,46 +104,27 @@ def _split_sentence_to_visemes(sentence: str, start_ms: float, duration_ms: floa
     将一句文本切成口型驱动单元（viseme），句内时长按字符均分近似。
     - 中文：逐字（跳过空白与标点，标点处不计口型、不占时长权重）
     - 英文：按空格分词
-    返回 [{"text","start_ms","end_ms"}]
+    返回 [{"text","start_ms","end_ms"}]（计算见 timestamps.even_split_timeline）
     """
-    import re
-
-    units: list[str] = []
-    if re.search(r"[\u4e00-\u9fff]", sentence):
-        # 中文：逐字（保留中文与字母数字，跳过标点空白）
-        for ch in sentence:
-            if ch.strip() and not re.match(r"[，。！？、；：""''（）\s]", ch):
-                units.append(ch)
-    else:
-        units = [w for w in sentence.split() if w]
-
-    if not units:
-        return []
-    seg = duration_ms / len(units)
-    words = []
-    for i, u in enumerate(units):
-        words.append({
-            "text": u,
-            "start_ms": round(start_ms + i * seg, 1),
-            "end_ms": round(start_ms + (i + 1) * seg, 1),
-        })
-    return words
+    return even_split_timeline(sentence, start_ms, duration_ms).to_words(1)
 
 
-async def stream_tts_edge_with_words(
+async def iter_edge_tts_events(
     text: str,
     voice: Optional[str] = None,
-    rate: str = "0%",
-    volume: str = "0%",
-    target_sample_rate: int = 16000,
-) -> tuple[bytes, list[dict]]:
+    rate: str = "+0%",
+    volume: str = "+0%",
+) -> AsyncIterator[dict]:
     """
-    Edge TTS 生成音频 + viseme 时间戳（口型驱动）。
-    edge-tts 中文仅返回句级 SentenceBoundary → 按句时长 + 逐字均分近似。
+    Edge TTS 边收边转发：communicate.stream() 每产出一块即处理，MP3 增量解码。
+    edge-tts 中文仅返回句级 SentenceBoundary → 按句时长 + 逐字均分近似 viseme。
 
-    Returns:
-        (wav_bytes, words) 其中 words: [{"text", "start_ms", "end_ms"}]
+    Yields:
+        {"type": "audio", "samples": float32 单声道, "sample_rate": int} 或
+        {"type": "words", "words": [{"text", "start_ms", "end_ms"}]}；
+        整段无边界事件时（退化）结束前按音频总时长均分产出一次 words
     """
+    text = normalize_text(text, "edge-tts")
     from bookroom_audio.api.routers.tts.constants import EDGE_TTS_VOICES
     from bookroom_audio.api.routers.tts.utils import get_default_edge_voice
 
@@ -149,39 +134,34 @@ async def stream_tts_edge_with_words(
         raise ValueError(f"Unsupported voice: {voice}. Available voices: {EDGE_TTS_VOICES}")
 
     communicate = edge_tts.Communicate(text, voice, rate=rate, volume=volume)
-
-    mp3_chunks: list[bytes] = []
-    sentence_bounds: list[tuple[float, float, str]] = []  # (start_ms, duration_ms, text)
+    decoder = StreamingAudioDecoder("mp3")
+    has_boundaries = False
+    total_samples = 0
 
     async for chunk in communicate.stream():
         t = chunk["type"]
         if t == "audio":
-            mp3_chunks.append(chunk["data"])
-        elif t == "SentenceBoundary":
-            offset_ticks = chunk.get("offset", 0)
-            duration_ticks = chunk.get("duration", 0)
-            sentence_bounds.append((
-                offset_ticks / 10000,
-                duration_ticks / 10000,
-                chunk.get("text", ""),
-            ))
-
-    mp3 = b"".join(mp3_chunks)
-    audio = AudioSegment.from_file(io.BytesIO(mp3), format="mp3")
-    audio = audio.set_frame_rate(target_sample_rate)
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
-
-    # 无句级边界时（退化）：按整段音频时长均分
-    words: list[dict] = []
-    if not sentence_bounds and mp3:
-        total_ms = len(audio)
-        words = _split_sentence_to_visemes(text, 0, total_ms)
-    else:
-        for start_ms, dur_ms, sentence in sentence_bounds:
-            words.extend(_split_sentence_to_visemes(sentence, start_ms, dur_ms))
+            samples = decoder.feed(chunk["data"])
+            if len(samples):
+                total_samples += len(samples)
+                yield {"type": "audio", "samples": samples, "sample_rate": decoder.sample_rate}
+        elif t in ("SentenceBoundary", "WordBoundary"):
+            has_boundaries = True
+            # offset / duration 单位为 100ns
+            words = _split_sentence_to_visemes(
+                chunk.get("text", ""), chunk.get("offset", 0) / 10000, chunk.get("duration", 0) / 10000,
+            )
+            if words:
+                yield {"type": "words", "words": words}
+
+    samples = decoder.flush()
+    if len(samples):
+        total_samples += len(samples)
+        yield {"type": "audio", "samples": samples, "sample_rate": decoder.sample_rate}
 
-    return out_buf.getvalue(), words
+    if not has_boundaries and total_samples:
+        total_ms = total_samples / decoder.sample_rate * 1000.0
+        yield {"type": "words", "words": _split_sentence_to_visemes(text, 0, total_ms)}
 
 
 # pyttsx3 线程本地存储
@@ -194,33 +174,24 @@ def get_thread_local_pyttsx3_engine():
     return _local_engine_storage.engine
 
 
-def generate_audio_pyttsx3(
+def pyttsx3_synthesize(
+    engine,
     text: str,
+    output_path: str,
     voice_id: Optional[str] = None,
     rate: int = 200,
     volume: float = 1.0,
     target_sample_rate: int = 16000,
 ) -> bytes:
     """
-    使用 pyttsx3 生成音频。
-    
-    Args:
-        text: 要转换的文本
-        voice_id: 语音ID
-        rate: 语速（WPM）
-        volume: 音量（0.0-1.0）
-        target_sample_rate: 目标采样率
-        
-    Returns:
-        WAV格式的音频数据
+    用给定的 pyttsx3 引擎实例合成（线程本地引擎与进程池 worker 共用）。
+    驱动只能写文件：输出到 output_path 后读回并重采样，属性在结束后还原。
     """
-    engine = get_thread_local_pyttsx3_engine()
-
+    text = normalize_text(text, "pyttsx3")
     original_rate = engine.getProperty("rate")
     original_volume = engine.getProperty("volume")
     original_voice = engine.getProperty("voice")
 
-    temp_path = None
     try:
         engine.setProperty("rate", rate)
         engine.setProperty("volume", max(0.0, min(1.0, volume)))
@@ -235,35 +206,22 @@ def generate_audio_pyttsx3(
                     engine.setProperty("voice", voice.id)
                     break
 
-        fd, temp_path = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)
-
-        engine.save_to_file(text, temp_path)
+        engine.save_to_file(text, output_path)
         engine.runAndWait()
 
-        if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+        if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
             raise Exception("TTS engine generated an empty file.")
 
         try:
-            audio = AudioSegment.from_wav(temp_path)
-            audio = audio.set_frame_rate(target_sample_rate)
-
-            out_buf = io.BytesIO()
-            audio.export(out_buf, format="wav")
-            audio_data = out_buf.getvalue()
+            samples, sample_rate = decode_audio(output_path)
+            audio_data = to_wav(samples, sample_rate, target_sample_rate)
         except Exception as e:
-            logger.warning(f"Failed to process audio with pydub: {e}. Using raw file.")
-            with open(temp_path, "rb") as f:
+            logger.warning(f"Failed to resample pyttsx3 output: {e}. Using raw file.")
+            with open(output_path, "rb") as f:
                 audio_data = f.read()
 
         return audio_data
     finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass
-
         try:
             engine.setProperty("rate", original_rate)
             engine.setProperty("volume", original_volume)
@@ -273,6 +231,39 @@ def generate_audio_pyttsx3(
             pass
 
 
+def generate_audio_pyttsx3(
+    text: str,
+    voice_id: Optional[str] = None,
+    rate: int = 200,
+    volume: float = 1.0,
+    target_sample_rate: int = 16000,
+) -> bytes:
+    """
+    使用 pyttsx3 生成音频（线程本地引擎；PYTTSX3_WORKERS>0 时改走 tts/pyttsx3_pool.py 进程池）。
+    
+    Args:
+        text: 要转换的文本
+        voice_id: 语音ID
+        rate: 语速（WPM）
+        volume: 音量（0.0-1.0）
+        target_sample_rate: 目标采样率
+        
+    Returns:
+        WAV格式的音频数据
+    """
+    engine = get_thread_local_pyttsx3_engine()
+
+    fd, temp_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        return pyttsx3_synthesize(engine, text, temp_path, voice_id, rate, volume, target_sample_rate)
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
 def _check_chattss_model_files() -> dict:
     """检查 ChatTTS 模型文件是否完整"""
     import glob
@@ -440,30 +431,8 @@ def _get_chattss_status() -> dict:
     }
 
 
-def generate_audio_chatt(
-    text: str,
-    voice: Optional[str] = None,
-    emotion: str = "neutral",
-    target_sample_rate: int = 16000,
-) -> bytes:
-    """
-    使用 ChatTTS 生成音频。
-    
-    Args:
-        text: 要转换的文本
-        voice: 语音选择（male, female, neutral 或数字索引）
-        emotion: 情感类型
-        target_sample_rate: 目标采样率
-        
-    Returns:
-        WAV格式的音频数据
-    """
-    from bookroom_audio.api.routers.tts.constants import CHATTTS_VOICES, CHATTTS_EMOTIONS
-    from bookroom_audio.api.routers.tts.utils import preprocess_text_for_chattts
-    
-    # 预处理文本，移除可能导致警告的无效字符
-    text = preprocess_text_for_chattts(text)
-    
+def _load_chattts_model():
+    """获取 ChatTTS 模型，未加载时按缓存目录自动加载（失败显式报错）"""
     model = _get_chattss_model()
     
     # 如果模型未加载，尝试自动加载
@@ -502,24 +471,19 @@ def generate_audio_chatt(
     
     if model is None:
         raise Exception("ChatTTS model not loaded")
-    
-    # 设置情感参数
-    if emotion not in CHATTTS_EMOTIONS:
-        emotion = "neutral"
-    
-    # 设置语音参数
-    voice_num = 0
-    if voice is not None:
-        if voice in CHATTTS_VOICES:
-            # 根据语音类型设置索引
-            voice_map = {"male": 0, "female": 1, "neutral": 2}
-            voice_num = voice_map.get(voice, 0)
-        else:
-            try:
-                voice_num = int(voice)
-            except ValueError:
-                voice_num = 0
-    
+
+    return model
+
+
+def _chattts_emotion(emotion: str) -> str:
+    """归一化情感参数。ChatTTS 目前固定使用默认音色（spk_emb=None），推理参数只随情感变化"""
+    from bookroom_audio.api.routers.tts.constants import CHATTTS_EMOTIONS
+
+    return emotion if emotion in CHATTTS_EMOTIONS else "neutral"
+
+
+def _chattts_infer_params(model, emotion: str):
+    """按情感构造 ChatTTS 推理参数"""
     # 使用 ChatTTS 提供的参数类
     params_infer_code = model.InferCodeParams()
     params_infer_code.spk_emb = None  # 使用默认语音
@@ -534,7 +498,51 @@ def generate_audio_chatt(
         params_infer_code.temperature = 0.1
     elif emotion == "angry":
         params_infer_code.temperature = 0.7
+
+    return params_infer_code
+
+
+def _prepare_chattts(text: str, voice: Optional[str], emotion: str):
+    """
+    准备 ChatTTS 推理：预处理文本、确保模型已加载、按情感构造推理参数（voice 暂未生效，使用默认音色）。
+
+    Returns:
+        (model, 预处理后的文本, params_infer_code)
+    """
+    # 规范化文本（数字读法、移除可能导致警告的无效字符）
+    text = normalize_text(text, "chattts")
+    model = _load_chattts_model()
+    return model, text, _chattts_infer_params(model, _chattts_emotion(emotion))
+
+
+CHATTTS_SAMPLE_RATE = 24000
+
+
+def chattts_wav_bytes(samples: np.ndarray, target_sample_rate: int) -> bytes:
+    """ChatTTS 24kHz float32 输出 → 目标采样率 WAV"""
+    return to_wav(samples, CHATTTS_SAMPLE_RATE, target_sample_rate)
+
+
+def generate_audio_chatt(
+    text: str,
+    voice: Optional[str] = None,
+    emotion: str = "neutral",
+    target_sample_rate: int = 16000,
+) -> bytes:
+    """
+    使用 ChatTTS 生成音频。
     
+    Args:
+        text: 要转换的文本
+        voice: 语音选择（male, female, neutral 或数字索引）
+        emotion: 情感类型
+        target_sample_rate: 目标采样率
+        
+    Returns:
+        WAV格式的音频数据
+    """
+    model, text, params_infer_code = _prepare_chattts(text, voice, emotion)
+
     # 生成音频
     audio_data = model.infer(
         [text],
@@ -543,26 +551,64 @@ def generate_audio_chatt(
     )
     
     # 获取音频数据
-    wav_data = audio_data[0]
-    
-    # 将 float32 转换为 int16
-    import numpy as np
-    wav_data_int16 = (wav_data * 32767).astype(np.int16)
-    
-    # 转换采样率
-    audio = AudioSegment(
-        data=wav_data_int16.tobytes(),
-        sample_width=2,
-        frame_rate=24000,
-        channels=1
-    )
-    
-    audio = audio.set_frame_rate(target_sample_rate)
-    
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
-    
-    return out_buf.getvalue()
+    return chattts_wav_bytes(audio_data[0], target_sample_rate)
+
+
+def iter_audio_chatt(
+    text: str,
+    voice: Optional[str] = None,
+    emotion: str = "neutral",
+) -> Iterator[np.ndarray]:
+    """
+    使用 ChatTTS 流式生成音频（infer(stream=True)），逐块产出新合成的样本。
+
+    Yields:
+        24kHz 单声道 float32 样本块（同步生成器，放线程池逐块推进）
+    """
+    model, text, params_infer_code = _prepare_chattts(text, voice, emotion)
+
+    for wavs in model.infer(
+        [text],
+        skip_refine_text=False,
+        params_infer_code=params_infer_code,
+        stream=True,
+    ):
+        chunk = wavs[0] if wavs is not None and len(wavs) else None
+        if chunk is None:
+            continue
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if len(chunk):
+            yield chunk
+
+
+def iter_audio_chatt_batch(
+    texts: list[str],
+    emotion: str = "neutral",
+) -> Iterator[list[Optional[np.ndarray]]]:
+    """
+    一次 infer 调用合成多条文本（流式），供跨请求合批使用。
+
+    Yields:
+        与 texts 一一对应的新样本块列表（24kHz 单声道 float32；本步无新样本的项为 None）
+    """
+    model = _load_chattts_model()
+    params_infer_code = _chattts_infer_params(model, _chattts_emotion(emotion))
+
+    for wavs in model.infer(
+        [normalize_text(text, "chattts") for text in texts],
+        skip_refine_text=False,
+        params_infer_code=params_infer_code,
+        stream=True,
+    ):
+        if wavs is None:
+            continue
+        chunks: list[Optional[np.ndarray]] = []
+        for i in range(len(texts)):
+            chunk = wavs[i] if i < len(wavs) else None
+            if chunk is not None:
+                chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+            chunks.append(chunk if chunk is not None and len(chunk) else None)
+        yield chunks
 
 
 # ---------------------------------------------------------------------------
@@ -679,25 +725,11 @@ def _get_cosyvoice_status() -> dict:
     }
 
 
-def generate_audio_cosyvoice(
-    text: str,
-    voice: Optional[str] = None,
-    target_sample_rate: int = 16000,
-    emotion: str = "neutral",
-) -> bytes:
-    """
-    使用 CosyVoice 2 生成音频（SFT 预置音色模式）。
-    
-    Args:
-        text: 要转换的文本
-        voice: 预置音色名（如 '中文女' / '中文男'，见 COSYVOICE_VOICES）
-        target_sample_rate: 目标采样率
-        emotion: 保留参数（CosyVoice2 支持指令式情感，此处不强制）
+COSYVOICE_SAMPLE_RATE = 24000
 
-    Returns:
-        WAV格式的音频数据
-    """
-    import numpy as np
+
+def _prepare_cosyvoice(voice: Optional[str]):
+    """加载 CosyVoice2 模型并解析 SFT 音色，返回 (model, spk_id)"""
     from bookroom_audio.api.routers.tts.constants import COSYVOICE_VOICES
 
     model = _get_cosyvoice_model()
@@ -716,34 +748,73 @@ def generate_audio_cosyvoice(
             spk_id = spks[0]
     except Exception:
         pass
+    return model, spk_id
+
+
+def _cosyvoice_chunk(tts_speech) -> np.ndarray:
+    """tts_speech（[1, T] torch.Tensor）→ 单声道 float32 样本"""
+    wav_np = np.asarray(tts_speech.cpu().numpy() if hasattr(tts_speech, "cpu") else tts_speech, dtype=np.float32)
+    wav_np = wav_np.squeeze()
+    if wav_np.ndim > 1:
+        wav_np = wav_np.mean(axis=0)
+    return wav_np.reshape(-1)
+
+
+def generate_audio_cosyvoice(
+    text: str,
+    voice: Optional[str] = None,
+    target_sample_rate: int = 16000,
+    emotion: str = "neutral",
+) -> bytes:
+    """
+    使用 CosyVoice 2 生成音频（SFT 预置音色模式）。
+    
+    Args:
+        text: 要转换的文本
+        voice: 预置音色名（如 '中文女' / '中文男'，见 COSYVOICE_VOICES）
+        target_sample_rate: 目标采样率
+        emotion: 保留参数（CosyVoice2 支持指令式情感，此处不强制）
+
+    Returns:
+        WAV格式的音频数据
+    """
+    text = normalize_text(text, "cosyvoice")
+    model, spk_id = _prepare_cosyvoice(voice)
 
     # SFT 推理（非流式，返回 chunks）
     chunks = []
     for out in model.inference_sft(tts_text=text, spk_id=spk_id, stream=False):
-        chunks.append(out["tts_speech"])
+        chunks.append(_cosyvoice_chunk(out["tts_speech"]))
 
     if not chunks:
         raise Exception("CosyVoice2 generated no audio chunks")
 
-    # 拼接 → float32 [-1,1] → int16 → WAV（模型固定 24000Hz）
-    import torch
-    wav = torch.cat(chunks, dim=1)
-    wav_np = wav.numpy().squeeze()
-    if wav_np.ndim > 1:
-        wav_np = wav_np.mean(axis=0)
-    wav_int16 = (np.clip(wav_np, -1.0, 1.0) * 32767).astype(np.int16)
-
-    audio = AudioSegment(
-        data=wav_int16.tobytes(),
-        sample_width=2,
-        frame_rate=getattr(model, "sample_rate", 24000),
-        channels=1,
+    # 拼接 → 目标采样率 WAV（模型固定 24000Hz）
+    return to_wav(
+        np.concatenate(chunks),
+        getattr(model, "sample_rate", COSYVOICE_SAMPLE_RATE),
+        target_sample_rate,
     )
-    audio = audio.set_frame_rate(target_sample_rate)
 
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
-    return out_buf.getvalue()
+
+def iter_audio_cosyvoice(
+    text: str,
+    voice: Optional[str] = None,
+) -> Iterator[np.ndarray]:
+    """
+    使用 CosyVoice 2 流式生成音频（inference_sft(stream=True)），每个 tts_speech 块到达即产出，
+    首包约 1.5s，无需等整段合成结束。
+
+    Yields:
+        24kHz 单声道 float32 样本块（同步生成器，放线程池逐块推进）
+    """
+    text = normalize_text(text, "cosyvoice")
+    model, spk_id = _prepare_cosyvoice(voice)
+
+    for out in model.inference_sft(tts_text=text, spk_id=spk_id, stream=True):
+        chunk = _cosyvoice_chunk(out["tts_speech"])
+        if len(chunk):
+            yield chunk
 
 
 # ================================================================
@@ -838,92 +909,242 @@ def _get_cosyvoice3_status() -> dict:
     }
 
 
+def _cosyvoice3_prompt_text(reference_text: Optional[str]) -> str:
+    """参考文本：默认官方 system prompt；用户提供时确保含 <|endofprompt|>（CosyVoice3 LLM 硬性要求，缺失会 assert 崩溃）"""
+    prompt_text = reference_text.strip() if reference_text and reference_text.strip() else _COSYVOICE3_DEFAULT_PROMPT
+    if "<|endofprompt|>" not in prompt_text:
+        prompt_text = prompt_text + "<|endofprompt|>"
+    return prompt_text
+
+
+def _decode_reference_audio(reference_audio: Optional[str]) -> bytes:
+    """base64 参考音频 → WAV 字节（缺失 / 非法显式报 ValueError）"""
+    import base64
+
+    if not reference_audio:
+        raise ValueError(
+            "CosyVoice3 引擎需要参考音频（reference_audio，base64 编码 WAV，3~10s 说话人样本）"
+            "或已注册的 voice_id。CosyVoice3 无预置音色，仅支持 zero_shot 音色克隆。"
+        )
+    try:
+        wav_bytes = base64.b64decode(reference_audio)
+    except Exception as e:
+        raise ValueError(f"reference_audio base64 解码失败: {e}")
+    if len(wav_bytes) == 0:
+        raise ValueError("reference_audio 为空")
+    return wav_bytes
+
+
+def _require_cosyvoice3_model():
+    model = _get_cosyvoice3_model()
+    if model is None:
+        raise Exception(
+            "CosyVoice3 model not loaded. 请确认已下载 Fun-CosyVoice3-0.5B-2512 "
+            "（见 MODEL_DOWNLOAD.md / COSYVOICE3_MODEL_DIR 环境变量）"
+        )
+    return model
+
+
+# ----------------------------------------------------------------
+# CosyVoice3 说话人档案：参考音频注册一次得到 voice_id，提取出的 prompt 特征
+# （说话人 embedding + prompt speech token / feat，即 frontend.spk2info 条目）
+# 常驻内存并落盘，之后按 voice_id 合成时跳过参考音频解码与特征提取。
+# 目录下每个档案三个文件：<voice_id>.json（元数据）/ .pt（特征）/ .wav（原始参考音频，
+# 特征文件缺失或与模型不兼容时据此重新提取）
+# ----------------------------------------------------------------
+_cosyvoice3_speakers_lock = threading.Lock()
+_COSYVOICE3_VOICE_ID_RE = re.compile(r"^spk_[0-9a-f]{16}$")
+
+
+def _cosyvoice3_speaker_dir() -> str:
+    """说话人档案目录（环境变量 COSYVOICE3_SPEAKER_DIR 可覆盖，默认 <cache>/cosyvoice3-speakers）"""
+    env_dir = os.getenv("COSYVOICE3_SPEAKER_DIR")
+    if env_dir:
+        return env_dir
+    from bookroom_audio.utils.config import get_config
+    config = get_config()
+    return os.path.join(config.cache.cache_dir, "cosyvoice3-speakers")
+
+
+def _speaker_path(voice_id: str, ext: str) -> str:
+    return os.path.join(_cosyvoice3_speaker_dir(), f"{voice_id}.{ext}")
+
+
+def _extract_cosyvoice3_speaker(model, voice_id: str, prompt_text: str) -> None:
+    """从参考音频提取 prompt 特征写入 model.frontend.spk2info，并落盘"""
+    import torch
+
+    model.add_zero_shot_spk(prompt_text, _speaker_path(voice_id, "wav"), voice_id)
+    torch.save(model.frontend.spk2info[voice_id], _speaker_path(voice_id, "pt"))
+
+
+def get_cosyvoice3_speaker(voice_id: str) -> Optional[dict]:
+    """读取说话人档案元数据；不存在（或 voice_id 非法）返回 None"""
+    if not _COSYVOICE3_VOICE_ID_RE.match(voice_id or ""):
+        return None
+    try:
+        with open(_speaker_path(voice_id, "json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def list_cosyvoice3_speakers() -> list[dict]:
+    """列出已注册的说话人档案（按注册时间排序）"""
+    directory = _cosyvoice3_speaker_dir()
+    if not os.path.isdir(directory):
+        return []
+    speakers = []
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            meta = get_cosyvoice3_speaker(filename[:-len(".json")])
+            if meta is not None:
+                speakers.append(meta)
+    return sorted(speakers, key=lambda meta: meta["created_at"])
+
+
+def register_cosyvoice3_speaker(
+    reference_audio: str,
+    reference_text: Optional[str] = None,
+    name: Optional[str] = None,
+) -> dict:
+    """
+    注册 CosyVoice3 说话人档案：提取一次参考音频的 prompt 特征，返回含 voice_id 的元数据。
+
+    voice_id 由参考音频与参考文本的内容哈希得出，重复注册同一样本直接返回已有档案。
+
+    Raises:
+        ValueError: 参考音频缺失 / base64 非法
+        Exception: 模型未加载 / 特征提取失败
+    """
+    wav_bytes = _decode_reference_audio(reference_audio)
+    prompt_text = _cosyvoice3_prompt_text(reference_text)
+    digest = hashlib.sha256(wav_bytes + b"\0" + prompt_text.encode("utf-8")).hexdigest()
+    voice_id = f"spk_{digest[:16]}"
+
+    existing = get_cosyvoice3_speaker(voice_id)
+    if existing is not None:
+        return existing
+
+    model = _require_cosyvoice3_model()
+    os.makedirs(_cosyvoice3_speaker_dir(), exist_ok=True)
+    with _cosyvoice3_speakers_lock:
+        with open(_speaker_path(voice_id, "wav"), "wb") as f:
+            f.write(wav_bytes)
+        _extract_cosyvoice3_speaker(model, voice_id, prompt_text)
+        meta = {
+            "voice_id": voice_id,
+            "name": name or voice_id,
+            "reference_text": prompt_text,
+            "created_at": int(time.time()),
+            "model": os.path.basename(os.path.normpath(_cosyvoice3_model_dir())),
+        }
+        with open(_speaker_path(voice_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+    logger.info(f"CosyVoice3 speaker registered: {voice_id} ({meta['name']})")
+    return meta
+
+
+def delete_cosyvoice3_speaker(voice_id: str) -> bool:
+    """删除说话人档案（磁盘文件 + 已加载模型中的特征）；不存在返回 False"""
+    if get_cosyvoice3_speaker(voice_id) is None:
+        return False
+    with _cosyvoice3_speakers_lock:
+        for ext in ("json", "pt", "wav"):
+            try:
+                os.remove(_speaker_path(voice_id, ext))
+            except FileNotFoundError:
+                pass
+        if _cosyvoice3_model is not None:
+            _cosyvoice3_model.frontend.spk2info.pop(voice_id, None)
+    return True
+
+
+def _ensure_cosyvoice3_speaker(model, voice_id: str) -> dict:
+    """确保档案特征已在 model.frontend.spk2info 中（首次使用时从磁盘加载），返回元数据"""
+    meta = get_cosyvoice3_speaker(voice_id)
+    if meta is None:
+        raise ValueError(f"Unknown CosyVoice3 voice_id '{voice_id}'，请先通过 POST /v1/tts/speakers 注册参考音频")
+
+    spk2info = model.frontend.spk2info
+    if voice_id not in spk2info:
+        with _cosyvoice3_speakers_lock:
+            if voice_id not in spk2info:
+                import torch
+
+                try:
+                    spk2info[voice_id] = torch.load(
+                        _speaker_path(voice_id, "pt"),
+                        map_location=getattr(model.frontend, "device", "cpu"),
+                    )
+                except Exception as e:
+                    logger.warning(f"CosyVoice3 speaker features for {voice_id} unusable ({e}), re-extracting")
+                    _extract_cosyvoice3_speaker(model, voice_id, meta["reference_text"])
+    return meta
+
+
 def generate_audio_cosyvoice3(
     text: str,
     reference_audio: Optional[str] = None,  # base64 编码的 WAV（说话人音色样本）
     reference_text: Optional[str] = None,   # 参考音频对应文本（prompt_text，可选）
     target_sample_rate: int = 16000,
     emotion: str = "neutral",
+    voice_id: Optional[str] = None,         # 已注册的说话人档案（优先于 reference_audio）
 ) -> bytes:
     """
     使用 CosyVoice 3 生成音频（zero_shot 音色克隆模式）。
 
     Args:
         text: 要转换的文本（tts_text）
-        reference_audio: 参考音频（base64 编码 WAV，3~10s 说话人样本），必填
+        reference_audio: 参考音频（base64 编码 WAV，3~10s 说话人样本）；未提供 voice_id 时必填
         reference_text: 参考音频对应文本，可选；默认官方 system prompt。
             会自动确保含 <|endofprompt|>（CosyVoice3 LLM 硬性要求，缺失会 assert 崩溃）。
         target_sample_rate: 目标采样率
         emotion: 保留参数
+        voice_id: register_cosyvoice3_speaker 返回的档案 id；提供时直接复用缓存的 prompt 特征，
+            忽略 reference_audio / reference_text
 
     Returns:
         WAV 格式音频数据
 
     Raises:
-        ValueError: 缺少参考音频 / base64 非法时显式报错（不静默回退）
+        ValueError: 缺少参考音频 / base64 非法 / voice_id 未注册时显式报错（不静默回退）
         Exception: 模型未加载 / 无输出 / 推理失败（显式报错，不兜底）
     """
-    import base64
-    import numpy as np
+    text = normalize_text(text, "cosyvoice3")
     import tempfile
 
-    if not reference_audio:
-        raise ValueError(
-            "CosyVoice3 引擎需要参考音频（reference_audio，base64 编码 WAV，3~10s 说话人样本）。"
-            "CosyVoice3 无预置音色，仅支持 zero_shot 音色克隆。"
-        )
-
-    model = _get_cosyvoice3_model()
-    if model is None:
-        raise Exception(
-            "CosyVoice3 model not loaded. 请确认已下载 Fun-CosyVoice3-0.5B-2512 "
-            "（见 MODEL_DOWNLOAD.md / COSYVOICE3_MODEL_DIR 环境变量）"
-        )
-
-    # 参考文本：默认官方 system prompt；用户提供时确保含 <|endofprompt|>
-    prompt_text = reference_text.strip() if reference_text and reference_text.strip() else _COSYVOICE3_DEFAULT_PROMPT
-    if "<|endofprompt|>" not in prompt_text:
-        prompt_text = prompt_text + "<|endofprompt|>"
-
-    # base64 -> 临时 wav
-    try:
-        wav_bytes = base64.b64decode(reference_audio)
-    except Exception as e:
-        raise ValueError(f"reference_audio base64 解码失败: {e}")
-    if len(wav_bytes) == 0:
-        raise ValueError("reference_audio 为空")
-
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-        f.write(wav_bytes)
-        tmp_wav = f.name
-    try:
-        chunks = []
-        for out in model.inference_zero_shot(tts_text=text, prompt_text=prompt_text, prompt_wav=tmp_wav, stream=False):
-            chunks.append(out["tts_speech"])
-    finally:
-        os.unlink(tmp_wav)
+    chunks = []
+    if voice_id:
+        model = _require_cosyvoice3_model()
+        meta = _ensure_cosyvoice3_speaker(model, voice_id)
+        for out in model.inference_zero_shot(
+            tts_text=text,
+            prompt_text=meta["reference_text"],
+            prompt_wav="",
+            zero_shot_spk_id=voice_id,
+            stream=False,
+        ):
+            chunks.append(_cosyvoice_chunk(out["tts_speech"]))
+    else:
+        wav_bytes = _decode_reference_audio(reference_audio)
+        model = _require_cosyvoice3_model()
+        prompt_text = _cosyvoice3_prompt_text(reference_text)
+
+        # base64 -> 临时 wav
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+            f.write(wav_bytes)
+            tmp_wav = f.name
+        try:
+            for out in model.inference_zero_shot(tts_text=text, prompt_text=prompt_text, prompt_wav=tmp_wav, stream=False):
+                chunks.append(_cosyvoice_chunk(out["tts_speech"]))
+        finally:
+            os.unlink(tmp_wav)
 
     if not chunks:
         raise Exception("CosyVoice3 generated no audio chunks")
 
-    import torch
-    wav = torch.cat(chunks, dim=1)
-    wav_np = wav.numpy().squeeze()
-    if wav_np.ndim > 1:
-        wav_np = wav_np.mean(axis=0)
-    wav_int16 = (np.clip(wav_np, -1.0, 1.0) * 32767).astype(np.int16)
-
-    audio = AudioSegment(
-        data=wav_int16.tobytes(),
-        sample_width=2,
-        frame_rate=getattr(model, "sample_rate", 24000),
-        channels=1,
-    )
-    audio = audio.set_frame_rate(target_sample_rate)
-
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
-    return out_buf.getvalue()
+    return to_wav(np.concatenate(chunks), getattr(model, "sample_rate", 24000), target_sample_rate)
 
 
 # ================================================================
@@ -934,7 +1155,9 @@ def generate_audio_cosyvoice3(
 # HF_ENDPOINT（项目 HF_ENDPOINT 指向 modelscope，会破坏 kokoro 的 HF 下载）。
 # 引擎名：kokoro。失败显式报错，绝不静默兜底到其它引擎。
 # ================================================================
+_kokoro_models: dict = {}      # repo_id -> KModel（同一权重仓库的各语言 pipeline 共用一份）
 _kokoro_pipelines: dict = {}   # lang_code -> KPipeline
+_kokoro_voices: dict = {}      # (repo_id, 音色 / 逗号混合音色) -> 音色张量（已在模型设备上）
 _kokoro_lock = threading.Lock()
 
 
@@ -948,6 +1171,23 @@ def _kokoro_hf_home() -> str:
     return os.path.join(config.cache.cache_dir, "kokoro-hf")
 
 
+@contextmanager
+def _kokoro_hf_env():
+    """kokoro 权重 / 音色走 HF 下载；项目 HF_ENDPOINT 指向 modelscope 会破坏下载，
+    此处临时接管，结束后恢复。"""
+    saved = {k: os.environ.get(k) for k in ("HF_ENDPOINT", "HF_HOME")}
+    os.environ["HF_ENDPOINT"] = os.getenv("KOKORO_HF_ENDPOINT", "https://hf-mirror.com")
+    os.environ["HF_HOME"] = _kokoro_hf_home()
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
 def _check_kokoro_available() -> bool:
     """检查 Kokoro 是否可用（kokoro 包可导入即可；权重首次运行时自动下载）"""
     try:
@@ -965,41 +1205,120 @@ def _kokoro_repo_id(lang_code: str) -> str:
     return os.getenv("KOKORO_REPO_ID", "hexgrad/Kokoro-82M")
 
 
+def _kokoro_device() -> str:
+    """与 KPipeline 默认一致：有 CUDA 用 CUDA，否则 CPU"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _get_kokoro_model(repo_id: str):
+    """获取/加载指定权重仓库的 KModel（调用方持有 _kokoro_lock）"""
+    model = _kokoro_models.get(repo_id)
+    if model is None:
+        from kokoro import KModel
+        logger.info(f"Loading Kokoro model (repo={repo_id})...")
+        model = KModel(repo_id=repo_id).to(_kokoro_device()).eval()
+        _kokoro_models[repo_id] = model
+    return model
+
+
 def _get_kokoro_pipeline(lang_code: str):
-    """获取/加载指定语言的 Kokoro pipeline（线程安全懒加载；临时接管 HF 环境变量）"""
+    """获取/加载指定语言的 Kokoro pipeline（线程安全懒加载；临时接管 HF 环境变量）。
+    同一权重仓库的各语言 pipeline 注入同一个 KModel，不重复加载 82M 权重。"""
     if lang_code not in _kokoro_pipelines:
         with _kokoro_lock:
             if lang_code not in _kokoro_pipelines:
-                logger.info(f"Loading Kokoro pipeline (lang={lang_code}, repo={_kokoro_repo_id(lang_code)})...")
-                # kokoro 权重走 HF 下载；项目 HF_ENDPOINT 指向 modelscope 会破坏下载，
-                # 此处临时接管，加载完成后恢复。
-                saved = {k: os.environ.get(k) for k in ("HF_ENDPOINT", "HF_HOME")}
-                os.environ["HF_ENDPOINT"] = os.getenv("KOKORO_HF_ENDPOINT", "https://hf-mirror.com")
-                os.environ["HF_HOME"] = _kokoro_hf_home()
-                try:
-                    from kokoro import KPipeline
-                    _kokoro_pipelines[lang_code] = KPipeline(
-                        lang_code=lang_code,
-                        repo_id=_kokoro_repo_id(lang_code),
-                    )
-                    logger.info(f"Kokoro pipeline loaded (lang={lang_code})")
-                except Exception:
-                    logger.exception(f"Kokoro pipeline load failed (lang={lang_code})")
-                    raise
-                finally:
-                    for k, v in saved.items():
-                        if v is None:
-                            os.environ.pop(k, None)
-                        else:
-                            os.environ[k] = v
+                repo_id = _kokoro_repo_id(lang_code)
+                logger.info(f"Loading Kokoro pipeline (lang={lang_code}, repo={repo_id})...")
+                with _kokoro_hf_env():
+                    try:
+                        from kokoro import KPipeline
+                        pipeline = KPipeline(
+                            lang_code=lang_code,
+                            repo_id=repo_id,
+                            model=_get_kokoro_model(repo_id),
+                        )
+                        # 非英文 G2P 返回 (音素串, None)，可按句共享；英文 tokens 合成时会被写入时间戳，不缓存
+                        if lang_code not in ("a", "b") and getattr(pipeline, "g2p", None) is not None:
+                            pipeline.g2p = memoize_g2p(pipeline.g2p)
+                        _kokoro_pipelines[lang_code] = pipeline
+                        logger.info(f"Kokoro pipeline loaded (lang={lang_code})")
+                    except Exception:
+                        logger.exception(f"Kokoro pipeline load failed (lang={lang_code})")
+                        raise
     return _kokoro_pipelines[lang_code]
 
 
+def _get_kokoro_voice(lang_code: str, voice: str):
+    """
+    音色张量缓存：同一权重仓库的各 pipeline 共用，每个音色只下载 / 加载一次；
+    逗号分隔的混合音色（如 'zf_001,zf_002'）取各音色均值，结果同样缓存。
+    """
+    repo_id = _kokoro_repo_id(lang_code)
+    key = (repo_id, voice)
+    pack = _kokoro_voices.get(key)
+    if pack is not None:
+        return pack
+
+    pipeline = _get_kokoro_pipeline(lang_code)
+    with _kokoro_lock:
+        pack = _kokoro_voices.get(key)
+        if pack is None:
+            names = [v.strip() for v in voice.split(",") if v.strip()]
+            if not names:
+                raise ValueError(f"Invalid Kokoro voice: {voice!r}")
+            packs = []
+            for name in names:
+                single = _kokoro_voices.get((repo_id, name))
+                if single is None:
+                    with _kokoro_hf_env():
+                        single = pipeline.load_single_voice(name).to(pipeline.model.device)
+                    # load_single_voice 会在 pipeline 上另存一份引用，清掉以免各 pipeline 各留一份
+                    getattr(pipeline, "voices", {}).pop(name, None)
+                    _kokoro_voices[(repo_id, name)] = single
+                packs.append(single)
+            pack = packs[0] if len(packs) == 1 else sum(packs) / len(packs)
+            _kokoro_voices[key] = pack
+    return pack
+
+
+def preload_kokoro_voices(voices: Optional[str] = None) -> list[str]:
+    """
+    预加载音色（默认读 KOKORO_PRELOAD_VOICES）：分号或空白分隔，逗号连接为混合音色，
+    如 "zf_001;zm_010;zf_001,zf_002"。会同时加载各音色所需的模型与 pipeline。
+
+    Returns:
+        已加载的音色列表
+    """
+    spec = os.getenv("KOKORO_PRELOAD_VOICES", "") if voices is None else voices
+    loaded = []
+    for voice in re.split(r"[;\s]+", spec.strip()):
+        if voice:
+            _get_kokoro_voice(_kokoro_lang_from_voice(voice), voice)
+            loaded.append(voice)
+    if loaded:
+        logger.info(f"Kokoro voices preloaded: {', '.join(loaded)}")
+    return loaded
+
+
+def _kokoro_memory() -> dict:
+    """已加载模型参数与音色张量的内存占用（MB）"""
+    mb = 1024 * 1024
+    models = {
+        repo_id: round(sum(p.nbytes for p in model.parameters()) / mb, 1)
+        for repo_id, model in _kokoro_models.items()
+    }
+    voices = sum(pack.nbytes for pack in _kokoro_voices.values())
+    return {"models_mb": models, "voices_cached": len(_kokoro_voices), "voices_mb": round(voices / mb, 2)}
+
+
 def _kokoro_status() -> dict:
     """获取 Kokoro 状态信息"""
     return {
         "available": _check_kokoro_available(),
         "model_loaded": len(_kokoro_pipelines) > 0,
+        "pipelines": sorted(_kokoro_pipelines),
+        "memory": _kokoro_memory(),
         "weights_home": _kokoro_hf_home(),
         "description": "Kokoro-82M - hexgrad 开源 TTS（Apache 2.0 可商用），82M 极轻量；中文用 v1.1-zh 优化版",
         "features": [
@@ -1034,42 +1353,48 @@ def _kokoro_timestamps(phonemes: str, pred_dur, sample_rate: int = 24000) -> lis
     Returns:
         词级时间戳列表：[{"text": str, "start_ms": float, "end_ms": float}, ...]
     """
-    import numpy as np
+    return kokoro_timeline(phonemes, pred_dur).to_words(2)
 
-    pd = np.asarray(pred_dur, dtype=np.float64)
-    if len(pd) < 3:  # 至少 <bos>, 一个音素, <eos>
-        return []
 
-    DIV = 80.0  # 半帧/秒（1 pred_dur 帧 = 600 samples @24kHz = 2 half-frames）
-    words = []
-    # 半帧游标：left=词起点，right=词尾（含空格半切），初始对齐官方 bos 偏移
-    left = right = 2.0 * max(0.0, pd[0] - 3.0)
-    i = 1
-    cur = None
-    for ch in phonemes:
-        if i >= len(pd) - 1:  # 保留最后一个 <eos>
-            break
-        if ch == " ":
-            if cur is not None:
-                cur["end_ms"] = round((left / DIV) * 1000.0, 2)
-                words.append(cur)
-                cur = None
-            # 空格半切：前半已计入前词 end（left），后半作为后词起点
-            left = right + pd[i]
-            right = left + pd[i]
-            i += 1
+KOKORO_SAMPLE_RATE = 24000
+
+
+def iter_audio_kokoro(
+    text: str,
+    voice: Optional[str] = None,
+    return_timestamps: bool = False,
+) -> Iterator[tuple[np.ndarray, list]]:
+    """
+    使用 Kokoro 逐句生成音频：pipeline 每产出一个结果（一句 / 一个切分段）即返回，不等整段合成结束。
+
+    Yields:
+        (24kHz 单声道 float32 样本, 该段字级时间戳)；时间戳已加上前面各段的累计时长，
+        return_timestamps=False 时为空列表（同步生成器，放线程池逐段推进）
+
+    Raises:
+        Exception: 模型未加载 / 音色不存在（显式报错，不兜底）
+    """
+    text = normalize_text(text, "kokoro")
+    voice = (voice or "zf_001").strip()
+    lang_code = _kokoro_lang_from_voice(voice)
+
+    pipeline = _get_kokoro_pipeline(lang_code)  # 失败向上抛（路由层转 500）
+    pack = _get_kokoro_voice(lang_code, voice)
+
+    audio_offset_ms = 0.0
+    for result in pipeline(text, voice=pack, speed=1.0):
+        audio = result.audio
+        if audio is None:
             continue
-        if cur is None:
-            cur = {"text": ch, "start_ms": round((right / DIV) * 1000.0, 2), "end_ms": 0.0}
-        else:
-            cur["text"] += ch
-        left = right + 2.0 * pd[i]
-        right = left
-        cur["end_ms"] = round((left / DIV) * 1000.0, 2)
-        i += 1
-    if cur is not None:
-        words.append(cur)
-    return words
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        words = []
+        if return_timestamps:
+            pred_dur = getattr(result, "pred_dur", None)
+            phonemes = getattr(result, "phonemes", None)
+            if pred_dur is not None and phonemes:
+                words = kokoro_timeline(phonemes, pred_dur).shift(audio_offset_ms).to_words(2)
+        audio_offset_ms += (len(audio) / KOKORO_SAMPLE_RATE) * 1000.0
+        yield audio, words
 
 
 def generate_audio_kokoro(
@@ -1100,45 +1425,16 @@ def generate_audio_kokoro(
     Raises:
         Exception: 模型未加载 / 无输出 / 音色不存在（显式报错，不兜底）
     """
-    import numpy as np
-
-    voice = (voice or "zf_001").strip()
-    lang_code = _kokoro_lang_from_voice(voice)
-
-    pipeline = _get_kokoro_pipeline(lang_code)  # 失败向上抛（路由层转 500）
-
     chunks = []
     words = []
-    sample_rate = 24000
-    audio_offset_ms = 0.0
-    for result in pipeline(text, voice=voice, speed=1.0):
-        chunks.append(result.audio)
-        if return_timestamps:
-            pred_dur = getattr(result, "pred_dur", None)
-            phonemes = getattr(result, "phonemes", None)
-            if pred_dur is not None and phonemes:
-                for w in _kokoro_timestamps(phonemes, pred_dur, sample_rate):
-                    w["start_ms"] = round(w["start_ms"] + audio_offset_ms, 2)
-                    w["end_ms"] = round(w["end_ms"] + audio_offset_ms, 2)
-                    words.append(w)
-        audio_offset_ms += (len(result.audio) / sample_rate) * 1000.0
+    for audio, chunk_words in iter_audio_kokoro(text, voice, return_timestamps):
+        chunks.append(audio)
+        words.extend(chunk_words)
 
     if not chunks:
         raise Exception("Kokoro generated no audio chunks")
 
-    wav_np = np.concatenate(chunks)
-    wav_int16 = (np.clip(wav_np, -1.0, 1.0) * 32767).astype(np.int16)
-
-    audio = AudioSegment(
-        data=wav_int16.tobytes(),
-        sample_width=2,
-        frame_rate=sample_rate,
-        channels=1,
-    )
-    audio = audio.set_frame_rate(target_sample_rate)
-
-    out_buf = io.BytesIO()
-    audio.export(out_buf, format="wav")
+    wav = to_wav(np.concatenate(chunks), KOKORO_SAMPLE_RATE, target_sample_rate)
     if return_timestamps:
-        return out_buf.getvalue(), words
-    return out_buf.getvalue()
\ No newline at end of file
+        return wav, words
+    return wav
@@ -0,0 +1,162 @@
+"""
+长文本并行合成
+
+整章 TTSRequest.text 作为一次调用顺序合成时，只能用满单次模型调用的线程数。长文本模式：
+按句切分并打包为不超过 TTS_SEGMENT_CHARS 字的段，各段并发交给引擎 worker 合成，
+按原顺序以短交叉淡化（TTS_CROSSFADE_MS）拼接；某段就绪且其前面各段均已输出时立即输出。
+
+- 引擎 worker 池按引擎全局共享（每引擎最多 TTS_PARALLEL_WORKERS 段同时合成），跨请求生效
+- engine=auto 只在整段文本上选一次引擎，各段不会因语种不同落到不同引擎
+- 每段仍经各引擎原有合成函数（ChatTTS 开启合批时，同时在飞的段会合并为一次 infer）
+- TTS_PARALLEL_WORKERS<=1（默认）关闭
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import numpy as np
+
+from bookroom_audio.api.routers.tts.audio_output import wav_bytes, wav_samples
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.api.routers.tts.text_frontend import split_sentences
+from bookroom_audio.api.routers.tts.utils import select_engine
+
+# 单段合成：(请求) -> (WAV 音频数据, 实际使用的引擎, 字级时间戳)
+SegmentSynthesizer = Callable[[TTSRequest], Awaitable[tuple[bytes, str, Optional[list]]]]
+
+_engine_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def _long_text_config():
+    from bookroom_audio.utils.config import get_config
+
+    return get_config().model
+
+
+def split_segments(text: str, max_chars: int) -> list[str]:
+    """按句切分后贪心打包：相邻句合并到不超过 max_chars 字（单句超长时独立成段）"""
+    segments: list[str] = []
+    current = ""
+    for sentence in split_sentences(text):
+        if current and len(current) + len(sentence) > max_chars:
+            segments.append(current)
+            current = ""
+        # 只在两侧都是 ASCII 字符（英文等以空格分词的文本）时补回句间空格，由衔接处的字符决定
+        needs_space = current and current[-1].isascii() and sentence[0].isascii()
+        current = f"{current} {sentence}" if needs_space else current + sentence
+    if current:
+        segments.append(current)
+    return segments
+
+
+def use_long_text_mode(request: TTSRequest) -> bool:
+    """开启并行合成（TTS_PARALLEL_WORKERS>1）且文本超过一段长度时走长文本模式"""
+    config = _long_text_config()
+    return config.tts_parallel_workers > 1 and len(request.text) > config.tts_segment_chars
+
+
+def _engine_slot(engine: str, workers: int) -> asyncio.Semaphore:
+    slot = _engine_slots.get(engine)
+    if slot is None:
+        slot = asyncio.Semaphore(workers)
+        _engine_slots[engine] = slot
+    return slot
+
+
+class SegmentStitcher:
+    """按序拼接各段：保留上一段末尾 fade 个样本，与下一段开头线性交叉淡化后再输出"""
+
+    def __init__(self, fade: int) -> None:
+        self.fade = max(0, fade)
+        self.position = 0  # 已输出样本数
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def push(self, samples: np.ndarray) -> tuple[np.ndarray, int]:
+        """
+        Returns:
+            (可立即输出的样本, 本段首样本在输出流中的位置)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        overlap = min(len(self._tail), len(samples))
+        start = self.position + len(self._tail) - overlap
+
+        if overlap:
+            ramp = np.linspace(0.0, 1.0, overlap + 2, dtype=np.float32)[1:-1]
+            mixed = self._tail[-overlap:] * (1.0 - ramp) + samples[:overlap] * ramp
+            body = np.concatenate([self._tail[:-overlap], mixed, samples[overlap:]])
+        else:
+            body = np.concatenate([self._tail, samples])
+
+        keep = min(self.fade, len(body))
+        out, self._tail = body[:len(body) - keep], body[len(body) - keep:]
+        self.position += len(out)
+        return out, start
+
+    def close(self) -> np.ndarray:
+        tail, self._tail = self._tail, np.zeros(0, dtype=np.float32)
+        self.position += len(tail)
+        return tail
+
+
+def _shift_words(words: Optional[list], offset_ms: float) -> list:
+    return [
+        {**w, "start_ms": round(w["start_ms"] + offset_ms, 1), "end_ms": round(w["end_ms"] + offset_ms, 1)}
+        for w in words or []
+    ]
+
+
+async def iter_long_text(
+    request: TTSRequest,
+    synthesize: SegmentSynthesizer,
+) -> AsyncIterator[tuple[np.ndarray, list]]:
+    """
+    并行合成各段并按序产出 (目标采样率 float32 样本块, 已加偏移的字级时间戳)。
+    迭代提前结束（客户端断开 / 出错）时取消尚未完成的段。
+    """
+    config = _long_text_config()
+    engine = select_engine(request.engine, request.text)
+    segments = split_segments(request.text, config.tts_segment_chars)
+    slot = _engine_slot(engine, config.tts_parallel_workers)
+
+    async def run(text: str) -> tuple[np.ndarray, Optional[list]]:
+        segment = request.model_copy(update={"text": text, "engine": engine, "stream": False})
+        async with slot:
+            audio_data, _, words = await synthesize(segment)
+        samples, sample_rate = await asyncio.to_thread(wav_samples, audio_data)
+        if sample_rate != request.sample_rate:
+            raise ValueError(f"Segment sample rate {sample_rate} != requested {request.sample_rate}")
+        return samples, words
+
+    tasks = [asyncio.create_task(run(text)) for text in segments]
+    stitcher = SegmentStitcher(int(request.sample_rate * config.tts_crossfade_ms / 1000))
+    try:
+        for task in tasks:
+            samples, words = await task
+            out, start = stitcher.push(samples)
+            yield out, _shift_words(words, start * 1000.0 / request.sample_rate)
+        yield stitcher.close(), []
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def synthesize_long_text(
+    request: TTSRequest,
+    synthesize: SegmentSynthesizer,
+) -> tuple[bytes, str, Optional[list]]:
+    """
+    非流式长文本合成：收齐各段拼接为一个 WAV。
+
+    Returns:
+        (WAV 音频数据, 实际使用的引擎, 字级时间戳；仅 kokoro 且 return_timestamps 时非 None)
+    """
+    chunks: list[np.ndarray] = []
+    words: list = []
+    async for samples, segment_words in iter_long_text(request, synthesize):
+        chunks.append(samples)
+        words.extend(segment_words)
+    audio_data = await asyncio.to_thread(wav_bytes, np.concatenate(chunks), request.sample_rate)
+    engine = select_engine(request.engine, request.text)
+    has_words = request.return_timestamps and engine == "kokoro"
+    return audio_data, engine, words if has_words else None
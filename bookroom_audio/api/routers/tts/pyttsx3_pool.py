@@ -0,0 +1,288 @@
+"""
+pyttsx3 进程池
+
+pyttsx3 驱动（espeak / SAPI5 / NSSS）持有进程级全局状态，同一进程内不能并发合成；线程本地引擎
+跑在 asyncio 默认线程池上时，各调用互相改写全局属性，还长时间占用默认 executor。
+开启 PYTTSX3_WORKERS 后改由一组常驻子进程合成，每个进程持有一个引擎实例：
+
+- 任务经共享的 multiprocessing 队列分发，空闲 worker 取下一个
+- 结果（目标采样率 WAV）写入 multiprocessing.shared_memory，结果队列只传段名与长度，
+  主进程拷出后立即释放
+- 驱动只能写文件：worker 在 /dev/shm（可用时）复用一个固定的输出文件，主进程不读写临时文件
+- 主进程一个收结果线程按任务 id 唤醒等待中的协程，不占用 asyncio 默认线程池
+- worker 异常退出时，其正在处理的任务以异常结束并补起新 worker
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+from bookroom_audio.utils.utils_api import logger
+
+# worker 内的合成函数：(text, voice_id, rate, volume, target_sample_rate) -> WAV 字节
+Synthesizer = Callable[[str, Optional[str], int, float, int], bytes]
+
+# 收结果线程检查 worker 存活的间隔（秒）
+_HEALTH_CHECK_INTERVAL = 0.5
+
+
+def _scratch_dir() -> str:
+    shm_dir = "/dev/shm"
+    if os.path.isdir(shm_dir) and os.access(shm_dir, os.W_OK):
+        return shm_dir
+    return tempfile.gettempdir()
+
+
+def pyttsx3_backend() -> Synthesizer:
+    """worker 启动时调用：创建本进程的 pyttsx3 引擎与固定输出文件"""
+    import pyttsx3
+
+    from bookroom_audio.api.routers.tts.engines import pyttsx3_synthesize
+
+    engine = pyttsx3.init()
+    output_path = os.path.join(_scratch_dir(), f"bookroom-pyttsx3-{os.getpid()}.wav")
+
+    def synthesize(text, voice_id, rate, volume, target_sample_rate):
+        try:
+            return pyttsx3_synthesize(engine, text, output_path, voice_id, rate, volume, target_sample_rate)
+        finally:
+            # 每个任务后删除，避免下一个任务误读到上一次的输出
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+
+    return synthesize
+
+
+def _worker_main(index: int, jobs, results, running, backend: Callable[[], Synthesizer]) -> None:
+    """worker 进程入口：初始化引擎后循环取任务，收到 None 退出
+
+    当前任务 id 同步写入共享数组 running（而非经结果队列：进程崩溃时队列里尚未发出的消息会丢失），
+    主进程据此让崩溃 worker 手上的任务失败。
+    """
+    try:
+        synthesize = backend()
+    except Exception as e:  # noqa: BLE001
+        results.put(("failed", index, f"{type(e).__name__}: {e}"))
+        return
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, args = job
+        running[index] = job_id
+        try:
+            data = synthesize(*args)
+            segment = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+            segment.buf[:len(data)] = data
+            results.put(("done", job_id, segment.name, len(data)))
+            segment.close()
+        except Exception as e:  # noqa: BLE001
+            results.put(("error", job_id, f"{type(e).__name__}: {e}"))
+
+
+class Pyttsx3ProcessPool:
+    """常驻 pyttsx3 worker 进程池（首个任务到达时启动）"""
+
+    def __init__(
+        self,
+        workers: int,
+        backend: Callable[[], Synthesizer] = pyttsx3_backend,
+        context: str = "spawn",
+    ) -> None:
+        self.workers = max(1, workers)
+        self._backend = backend
+        self._ctx = multiprocessing.get_context(context)
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._processes: list = [None] * self.workers
+        self._failed: dict[int, str] = {}  # 引擎初始化失败的 worker -> 错误
+        self._running = self._ctx.Array("q", self.workers, lock=False)  # worker -> 最近领取的任务 id
+        self._pending: dict[int, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _spawn(self, index: int) -> None:
+        self._running[index] = 0
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self._jobs, self._results, self._running, self._backend),
+            name=f"pyttsx3-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+    def start(self) -> None:
+        with self._lock:
+            if self._collector is not None:
+                return
+            for index in range(self.workers):
+                self._spawn(index)
+            self._collector = threading.Thread(target=self._collect, name="pyttsx3-pool-results", daemon=True)
+            self._collector.start()
+        logger.info(f"pyttsx3 process pool started with {self.workers} workers")
+
+    async def synthesize(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        rate: int = 200,
+        volume: float = 1.0,
+        target_sample_rate: int = 16000,
+    ) -> bytes:
+        """提交一个合成任务并等待 WAV 结果"""
+        if self._closed:
+            raise RuntimeError("pyttsx3 process pool is shut down")
+        self.start()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        job_id = next(self._ids)
+        with self._lock:
+            self._pending[job_id] = (loop, future)
+        self._jobs.put((job_id, (text, voice_id, rate, volume, target_sample_rate)))
+        try:
+            return await future
+        finally:
+            with self._lock:
+                self._pending.pop(job_id, None)
+
+    def _settle(self, job_id: int, result: Optional[bytes] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+        if entry is None:  # 等待方已取消
+            return
+        loop, future = entry
+
+        def settle() -> None:
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+        try:
+            loop.call_soon_threadsafe(settle)
+        except RuntimeError:  # 事件循环已关闭
+            pass
+
+    def _handle(self, message: tuple) -> None:
+        kind = message[0]
+        if kind == "failed":
+            _, index, error = message
+            logger.error(f"pyttsx3 worker {index} failed to initialize: {error}")
+            self._failed[index] = error
+            return
+
+        job_id = message[1]
+        if kind == "error":
+            self._settle(job_id, error=message[2])
+            return
+
+        _, _, name, size = message
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            data = bytes(segment.buf[:size])
+        finally:
+            segment.close()
+            segment.unlink()
+        self._settle(job_id, result=data)
+
+    def _check_workers(self) -> None:
+        for index, process in enumerate(self._processes):
+            if process is None or process.is_alive() or self._closed:
+                continue
+            # 已完成的任务不在 _pending 中，_settle 为空操作
+            job_id = self._running[index]
+            if job_id:
+                self._settle(job_id, error=f"pyttsx3 worker exited with code {process.exitcode}")
+            if index in self._failed:
+                self._processes[index] = None
+            else:
+                logger.warning(f"pyttsx3 worker {index} exited with code {process.exitcode}, restarting")
+                self._spawn(index)
+
+        # 所有 worker 都无法初始化引擎：排队中的任务不会再被处理
+        if all(process is None for process in self._processes):
+            error = next(iter(self._failed.values()), "no pyttsx3 workers")
+            with self._lock:
+                job_ids = list(self._pending)
+            for job_id in job_ids:
+                self._settle(job_id, error=f"pyttsx3 workers unavailable: {error}")
+
+    def _collect(self) -> None:
+        next_check = time.monotonic() + _HEALTH_CHECK_INTERVAL
+        while not self._closed:
+            try:
+                self._handle(self._results.get(timeout=_HEALTH_CHECK_INTERVAL))
+            except queue.Empty:
+                pass
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"pyttsx3 pool result handling failed: {e}", exc_info=True)
+            if time.monotonic() >= next_check:
+                # 先处理完已到达的消息（worker 退出前写出的结果 / 初始化失败），再判断存活
+                try:
+                    while True:
+                        self._handle(self._results.get_nowait())
+                except queue.Empty:
+                    pass
+                self._check_workers()
+                next_check = time.monotonic() + _HEALTH_CHECK_INTERVAL
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """通知 worker 退出并回收；未完成的任务以异常结束"""
+        if self._closed:
+            return
+        self._closed = True
+        for process in self._processes:
+            if process is not None:
+                self._jobs.put(None)
+        for process in self._processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout)
+        if self._collector is not None:
+            self._collector.join(timeout)
+        with self._lock:
+            job_ids = list(self._pending)
+        for job_id in job_ids:
+            self._settle(job_id, error="pyttsx3 process pool is shut down")
+
+
+_pool: Optional[Pyttsx3ProcessPool] = None
+
+
+def get_pyttsx3_pool() -> Optional[Pyttsx3ProcessPool]:
+    """全局 pyttsx3 进程池；PYTTSX3_WORKERS<=0（默认）时返回 None，走线程本地引擎"""
+    global _pool
+    if _pool is None:
+        from bookroom_audio.utils.config import get_config
+
+        workers = get_config().model.pyttsx3_workers
+        if workers > 0:
+            _pool = Pyttsx3ProcessPool(workers)
+    return _pool
+
+
+def shutdown_pyttsx3_pool() -> None:
+    """应用关闭时回收 worker 进程"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -2,7 +2,7 @@
 TTS schemas - Pydantic models for TTS requests and responses.
 """
 
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -12,7 +12,7 @@ class TTSRequest(BaseModel):
     
     Attributes:
         text: 需要转换的文本内容。
-        voice_id: 可选的声音 ID 或名称（兼容旧版）。
+        voice_id: 可选的声音 ID 或名称（兼容旧版）；cosyvoice3 时为已注册的说话人档案 id。
         voice: 声音名称，支持中文和英文（新版）。
         rate: 语速，支持整数(WPM)或百分比格式。
         volume: 音量，支持0.0-1.0浮点数或百分比格式。
@@ -21,10 +21,12 @@ class TTSRequest(BaseModel):
         emotion: 情感类型（仅ChatTTS支持），可选: happy, sad, angry, neutral。
         reference_audio: （仅 cosyvoice3）参考音频 base64（WAV，3~10s 说话人样本），必填。
         reference_text: （仅 cosyvoice3）参考音频对应文本，可选；默认官方 system prompt。
+        stream: （仅 kokoro / cosyvoice）逐块流式返回，首块合成完即开始输出。
+        timestamp_format: 时间戳输出格式，json（逐词对象）或 binary（紧凑二进制时间线，base64）。
     """
 
     text: str = Field(..., description="Text content to convert to speech")
-    voice_id: Optional[str] = Field(None, description="Voice ID or name (legacy parameter, use voice instead)")
+    voice_id: Optional[str] = Field(None, description="Voice ID or name (legacy parameter, use voice instead). For CosyVoice3: registered speaker id from POST /v1/tts/speakers, replaces reference_audio")
     voice: Optional[str] = Field(None, description="Voice name. For ChatTTS: use voice index (0-10). For CosyVoice 2: 中文女/中文男/英文女/英文男 等预置音色. For Edge TTS: zh-CN-XiaoxiaoNeural, zh-CN-YunxiNeural, etc.")
     rate: Any = Field(200, description="Speech rate. Integer (WPM) or percentage format (e.g., +10%, -20%)")
     volume: Any = Field(1.0, description="Volume level. Float between 0.0-1.0 or percentage format (e.g., 50%, 100%)")
@@ -34,6 +36,23 @@ class TTSRequest(BaseModel):
     reference_audio: Optional[str] = Field(None, description="(cosyvoice3 only) Reference audio as base64 WAV (3-10s speaker sample), required for zero-shot cloning")
     reference_text: Optional[str] = Field(None, description="(cosyvoice3 only) Text of the reference audio (prompt_text), optional; default official system prompt")
     return_timestamps: bool = Field(False, description="(kokoro only) 返回字级时间戳：true 时响应为 JSON {audio(base64), words:[{text,start_ms,end_ms}]}（用于 viseme 口型驱动）；false（默认）返回纯 WAV。Kokoro 基于 pred_dur 音素时长累计，原生可得")
+    stream: bool = Field(False, description="(kokoro / cosyvoice only) 逐块流式返回：Kokoro 每句、CosyVoice2 每个 stream=True 块合成完立即输出，不等整段结束。return_timestamps=false 时为长度未知的流式 WAV；true（kokoro）时为 SSE，每句先 words（已含累计偏移）再 audio（WAV 字节 base64，按序拼接即完整 WAV），最后 end。流式结果不经合成缓存。长文本并行合成开启（TTS_PARALLEL_WORKERS>1）时任意引擎的长文本按段依次流式输出")
+    timestamp_format: Literal["json", "binary"] = Field("json", description="字级时间戳输出格式（return_timestamps 及 /v1/tts/stream）：json（默认）为 words:[{text,start_ms,end_ms}]；binary 为 timeline（二进制时间线 base64：16 字节头 magic BKTL/版本/单元数/字符串表长度 + int32 start_ms[] + int32 end_ms[] + uint32 字符串表字节偏移[n+1] + UTF-8 字符串表，小端），章节级长文本体积与解析开销远小于逐词 JSON")
+
+
+class SpeakerRegisterRequest(BaseModel):
+    """
+    CosyVoice3 说话人档案注册参数。
+
+    Attributes:
+        reference_audio: 参考音频 base64（WAV，3~10s 说话人样本）。
+        reference_text: 参考音频对应文本，可选；默认官方 system prompt。
+        name: 档案显示名，可选；默认为 voice_id。
+    """
+
+    reference_audio: str = Field(..., description="Reference audio as base64 WAV (3-10s speaker sample)")
+    reference_text: Optional[str] = Field(None, description="Text of the reference audio (prompt_text), optional")
+    name: Optional[str] = Field(None, description="Display name of the speaker profile")
 
 
 class VoiceInfo(BaseModel):
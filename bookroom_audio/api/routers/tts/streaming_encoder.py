@@ -0,0 +1,256 @@
+"""
+TTS 流式编码
+把逐块合成的 float32 单声道 PCM 增量编码为 OpenAI TTS 的 response_format，每喂入一块
+即可取出已编码好的字节写入响应，首个可播放字节无需等待整段合成结束。
+
+- mp3 / opus（Ogg 封装）/ aac（ADTS 封装）/ flac：PyAV 编码，输出写入不可 seek 的内存槽，
+  各容器退化为流式写法（不回写文件头中的总长度）
+- wav：先写长度字段为 0xFFFFFFFF 的 RIFF 头（流式 WAV 的通行写法），之后直接输出 16-bit PCM
+- pcm：无文件头的 16-bit little-endian PCM
+- 输入采样率（input_rate）与输出不同时经 PyAV 有状态重采样器逐块转换，块边界处不产生断点
+"""
+
+import asyncio
+import contextlib
+import io
+import struct
+from typing import AsyncIterator, Iterator, Optional, TypeVar, Union
+
+import av
+import numpy as np
+
+T = TypeVar("T")
+
+# response_format -> (容器, 编码器, 输出采样率；None 表示沿用输入采样率)
+_AV_FORMATS = {
+    "mp3": ("mp3", "libmp3lame", None),
+    "opus": ("ogg", "libopus", 48000),
+    "aac": ("adts", "aac", None),
+    "flac": ("flac", "flac", None),
+}
+
+# 容器选项：Ogg 默认攒满 1s 才写出一页，改为 100ms，降低首包延迟
+_CONTAINER_OPTIONS = {
+    "ogg": {"page_duration": "100000"},
+}
+
+# libopus 只接受这些采样率，其余一律重采样到 48kHz
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+SPEECH_FORMATS = ("mp3", "opus", "aac", "flac", "wav", "pcm")
+
+
+def speech_media_type(fmt: str, sample_rate: int = 24000) -> str:
+    """与实际输出内容一致的 MIME 类型"""
+    return {
+        "mp3": "audio/mpeg",
+        "opus": "audio/ogg",
+        "aac": "audio/aac",
+        "flac": "audio/flac",
+        "wav": "audio/wav",
+        "pcm": f"audio/L16;rate={sample_rate};channels=1",
+    }[fmt]
+
+
+def streaming_wav_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """长度未知的 WAV 头：RIFF / data 长度写 0xFFFFFFFF，播放器读到流结束为止"""
+    byte_rate = sample_rate * channels * sample_width
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate,
+                                channels * sample_width, sample_width * 8)
+        + b"data" + struct.pack("<I", 0xFFFFFFFF)
+    )
+
+
+def _to_int16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class _ChunkSink(io.RawIOBase):
+    """只写、不可 seek 的内存槽，取出后即清空"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class StreamingAudioEncoder:
+    """增量音频编码器：encode() 喂入一块样本并返回已产出的字节，close() 冲刷剩余数据
+
+    sample_rate 为输出采样率；input_rate 为喂入样本的采样率（默认与输出相同）。
+    """
+
+    def __init__(self, fmt: str, sample_rate: int, input_rate: Optional[int] = None) -> None:
+        if fmt not in SPEECH_FORMATS:
+            raise ValueError(f"Unsupported response_format '{fmt}'. Supported: {', '.join(SPEECH_FORMATS)}")
+        self.fmt = fmt
+        self.sample_rate = sample_rate
+        self.input_rate = input_rate or sample_rate
+        self._header_sent = False
+        self._container = None
+        self._stream = None
+        self._resampler: Optional[av.AudioResampler] = None
+        self._sink: Optional[_ChunkSink] = None
+        self._uses_av = fmt in _AV_FORMATS
+        if self._uses_av:
+            self._open_av(*_AV_FORMATS[fmt])
+        elif self.input_rate != sample_rate:
+            self._resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+
+    def _open_av(self, container_format: str, codec: str, rate: Optional[int]) -> None:
+        if rate is None or (codec == "libopus" and self.sample_rate in _OPUS_RATES):
+            rate = self.sample_rate
+        self.sample_rate = rate
+        self._sink = _ChunkSink()
+        self._container = av.open(
+            self._sink, mode="w", format=container_format,
+            options=_CONTAINER_OPTIONS.get(container_format, {}),
+        )
+        self._stream = self._container.add_stream(codec, rate=rate, layout="mono")
+        codec_context = self._stream.codec_context
+        self._resampler = av.AudioResampler(
+            format=codec_context.format.name,
+            layout="mono",
+            rate=rate,
+            frame_size=codec_context.frame_size or None,
+        )
+
+    def _mux(self, frame: Optional[av.AudioFrame]) -> None:
+        for out in self._resampler.resample(frame):
+            self._container.mux(self._stream.encode(out))
+
+    def _frame(self, samples: np.ndarray) -> av.AudioFrame:
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="flt", layout="mono")
+        frame.sample_rate = self.input_rate
+        return frame
+
+    def _pcm(self, data: bytes) -> bytes:
+        if self.fmt == "wav" and not self._header_sent:
+            self._header_sent = True
+            data = streaming_wav_header(self.sample_rate) + data
+        return data
+
+    def _resample_pcm(self, frame: Optional[av.AudioFrame]) -> bytes:
+        return b"".join(out.to_ndarray().astype("<i2").tobytes() for out in self._resampler.resample(frame))
+
+    def encode(self, samples: np.ndarray) -> bytes:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if not self._uses_av:
+            if self._resampler is None:
+                return self._pcm(_to_int16(samples))
+            return self._pcm(self._resample_pcm(self._frame(samples)) if len(samples) else b"")
+
+        if len(samples):
+            self._mux(self._frame(samples))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """冲刷重采样器与编码器并写出容器尾"""
+        if not self._uses_av:
+            tail = self._resample_pcm(None) if self._resampler is not None else b""
+            self._resampler = None
+            return self._pcm(tail)
+        if self._container is None:
+            return b""
+        self._mux(None)
+        self._container.mux(self._stream.encode(None))
+        self._container.close()
+        self._container = None
+        return self._sink.drain()
+
+    def discard(self) -> None:
+        """放弃输出（如客户端断开），释放编码器资源"""
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """在线程池中逐项推进同步生成器，包装为异步迭代器
+
+    客户端断开时正在执行的 next() 无法中断：先等它返回再 close()，否则 close() 会因
+    "generator already executing" 失败、生成器继续在后台合成。调用方用完须 aclose()。
+    """
+    done = object()
+    step: Optional[asyncio.Future] = None
+    try:
+        while True:
+            step = asyncio.ensure_future(asyncio.to_thread(next, iterator, done))
+            item = await asyncio.shield(step)
+            if item is done:
+                return
+            yield item
+    finally:
+        if step is not None and not step.done():
+            with contextlib.suppress(Exception):
+                await step
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+async def encode_stream(
+    chunks: Union[Iterator[np.ndarray], AsyncIterator[np.ndarray]],
+    fmt: str,
+    sample_rate: int,
+    first: Optional[np.ndarray] = None,
+    input_rate: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """逐块推进合成生成器并编码（同步生成器经 iterate_in_thread 在线程池中推进），产出可直接写入响应的字节
+
+    chunks 可以是同步生成器，也可以是异步迭代器（如 ChatTTS 合批调度器的输出）。
+    first 为调用方预先取出的首块（用于在响应开始前暴露模型错误），会先于 chunks 编码。
+    结束或客户端断开时关闭 chunks，停止后续合成。
+    """
+    encoder = StreamingAudioEncoder(fmt, sample_rate, input_rate)
+    done = object()
+    pending = [first] if first is not None else []
+    if not hasattr(chunks, "__anext__"):
+        chunks = iterate_in_thread(chunks)
+
+    encoding: Optional[asyncio.Future] = None
+
+    async def step():
+        nonlocal encoding
+        chunk = pending.pop() if pending else await anext(chunks, done)
+        if chunk is done:
+            return done
+        # 与 iterate_in_thread 同理：断开时等编码线程返回后再释放编码器
+        encoding = asyncio.ensure_future(asyncio.to_thread(encoder.encode, chunk))
+        return await asyncio.shield(encoding)
+
+    finished = False
+    try:
+        while True:
+            data = await step()
+            if data is done:
+                break
+            if data:
+                yield data
+        tail = await asyncio.to_thread(encoder.close)
+        finished = True
+        if tail:
+            yield tail
+    finally:
+        if not finished:
+            if encoding is not None and not encoding.done():
+                with contextlib.suppress(Exception):
+                    await encoding
+            encoder.discard()
+        await chunks.aclose()
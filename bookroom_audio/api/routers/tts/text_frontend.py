@@ -0,0 +1,272 @@
+"""
+TTS 文本前端（各引擎共用）
+
+合成前按引擎规范化文本，全部基于预编译的 str.translate 表与正则（C 层单遍处理，无逐字 Python 循环）：
+
+- 通用：全角字母数字 / 全角空格 → 半角，删除零宽字符（所有引擎）
+- 中文数字 / 日期读法：2024年3月5日、10:30、12.5%、3/4、1,234 等转为汉字读法
+  （chattts / kokoro / pyttsx3；edge-tts、cosyvoice 自带文本正则化，不做）
+- ChatTTS：全角标点 → 半角、移除其不接受的字符、压缩空白（即 preprocess_text_for_chattts）
+- 分句：split_sentences（长文本分段与逐句缓存共用）
+
+规范化结果按 (引擎, 句子) 记忆（TTS_FRONTEND_CACHE_ITEMS 条 LRU），长书中反复出现的句子
+（章节标题、对白套话等）不再重复处理；Kokoro 非英文 pipeline 的 G2P 结果同样按句记忆
+（memoize_g2p）。TTS_NORMALIZE_NUMBERS=false 关闭数字 / 日期读法。
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Optional
+
+# 句末标点（含其后的右引号 / 右括号）；英文句点须后接空白，避免切开小数与缩写。
+# findall 的各片段首尾相接覆盖全文
+_SENTENCE_RE = re.compile(r".+?(?:[。！？!?；;…\n]+[”’」』）)\"']*|\.(?=\s)|$)", re.S)
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# 全角字母数字 / 全角空格 → 半角；零宽字符删除
+_COMMON_MAP: dict[int, Optional[str]] = {
+    **{code: chr(code - 0xFEE0) for code in range(0xFF10, 0xFF1A)},
+    **{code: chr(code - 0xFEE0) for code in range(0xFF21, 0xFF3B)},
+    **{code: chr(code - 0xFEE0) for code in range(0xFF41, 0xFF5B)},
+    0x3000: " ",
+    **dict.fromkeys((0x200B, 0x200C, 0x200D, 0x2060, 0xFEFF)),
+}
+_COMMON_TABLE = str.maketrans(_COMMON_MAP)
+
+# 全角标点 -> 半角标点 的映射表（ChatTTS 只接受 ASCII/中文常见符号，
+# 遇到其他全角符号会打印 "found invalid characters" 警告，这里提前规范化）
+FULLWIDTH_PUNCTUATION_MAP: dict[str, str] = {
+    # 常用全角标点
+    '！': '!', '？': '?', '：': ':', '；': ';',
+    '（': '(', '）': ')', '【': '[', '】': ']',
+    '《': '<', '》': '>', '｛': '{', '｝': '}',
+    '「': '"', '」': '"', '『': '"', '』': '"',
+    '〈': '<', '〉': '>', '〔': '(', '〕': ')',
+    '—': '-', '－': '-', '–': '-', '−': '-',
+    '…': '...', '⋯': '...',
+    '～': '~', '·': ',', '•': ',',
+    '、': ',', '，': ',', '。': '.',
+    '“': '"', '”': '"', '‘': "'", '’': "'",
+    '〝': '"', '〟': '"',
+    '／': '/', '＼': '\\',
+    '＋': '+', '＝': '=', '％': '%', '＃': '#',
+    '＆': '&', '＊': '*', '＠': '@',
+    '＜': '<', '＞': '>',
+    '｜': '|', '＾': '^', '＿': '_',
+    '＄': '$',
+}
+
+# ChatTTS：Unicode 全角区 U+FF01..U+FF5E → ASCII、全角空格 → 空格，上表优先
+_CHATTTS_TABLE = str.maketrans({
+    **{code: chr(code - 0xFEE0) for code in range(0xFF01, 0xFF5F)},
+    0x3000: " ",
+    **{ord(k): v for k, v in FULLWIDTH_PUNCTUATION_MAP.items()},
+})
+
+# ChatTTS 允许的字符模式：中文 \u4e00-\u9fff、ASCII 英文字母数字、
+# 常用 ASCII 标点、空格。其它字符一律移除，避免 ChatTTS 内部发出警告。
+CHATTTS_ALLOWED_PATTERN = re.compile(
+    r'[^\u4e00-\u9fffA-Za-z0-9，。、,.!?;:"\'()\[\]<>~+\-*/%=&#@ ]'
+)
+
+# 中文数字读法
+_DIGITS = "零一二三四五六七八九"
+_DIGIT_TABLE = str.maketrans("0123456789", _DIGITS)
+_SECTION_UNITS = ("", "万", "亿", "万亿")
+# 超过该位数（或以 0 开头）的整数逐位读（电话、编号）
+_MAX_CARDINAL_DIGITS = 9
+
+# 一遍匹配所有数字形式；前后不得紧邻字母数字（型号、版本号如 MP3、v2.0 原样保留）
+_NUMBER_RE = re.compile(
+    r"(?<![A-Za-z0-9.])(?:"
+    r"(?P<ymd>(?P<y>\d{4})(?:年(?P<m1>\d{1,2})月(?P<d1>\d{1,2})[日号]?|(?P<sep>[-/])(?P<m2>\d{1,2})(?P=sep)(?P<d2>\d{1,2})))"
+    r"|(?P<time>(?P<hh>\d{1,2}):(?P<mm>\d{2})(?::(?P<ss>\d{2}))?)"
+    r"|(?P<pct>\d+(?:\.\d+)?)[%％]"
+    r"|(?P<num>\d+)/(?P<den>\d+)"
+    r"|(?P<year>\d{4})(?=年)"
+    r"|(?P<dec>\d+\.\d+)"
+    r"|(?P<int>\d{1,3}(?:,\d{3})+|\d+)"
+    r")(?![A-Za-z0-9])"
+)
+_HAS_DIGIT_RE = re.compile(r"\d")
+
+# 各引擎的前端处理：numbers=中文数字 / 日期读法，chattts=ChatTTS 字符集规范化
+_ENGINE_PROFILES: dict[str, tuple[bool, bool]] = {
+    "chattts": (True, True),
+    "kokoro": (True, False),
+    "pyttsx3": (True, False),
+    "edge-tts": (False, False),
+    "cosyvoice": (False, False),
+    "cosyvoice3": (False, False),
+}
+
+
+def split_sentences(text: str) -> list[str]:
+    """按句末标点切分，保留标点，丢弃空白句"""
+    return [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+
+
+def _section_zh(value: int) -> str:
+    """1..9999 的读法（千百十个）"""
+    out = []
+    pending_zero = False
+    for unit, div in (("千", 1000), ("百", 100), ("十", 10), ("", 1)):
+        digit = value // div % 10
+        if digit == 0:
+            pending_zero = pending_zero or bool(out)
+            continue
+        if pending_zero:
+            out.append("零")
+            pending_zero = False
+        out.append(_DIGITS[digit] + unit)
+    return "".join(out)
+
+
+def cardinal_zh(digits: str) -> str:
+    """整数读法：1234 → 一千二百三十四，10 → 十；过长或以 0 开头时逐位读"""
+    if len(digits) > _MAX_CARDINAL_DIGITS or (len(digits) > 1 and digits[0] == "0"):
+        return digits.translate(_DIGIT_TABLE)
+    value = int(digits)
+    if value == 0:
+        return "零"
+    sections = []
+    while value:
+        sections.append(value % 10000)
+        value //= 10000
+    result = ""
+    for index in range(len(sections) - 1, -1, -1):
+        section = sections[index]
+        if section == 0:
+            continue
+        if result and (section < 1000 or sections[index + 1] == 0):
+            result += "零"
+        result += _section_zh(section) + _SECTION_UNITS[index]
+    return result[1:] if result.startswith("一十") else result
+
+
+def _decimal_zh(text: str) -> str:
+    whole, _, frac = text.partition(".")
+    return cardinal_zh(whole) + ("点" + frac.translate(_DIGIT_TABLE) if frac else "")
+
+
+def _number_zh(match: re.Match) -> str:
+    group = match.group
+    if group("ymd"):
+        month, day = group("m1") or group("m2"), group("d1") or group("d2")
+        return f"{group('y').translate(_DIGIT_TABLE)}年{cardinal_zh(month.lstrip('0') or '0')}月{cardinal_zh(day.lstrip('0') or '0')}日"
+    if group("time"):
+        hours, minutes, seconds = int(group("hh")), int(group("mm")), group("ss")
+        if hours > 24 or minutes > 59 or (seconds and int(seconds) > 59):
+            return group(0)
+        out = f"{cardinal_zh(str(hours))}点"
+        for value, unit in ((minutes, "分"), (int(seconds) if seconds else 0, "秒")):
+            if value:
+                out += ("零" if value < 10 else "") + cardinal_zh(str(value)) + unit
+        return out
+    if group("pct"):
+        return "百分之" + _decimal_zh(group("pct"))
+    if group("num"):
+        return f"{cardinal_zh(group('den'))}分之{cardinal_zh(group('num'))}"
+    if group("year"):
+        return group("year").translate(_DIGIT_TABLE)
+    if group("dec"):
+        return _decimal_zh(group("dec"))
+    return cardinal_zh(group("int").replace(",", ""))
+
+
+def normalize_numbers_zh(text: str) -> str:
+    """中文文本中的数字、日期、时间、百分数、分数转为汉字读法（非中文文本原样返回）"""
+    if not _HAS_DIGIT_RE.search(text) or not _CJK_RE.search(text):
+        return text
+    return _NUMBER_RE.sub(_number_zh, text)
+
+
+def _chattts_charset(text: str) -> str:
+    text = text.translate(_CHATTTS_TABLE)
+    return CHATTTS_ALLOWED_PATTERN.sub("", text)
+
+
+def preprocess_text_for_chattts(text: str) -> str:
+    """全角 → 半角、移除 ChatTTS 不接受的字符（保留中文、英文、数字、常用标点、空格）、压缩空白"""
+    if not text:
+        return text
+    return " ".join(_chattts_charset(text).split())
+
+
+def _normalize_piece(engine: str, text: str, numbers: bool) -> str:
+    numbers_enabled, chattts = _ENGINE_PROFILES.get(engine, (False, False))
+    text = text.translate(_COMMON_TABLE)
+    if numbers and numbers_enabled:
+        text = normalize_numbers_zh(text)
+    if chattts:
+        text = _chattts_charset(text)
+    return text
+
+
+def _frontend_config() -> tuple[bool, int]:
+    from bookroom_audio.utils.config import get_config
+
+    config = get_config().model
+    return config.tts_normalize_numbers, config.tts_frontend_cache_items
+
+
+_piece_normalizer: Optional[Callable[[str, str], str]] = None
+
+
+def _get_piece_normalizer() -> Callable[[str, str], str]:
+    """(engine, 句子) → 规范化结果；按配置包一层 LRU（TTS_FRONTEND_CACHE_ITEMS<=0 时不缓存）"""
+    global _piece_normalizer
+    if _piece_normalizer is None:
+        numbers, cache_items = _frontend_config()
+
+        def normalize_piece(engine: str, text: str) -> str:
+            return _normalize_piece(engine, text, numbers)
+
+        _piece_normalizer = lru_cache(maxsize=cache_items)(normalize_piece) if cache_items > 0 else normalize_piece
+    return _piece_normalizer
+
+
+def normalize_text(text: str, engine: str) -> str:
+    """
+    按引擎规范化待合成文本（各引擎合成入口调用）。
+
+    启用缓存时逐句（_SENTENCE_RE 片段，首尾相接覆盖全文）查缓存 / 规范化后拼回；
+    未启用时整段一遍处理。ChatTTS 最后压缩空白。
+    """
+    if not text:
+        return text
+    normalize_piece = _get_piece_normalizer()
+    if hasattr(normalize_piece, "cache_info"):
+        pieces = _SENTENCE_RE.findall(text)
+        text = normalize_piece(engine, pieces[0]) if len(pieces) == 1 else "".join(
+            [normalize_piece(engine, piece) for piece in pieces]
+        )
+    else:
+        text = normalize_piece(engine, text)
+    if _ENGINE_PROFILES.get(engine, (False, False))[1]:
+        text = " ".join(text.split())
+    return text
+
+
+def memoize_g2p(g2p: Callable, maxsize: Optional[int] = None) -> Callable:
+    """
+    包装 G2P 调用（text -> (phonemes, tokens)），按文本记忆结果。
+
+    仅用于返回值不可变的 G2P（Kokoro 非英文 pipeline 的 tokens 为 None）；英文 misaki 的 tokens
+    会在合成时被写入时间戳，不能共享。
+    """
+    if maxsize is None:
+        maxsize = _frontend_config()[1]
+    if maxsize <= 0:
+        return g2p
+    return lru_cache(maxsize=maxsize)(g2p)
+
+
+def frontend_cache_info() -> dict:
+    """规范化缓存命中统计（未启用缓存时为空）"""
+    info = getattr(_piece_normalizer, "cache_info", None)
+    if info is None:
+        return {}
+    stats = info()
+    return {"hits": stats.hits, "misses": stats.misses, "items": stats.currsize, "max_items": stats.maxsize}
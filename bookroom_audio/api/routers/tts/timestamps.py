@@ -0,0 +1,173 @@
+"""
+TTS 字级 / viseme 时间戳
+
+各引擎的时长信息统一为 NumPy 时长数组，经 cumsum 一次算出全部起止时间，结果为 Timeline
+（文本列表 + float64 起止毫秒数组），不再逐字符 / 逐词在 Python 循环里累加游标：
+
+- kokoro_timeline：Kokoro pred_dur（每音素帧数）按空格聚合成词
+- even_split_timeline：edge-tts 句边界时长在句内按口型单元均分
+- durations_timeline：任意给出逐单元时长的引擎
+
+对外仍可输出 [{text, start_ms, end_ms}]（Timeline.to_words），或紧凑二进制时间线
+（Timeline.to_bytes，章节级长文本驱动数字人时体积与解析开销远小于逐词 JSON）。
+
+二进制时间线格式（小端）：
+    头 16 字节：magic b"BKTL" | uint16 版本(1) | uint16 保留(0) | uint32 单元数 n | uint32 字符串表字节数
+    int32[n] start_ms | int32[n] end_ms（取整到毫秒）
+    uint32[n+1] 字符串表字节偏移（第 i 个单元为 table[off[i]:off[i+1]]）
+    字符串表：各单元文本 UTF-8 直接拼接
+"""
+
+import base64
+import re
+import struct
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+TIMELINE_MAGIC = b"BKTL"
+TIMELINE_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+
+# Kokoro 半帧/秒（1 pred_dur 帧 = 600 采样点 @24kHz = 2 个半帧，对齐 KPipeline.join_timestamps 的 MAGIC_DIVISOR）
+_KOKORO_DIV = 80.0
+
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+# 中文逐字切分时保留的字符：跳过空白与标点（标点不计口型、不占时长权重）
+_CJK_UNIT_RE = re.compile(r"[^，。！？、；：“”‘’\"'（）\s]")
+
+
+@dataclass
+class Timeline:
+    """时间线：texts[i] 占 [start_ms[i], end_ms[i])，起止为 float64 毫秒数组"""
+
+    texts: list[str]
+    start_ms: np.ndarray
+    end_ms: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "Timeline":
+        return cls([], np.zeros(0), np.zeros(0))
+
+    @classmethod
+    def from_words(cls, words: Optional[Sequence[dict]]) -> "Timeline":
+        words = words or []
+        return cls(
+            [w["text"] for w in words],
+            np.fromiter((w["start_ms"] for w in words), dtype=np.float64, count=len(words)),
+            np.fromiter((w["end_ms"] for w in words), dtype=np.float64, count=len(words)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def shift(self, offset_ms: float) -> "Timeline":
+        """整体平移（拼接多段时加上前面各段的累计时长）"""
+        return Timeline(self.texts, self.start_ms + offset_ms, self.end_ms + offset_ms)
+
+    def to_words(self, ndigits: int = 2) -> list[dict]:
+        """[{text, start_ms, end_ms}]，起止按 ndigits 位小数取整"""
+        return [
+            {"text": text, "start_ms": round(start, ndigits), "end_ms": round(end, ndigits)}
+            for text, start, end in zip(self.texts, self.start_ms.tolist(), self.end_ms.tolist())
+        ]
+
+    def to_bytes(self) -> bytes:
+        """编码为二进制时间线（格式见模块说明）"""
+        encoded = [text.encode("utf-8") for text in self.texts]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        table = b"".join(encoded)
+        return b"".join((
+            _HEADER.pack(TIMELINE_MAGIC, TIMELINE_VERSION, 0, len(encoded), len(table)),
+            np.rint(self.start_ms).astype("<i4").tobytes(),
+            np.rint(self.end_ms).astype("<i4").tobytes(),
+            offsets.tobytes(),
+            table,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Timeline":
+        """解码 to_bytes 的输出；格式不符时抛 ValueError"""
+        if len(data) < _HEADER.size:
+            raise ValueError("timeline too short")
+        magic, version, _, count, table_size = _HEADER.unpack_from(data)
+        if magic != TIMELINE_MAGIC or version != TIMELINE_VERSION:
+            raise ValueError("not a timeline (bad magic or version)")
+        pos = _HEADER.size
+        if len(data) != pos + count * 12 + 4 + table_size:
+            raise ValueError("timeline size does not match header")
+        start = np.frombuffer(data, dtype="<i4", count=count, offset=pos)
+        end = np.frombuffer(data, dtype="<i4", count=count, offset=pos + count * 4)
+        offsets = np.frombuffer(data, dtype="<u4", count=count + 1, offset=pos + count * 8).tolist()
+        table = data[pos + count * 12 + 4:]
+        texts = [table[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+        return cls(texts, start.astype(np.float64), end.astype(np.float64))
+
+
+def durations_timeline(units: Sequence[str], durations_ms, start_ms: float = 0.0) -> Timeline:
+    """逐单元时长（毫秒）→ 首尾相接的时间线，适用于能给出每个单元时长的任意引擎"""
+    durations = np.asarray(durations_ms, dtype=np.float64).reshape(-1)
+    if len(durations) != len(units):
+        raise ValueError(f"{len(units)} units but {len(durations)} durations")
+    bounds = np.cumsum(np.concatenate(([start_ms], durations)))
+    return Timeline(list(units), bounds[:-1], bounds[1:])
+
+
+def kokoro_timeline(phonemes: str, pred_dur) -> Timeline:
+    """
+    Kokoro pred_dur → 词级时间线（与官方 KPipeline.join_timestamps 同一半帧计数）。
+
+    pred_dur = [<bos>, ...逐字符对应 phonemes(含空格)..., <eos>]。每个字符（含空格）推进 2×pred_dur
+    个半帧，游标起点为 2×max(0, bos-3)；非空格字符按空格聚合成词，词起点为首字符前的游标，
+    词尾为末字符后的游标（空格时长不计入相邻词）。
+    """
+    pd = np.asarray(pred_dur, dtype=np.float64).reshape(-1)
+    if len(pd) < 3:  # 至少 <bos>, 一个音素, <eos>
+        return Timeline.empty()
+
+    head = phonemes[:len(pd) - 2]  # 保留最后一个 <eos>
+    if not head:
+        return Timeline.empty()
+
+    # cursor[k] = 第 k 个字符之前的半帧游标，cursor[k+1] = 其后
+    cursor = np.cumsum(np.concatenate(([2.0 * max(0.0, pd[0] - 3.0)], 2.0 * pd[1:len(head) + 1])))
+    is_word = np.frombuffer(head.encode("utf-32-le"), dtype="<u4") != ord(" ")
+    edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+    first = np.flatnonzero(edges == 1)
+    last = np.flatnonzero(edges == -1)  # 末字符下标 + 1
+
+    return Timeline(
+        [word for word in head.split(" ") if word],
+        cursor[first] / _KOKORO_DIV * 1000.0,
+        cursor[last] / _KOKORO_DIV * 1000.0,
+    )
+
+
+def viseme_units(sentence: str) -> list[str]:
+    """口型驱动单元：中文逐字（跳过空白与标点），否则按空白分词"""
+    if _CJK_RE.search(sentence):
+        return _CJK_UNIT_RE.findall(sentence)
+    return sentence.split()
+
+
+def even_split_timeline(sentence: str, start_ms: float, duration_ms: float) -> Timeline:
+    """句级时长在句内各口型单元间均分（edge-tts 中文仅有 SentenceBoundary）"""
+    units = viseme_units(sentence)
+    if not units:
+        return Timeline.empty()
+    seg = duration_ms / len(units)
+    steps = np.arange(len(units) + 1, dtype=np.float64) * seg
+    return Timeline(units, start_ms + steps[:-1], start_ms + steps[1:])
+
+
+def timestamps_payload(words: Optional[list], timestamp_format: str = "json") -> dict:
+    """
+    响应 / SSE 事件中的时间戳字段：json 为 {"words": [...]}，
+    binary 为 {"timeline": 二进制时间线 base64}
+    """
+    if timestamp_format == "binary":
+        data = Timeline.from_words(words).to_bytes()
+        return {"timeline": base64.b64encode(data).decode("ascii")}
+    return {"words": words}
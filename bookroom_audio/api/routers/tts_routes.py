@@ -4,26 +4,36 @@ TTS routes - API endpoints for text-to-speech functionality.
 
 import asyncio
 import base64
-import io
+import hashlib
 import json
-from typing import Any, Optional
+import unicodedata
+from typing import Any, AsyncIterator, Iterator, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
+import numpy as np
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+
+from bookroom_audio.services.result_cache import content_key, get_result_cache
 from bookroom_audio.utils.utils_api import (
     get_api_key_dependency,
     logger,
 )
 
 # 导入拆分后的模块
-from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.api.routers.tts.schemas import SpeakerRegisterRequest, TTSRequest
 from bookroom_audio.api.routers.tts.constants import (
     CHATTTS_VOICES,
     CHATTTS_EMOTIONS,
     COSYVOICE_VOICES,
     EDGE_TTS_VOICES,
 )
+from bookroom_audio.api.routers.tts.chattts_batch import get_chattts_scheduler
+from bookroom_audio.api.routers.tts.pyttsx3_pool import get_pyttsx3_pool
+from bookroom_audio.api.routers.tts.long_text import iter_long_text, synthesize_long_text, use_long_text_mode
+from bookroom_audio.api.routers.tts.streaming_encoder import StreamingAudioEncoder, encode_stream, iterate_in_thread
+from bookroom_audio.api.routers.tts.timestamps import timestamps_payload
 from bookroom_audio.api.routers.tts.utils import select_engine
 from bookroom_audio.api.routers.tts.engines import (
     _check_chattss_available,
@@ -36,18 +46,395 @@ from bookroom_audio.api.routers.tts.engines import (
     _get_cosyvoice3_status,
     _check_kokoro_available,
     _kokoro_status,
+    chattts_wav_bytes,
+    delete_cosyvoice3_speaker,
     generate_audio_chatt,
     generate_audio_cosyvoice,
     generate_audio_cosyvoice3,
     generate_audio_edge_tts,
     generate_audio_kokoro,
     generate_audio_pyttsx3,
-    stream_tts_edge_with_words,
+    iter_audio_cosyvoice,
+    iter_edge_tts_events,
+    iter_audio_kokoro,
+    list_cosyvoice3_speakers,
+    register_cosyvoice3_speaker,
+    COSYVOICE_SAMPLE_RATE,
+    KOKORO_SAMPLE_RATE,
     EDGE_TTS_AVAILABLE,
     PYTTSX3_AVAILABLE,
 )
 
 
+async def synthesize_tts(request: TTSRequest) -> tuple[bytes, str, Optional[list]]:
+    """
+    按请求选择引擎合成语音（/v1/tts/generate 与批量任务共用）。
+    长文本（见 tts/long_text.py）按句分段并行合成后拼接。
+
+    Returns:
+        (WAV 音频数据, 实际使用的引擎, 字级时间戳；仅 kokoro 且 return_timestamps 时非 None)
+    """
+    if use_long_text_mode(request):
+        return await synthesize_long_text(request, _synthesize_single_tts)
+    return await _synthesize_single_tts(request)
+
+
+async def _synthesize_single_tts(request: TTSRequest) -> tuple[bytes, str, Optional[list]]:
+    """单次引擎调用合成整段文本"""
+    ts_words = None
+    selected_engine = select_engine(request.engine, request.text)
+
+    if selected_engine == "chattts":
+        if not _check_chattss_available():
+            raise HTTPException(status_code=500, detail="ChatTTS not available")
+
+        voice = request.voice or request.voice_id
+        emotion = request.emotion.lower()
+
+        if emotion not in CHATTTS_EMOTIONS:
+            emotion = "neutral"
+
+        # CHATTTS_BATCH_SIZE>1 时与其它并发请求合并为一次 infer
+        scheduler = get_chattts_scheduler()
+        if scheduler is not None:
+            samples = await scheduler.synthesize(request.text, emotion)
+            audio_data = await asyncio.to_thread(chattts_wav_bytes, samples, request.sample_rate)
+        else:
+            audio_data = await asyncio.to_thread(
+                generate_audio_chatt,
+                text=request.text,
+                voice=voice,
+                emotion=emotion,
+                target_sample_rate=request.sample_rate,
+            )
+    elif selected_engine == "edge-tts":
+        if not EDGE_TTS_AVAILABLE:
+            raise HTTPException(status_code=500, detail="Edge TTS not available")
+
+        voice = request.voice or request.voice_id
+        from bookroom_audio.api.routers.tts.utils import parse_rate, parse_volume
+        
+        rate = parse_rate(request.rate)
+        volume = parse_volume(request.volume)
+
+        audio_data = await generate_audio_edge_tts(
+            text=request.text,
+            voice=voice,
+            rate=rate,
+            volume=volume,
+            target_sample_rate=request.sample_rate,
+        )
+    elif selected_engine == "cosyvoice":
+        if not _check_cosyvoice_available():
+            raise HTTPException(status_code=500, detail="CosyVoice2 not available. 请安装：pip install git+https://github.com/FunAudioLLM/CosyVoice.git")
+
+        voice = request.voice or request.voice_id or "中文女"
+
+        audio_data = await asyncio.to_thread(
+            generate_audio_cosyvoice,
+            text=request.text,
+            voice=voice,
+            target_sample_rate=request.sample_rate,
+        )
+    elif selected_engine == "cosyvoice3":
+        # CosyVoice3 仅 zero_shot 模式（无预置音色），必须携带参考音频或已注册的 voice_id。
+        # 缺少参考音频 / voice_id 未注册 → generate_audio_cosyvoice3 抛 ValueError → 400 显式报错，
+        # 绝不静默回退到其它引擎/模型（避免产出错误语音）。
+        if not _check_cosyvoice3_available():
+            raise HTTPException(
+                status_code=500,
+                detail="CosyVoice3 not available. 请确认已下载 Fun-CosyVoice3-0.5B-2512 并配置 COSYVOICE3_MODEL_DIR",
+            )
+
+        audio_data = await asyncio.to_thread(
+            generate_audio_cosyvoice3,
+            text=request.text,
+            reference_audio=request.reference_audio,
+            reference_text=request.reference_text,
+            target_sample_rate=request.sample_rate,
+            voice_id=request.voice_id,
+        )
+    elif selected_engine == "pyttsx3":
+        if not PYTTSX3_AVAILABLE:
+            raise HTTPException(status_code=500, detail="pyttsx3 not available")
+
+        voice_id = request.voice_id or request.voice
+        rate = int(request.rate) if isinstance(request.rate, (int, float)) else 200
+        volume = float(request.volume) if isinstance(request.volume, (int, float)) else 1.0
+
+        # PYTTSX3_WORKERS>0 时由常驻 worker 进程合成（驱动不能在同一进程内并发）
+        pool = get_pyttsx3_pool()
+        if pool is not None:
+            audio_data = await pool.synthesize(
+                text=request.text,
+                voice_id=voice_id,
+                rate=rate,
+                volume=volume,
+                target_sample_rate=request.sample_rate,
+            )
+        else:
+            audio_data = await asyncio.to_thread(
+                generate_audio_pyttsx3,
+                text=request.text,
+                voice_id=voice_id,
+                rate=rate,
+                volume=volume,
+                target_sample_rate=request.sample_rate,
+            )
+    elif selected_engine == "kokoro":
+        # Kokoro-82M（Apache 2.0 可商用）：text-only 预置音色，替代 ChatTTS。
+        # 失败显式报错（500），绝不静默回退到其它引擎。
+        # return_timestamps=true 时返回字级时间戳（pred_dur 音素时长累计，viseme 口型用）
+        if not _check_kokoro_available():
+            raise HTTPException(status_code=500, detail="Kokoro not available. 请安装：pip install kokoro")
+
+        voice = request.voice or request.voice_id or "zf_001"
+
+        if request.return_timestamps:
+            audio_data, ts_words = await asyncio.to_thread(
+                generate_audio_kokoro,
+                text=request.text,
+                voice=voice,
+                target_sample_rate=request.sample_rate,
+                return_timestamps=True,
+            )
+        else:
+            audio_data = await asyncio.to_thread(
+                generate_audio_kokoro,
+                text=request.text,
+                voice=voice,
+                target_sample_rate=request.sample_rate,
+            )
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown engine: {selected_engine}")
+
+    if not audio_data:
+        raise HTTPException(status_code=500, detail="Generated audio is empty")
+
+    return audio_data, selected_engine, ts_words
+
+
+def normalize_tts_text(text: str) -> str:
+    """缓存键用的文本归一化：NFKC + 去掉首尾空白 + 连续空白合并为一个空格"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def _tts_cache_key(request: TTSRequest) -> str:
+    engine = select_engine(request.engine, request.text)
+    reference = request.reference_audio
+    return content_key(
+        normalize_tts_text(request.text),
+        engine,
+        request.voice,
+        request.voice_id,
+        request.emotion.lower(),
+        str(request.rate),
+        str(request.volume),
+        str(request.sample_rate),
+        hashlib.sha256(reference.encode("ascii", "ignore")).hexdigest() if reference else None,
+        request.reference_text,
+        "timestamps" if request.return_timestamps else None,
+    )
+
+
+def _pack_tts_result(audio_data: bytes, engine: str, words: Optional[list]) -> bytes:
+    """缓存值：4 字节头长度 + JSON 头（engine / words / etag）+ 音频数据"""
+    header = json.dumps({
+        "engine": engine,
+        "words": words,
+        "etag": hashlib.sha256(audio_data).hexdigest()[:32],
+    }, ensure_ascii=False).encode("utf-8")
+    return len(header).to_bytes(4, "little") + header + audio_data
+
+
+def _unpack_tts_result(value: bytes) -> tuple[bytes, dict]:
+    size = int.from_bytes(value[:4], "little")
+    return value[4 + size:], json.loads(value[4:4 + size])
+
+
+async def cached_synthesize_tts(args: Any, request: TTSRequest) -> tuple[bytes, str, Optional[list], str]:
+    """
+    synthesize_tts 前置内容寻址缓存（内存 LRU + 磁盘，见 services/result_cache.py）。
+    键为归一化文本与 engine / voice / emotion / rate / volume / sample_rate 等参数；
+    相同参数的并发请求只合成一次。
+
+    Returns:
+        (WAV 音频数据, 实际使用的引擎, 字级时间戳, ETag)
+    """
+    async def compute() -> bytes:
+        audio_data, engine, words = await synthesize_tts(request)
+        return _pack_tts_result(audio_data, engine, words)
+
+    value = await get_result_cache(args, "tts").get_or_compute(_tts_cache_key(request), compute)
+    audio_data, header = _unpack_tts_result(value)
+    return audio_data, header["engine"], header["words"], f'"{header["etag"]}"'
+
+
+def representation_etag(etag: str, request: TTSRequest, engine: str) -> str:
+    """
+    同一段音频的不同响应表示（WAV / 逐词 JSON / 二进制时间线 JSON）使用不同 ETag，
+    避免客户端拿 WAV 的 ETag 请求 JSON 时误返回 304。
+    """
+    if request.return_timestamps and engine == "kokoro":
+        return f'{etag[:-1]}-json-{request.timestamp_format}"'
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 比较（弱比较，支持逗号分隔的多个值与 *）"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+# 支持逐块流式合成的引擎（stream=true 与 /v1/tts/ws）
+STREAMING_ENGINES = ("kokoro", "cosyvoice")
+
+
+def _without_words(chunks: Iterator[np.ndarray]) -> Iterator[tuple[np.ndarray, list]]:
+    try:
+        for audio in chunks:
+            yield audio, []
+    finally:
+        chunks.close()
+
+
+def open_tts_stream(request: TTSRequest, engine: str) -> tuple[Iterator[tuple[np.ndarray, list]], int]:
+    """
+    按引擎打开逐块合成生成器（HTTP 流式与 WebSocket 共用）。
+
+    Returns:
+        (产出 (float32 样本块, 字级时间戳) 的同步生成器, 样本采样率)；时间戳仅 kokoro 且
+        return_timestamps 时非空
+    """
+    if engine == "kokoro":
+        if not _check_kokoro_available():
+            raise HTTPException(status_code=500, detail="Kokoro not available. 请安装：pip install kokoro")
+        voice = request.voice or request.voice_id or "zf_001"
+        return iter_audio_kokoro(request.text, voice, request.return_timestamps), KOKORO_SAMPLE_RATE
+    if engine == "cosyvoice":
+        if not _check_cosyvoice_available():
+            raise HTTPException(status_code=500, detail="CosyVoice2 not available. 请安装：pip install git+https://github.com/FunAudioLLM/CosyVoice.git")
+        voice = request.voice or request.voice_id or "中文女"
+        return _without_words(iter_audio_cosyvoice(request.text, voice)), COSYVOICE_SAMPLE_RATE
+    raise HTTPException(
+        status_code=400,
+        detail=f"Engine '{engine}' does not support streaming. Supported: {', '.join(STREAMING_ENGINES)}",
+    )
+
+
+async def stream_tts_response(request: TTSRequest, engine: str) -> StreamingResponse:
+    """
+    逐块流式合成：Kokoro 每句、CosyVoice2 每个 tts_speech 块产出后立即编码输出，
+    首包延迟约为一块的合成时间。
+
+    - return_timestamps=False：长度未知的流式 WAV（目标采样率，16-bit PCM，块间增量重采样）
+    - return_timestamps=True（kokoro）：SSE，每句 words 事件后紧跟该句 audio 事件（WAV 字节 base64，
+      按序拼接即完整 WAV），最后 end；中途出错发 error 事件
+    """
+    sync_chunks, input_rate = open_tts_stream(request, engine)
+    chunks = iterate_in_thread(sync_chunks)
+    # 先取首块再开始响应：模型加载失败 / 音色不存在仍能返回 500
+    first = await anext(chunks, None)
+    if first is None:
+        raise HTTPException(status_code=500, detail=f"{engine} generated no audio chunks")
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if not (request.return_timestamps and engine == "kokoro"):
+        async def samples() -> AsyncIterator[np.ndarray]:
+            try:
+                async for audio, _ in chunks:
+                    yield audio
+            finally:
+                await chunks.aclose()
+
+        return StreamingResponse(
+            encode_stream(samples(), "wav", request.sample_rate, first=first[0], input_rate=input_rate),
+            media_type="audio/wav",
+            headers=headers,
+        )
+
+    async def sse_gen() -> AsyncIterator[str]:
+        encoder = StreamingAudioEncoder("wav", request.sample_rate, input_rate=input_rate)
+        item = first
+        try:
+            while item is not None:
+                audio, words = item
+                data = await asyncio.to_thread(encoder.encode, audio)
+                yield _sse({"type": "words", **timestamps_payload(words, request.timestamp_format)})
+                yield _sse({"type": "audio", "chunk": base64.b64encode(data).decode("ascii")})
+                item = await anext(chunks, None)
+            tail = encoder.close()
+            if tail:
+                yield _sse({"type": "audio", "chunk": base64.b64encode(tail).decode("ascii")})
+            yield _sse({"type": "end", "engine": engine, "sample_rate": request.sample_rate})
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"{engine} streaming failed: {e}", exc_info=True)
+            yield _sse({"type": "error", "message": str(e)})
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(sse_gen(), media_type="text/event-stream", headers=headers)
+
+
+async def stream_long_text_response(request: TTSRequest) -> StreamingResponse:
+    """
+    长文本流式合成：各段并行合成，按序拼接后逐段输出（首包约为首段的合成时间）。
+    响应格式与 stream_tts_response 相同：流式 WAV，或 kokoro + return_timestamps 时为 SSE。
+    """
+    engine = select_engine(request.engine, request.text)
+    segments = iter_long_text(request, _synthesize_single_tts)
+    # 先取首段再开始响应：首段合成失败仍能返回错误状态码
+    first = await anext(segments, None)
+    if first is None:
+        raise HTTPException(status_code=500, detail=f"{engine} generated no audio chunks")
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if not (request.return_timestamps and engine == "kokoro"):
+        async def samples() -> AsyncIterator[np.ndarray]:
+            try:
+                async for audio, _ in segments:
+                    yield audio
+            finally:
+                await segments.aclose()
+
+        return StreamingResponse(
+            encode_stream(samples(), "wav", request.sample_rate, first=first[0], input_rate=request.sample_rate),
+            media_type="audio/wav",
+            headers=headers,
+        )
+
+    async def sse_gen() -> AsyncIterator[str]:
+        encoder = StreamingAudioEncoder("wav", request.sample_rate)
+        item = first
+        try:
+            while item is not None:
+                audio, words = item
+                data = await asyncio.to_thread(encoder.encode, audio)
+                if words:
+                    yield _sse({"type": "words", **timestamps_payload(words, request.timestamp_format)})
+                yield _sse({"type": "audio", "chunk": base64.b64encode(data).decode("ascii")})
+                item = await anext(segments, None)
+            tail = encoder.close()
+            if tail:
+                yield _sse({"type": "audio", "chunk": base64.b64encode(tail).decode("ascii")})
+            yield _sse({"type": "end", "engine": engine, "sample_rate": request.sample_rate})
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"{engine} long text streaming failed: {e}", exc_info=True)
+            yield _sse({"type": "error", "message": str(e)})
+        finally:
+            await segments.aclose()
+
+    return StreamingResponse(sse_gen(), media_type="text/event-stream", headers=headers)
+
+
 def create_tts_routes(args: Any, api_key: Optional[str] = None):
     router = APIRouter(prefix="/v1/tts", tags=["tts"])
     """
@@ -69,144 +456,56 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
         summary="Generate speech from text",
         description="Converts the provided text into speech audio. "
                     "Supports multiple TTS engines including ChatTTS, Edge TTS, and pyttsx3. "
-                    "Returns WAV format audio stream.",
+                    "Returns WAV format audio stream. "
+                    "Results are cached by normalized text and voice parameters, identical concurrent "
+                    "requests share one synthesis, and responses carry an ETag (If-None-Match -> 304). "
+                    "With stream=true and engine=kokoro/cosyvoice, audio is sent chunk by chunk as it is "
+                    "synthesized (streaming WAV, or SSE with interleaved word timestamps for kokoro). "
+                    "When TTS_PARALLEL_WORKERS>1, long texts are split at sentence boundaries, segments are "
+                    "synthesized concurrently and stitched in order with short crossfades (streamed in order "
+                    "with stream=true, for any engine).",
         operation_id="generate_tts",
     )
-    async def generate_tts(request: TTSRequest):
+    async def generate_tts(request: TTSRequest, raw_request: Request):
         if not request.text or not request.text.strip():
             raise HTTPException(
                 status_code=400, detail="No text provided for speech generation"
             )
 
         try:
-            selected_engine = select_engine(request.engine, request.text)
-
-            if selected_engine == "chattts":
-                if not _check_chattss_available():
-                    raise HTTPException(status_code=500, detail="ChatTTS not available")
+            if request.stream:
+                if use_long_text_mode(request):
+                    return await stream_long_text_response(request)
+                selected_engine = select_engine(request.engine, request.text)
+                if selected_engine in STREAMING_ENGINES:
+                    return await stream_tts_response(request, selected_engine)
 
-                voice = request.voice or request.voice_id
-                emotion = request.emotion.lower()
+            audio_data, selected_engine, ts_words, etag = await cached_synthesize_tts(args, request)
+            etag = representation_etag(etag, request, selected_engine)
 
-                if emotion not in CHATTTS_EMOTIONS:
-                    emotion = "neutral"
-
-                audio_data = await asyncio.to_thread(
-                    generate_audio_chatt,
-                    text=request.text,
-                    voice=voice,
-                    emotion=emotion,
-                    target_sample_rate=request.sample_rate,
-                )
-            elif selected_engine == "edge-tts":
-                if not EDGE_TTS_AVAILABLE:
-                    raise HTTPException(status_code=500, detail="Edge TTS not available")
-
-                voice = request.voice or request.voice_id
-                from bookroom_audio.api.routers.tts.utils import parse_rate, parse_volume
-                
-                rate = parse_rate(request.rate)
-                volume = parse_volume(request.volume)
-
-                audio_data = await generate_audio_edge_tts(
-                    text=request.text,
-                    voice=voice,
-                    rate=rate,
-                    volume=volume,
-                    target_sample_rate=request.sample_rate,
-                )
-            elif selected_engine == "cosyvoice":
-                if not _check_cosyvoice_available():
-                    raise HTTPException(status_code=500, detail="CosyVoice2 not available. 请安装：pip install git+https://github.com/FunAudioLLM/CosyVoice.git")
-
-                voice = request.voice or request.voice_id or "中文女"
-
-                audio_data = await asyncio.to_thread(
-                    generate_audio_cosyvoice,
-                    text=request.text,
-                    voice=voice,
-                    target_sample_rate=request.sample_rate,
-                )
-            elif selected_engine == "cosyvoice3":
-                # CosyVoice3 仅 zero_shot 模式（无预置音色），必须携带参考音频。
-                # 缺少参考音频 → generate_audio_cosyvoice3 抛 ValueError → 400 显式报错，
-                # 绝不静默回退到其它引擎/模型（避免产出错误语音）。
-                if not _check_cosyvoice3_available():
-                    raise HTTPException(
-                        status_code=500,
-                        detail="CosyVoice3 not available. 请确认已下载 Fun-CosyVoice3-0.5B-2512 并配置 COSYVOICE3_MODEL_DIR",
-                    )
-
-                audio_data = await asyncio.to_thread(
-                    generate_audio_cosyvoice3,
-                    text=request.text,
-                    reference_audio=request.reference_audio,
-                    reference_text=request.reference_text,
-                    target_sample_rate=request.sample_rate,
-                )
-            elif selected_engine == "pyttsx3":
-                if not PYTTSX3_AVAILABLE:
-                    raise HTTPException(status_code=500, detail="pyttsx3 not available")
-
-                voice_id = request.voice_id or request.voice
-                rate = int(request.rate) if isinstance(request.rate, (int, float)) else 200
-                volume = float(request.volume) if isinstance(request.volume, (int, float)) else 1.0
-
-                audio_data = await asyncio.to_thread(
-                    generate_audio_pyttsx3,
-                    text=request.text,
-                    voice_id=voice_id,
-                    rate=rate,
-                    volume=volume,
-                    target_sample_rate=request.sample_rate,
-                )
-            elif selected_engine == "kokoro":
-                # Kokoro-82M（Apache 2.0 可商用）：text-only 预置音色，替代 ChatTTS。
-                # 失败显式报错（500），绝不静默回退到其它引擎。
-                # return_timestamps=true 时返回字级时间戳（pred_dur 音素时长累计，viseme 口型用）
-                if not _check_kokoro_available():
-                    raise HTTPException(status_code=500, detail="Kokoro not available. 请安装：pip install kokoro")
-
-                voice = request.voice or request.voice_id or "zf_001"
-
-                if request.return_timestamps:
-                    audio_data, ts_words = await asyncio.to_thread(
-                        generate_audio_kokoro,
-                        text=request.text,
-                        voice=voice,
-                        target_sample_rate=request.sample_rate,
-                        return_timestamps=True,
-                    )
-                else:
-                    audio_data = await asyncio.to_thread(
-                        generate_audio_kokoro,
-                        text=request.text,
-                        voice=voice,
-                        target_sample_rate=request.sample_rate,
-                    )
-            else:
-                raise HTTPException(status_code=400, detail=f"Unknown engine: {selected_engine}")
-
-            if not audio_data:
-                raise HTTPException(status_code=500, detail="Generated audio is empty")
+            # 客户端已有相同内容：304，不再传输音频
+            if etag_matches(raw_request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers={"ETag": etag})
 
             # Kokoro 字级时间戳模式：返回 JSON（audio base64 + words），viseme 口型驱动用
             if request.return_timestamps and selected_engine == "kokoro":
                 return JSONResponse(
                     {
                         "audio": base64.b64encode(audio_data).decode("ascii"),
-                        "words": ts_words,
+                        **timestamps_payload(ts_words, request.timestamp_format),
                         "engine": "kokoro",
                         "sample_rate": request.sample_rate,
-                    }
+                    },
+                    headers={"ETag": etag},
                 )
 
             filename = f"speech_{hash(request.text) % 10000}.wav"
 
-            return StreamingResponse(
-                io.BytesIO(audio_data),
+            # 整段 WAV 已在内存中：直接作为响应体返回，避免再经 BytesIO 分块拷贝
+            return Response(
+                content=audio_data,
                 media_type="audio/wav",
-                headers={"Content-Disposition": f"attachment; filename={filename}"},
+                headers={"Content-Disposition": f"attachment; filename={filename}", "ETag": etag},
             )
 
         except HTTPException:
@@ -269,7 +568,8 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
         cosyvoice3_status = _get_cosyvoice3_status()
         if cosyvoice3_status["available"]:
             result["cosyvoice3"] = {
-                "voices": [],  # 无预置音色：zero_shot 音色克隆需携带参考音频
+                # 无预置音色：zero_shot 音色克隆需携带参考音频，或使用已注册的说话人档案（voice_id）
+                "voices": await asyncio.to_thread(list_cosyvoice3_speakers),
                 "description": cosyvoice3_status["description"],
                 "features": cosyvoice3_status["features"],
                 "model_loaded": cosyvoice3_status["model_loaded"],
@@ -298,12 +598,62 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
                 "description": kokoro_status["description"],
                 "features": kokoro_status["features"],
                 "model_loaded": kokoro_status["model_loaded"],
+                "pipelines": kokoro_status["pipelines"],
+                "memory": kokoro_status["memory"],
                 "weights_home": kokoro_status["weights_home"],
             }
             result["available_engines"].append("kokoro")
 
         return result
 
+    @router.post(
+        "/speakers",
+        dependencies=[Depends(optional_api_key)],
+        summary="Register CosyVoice3 speaker",
+        description="注册 CosyVoice3 说话人档案：上传一次参考音频，提取的 prompt 特征（说话人 embedding + "
+                    "prompt speech token）缓存在内存与磁盘，返回 voice_id。之后 /v1/tts/generate 传 "
+                    "engine=cosyvoice3 + voice_id 即可，无需再携带参考音频。同一样本重复注册返回同一 voice_id。",
+        operation_id="register_speaker",
+    )
+    async def register_speaker(request: SpeakerRegisterRequest):
+        if not _check_cosyvoice3_available():
+            raise HTTPException(
+                status_code=500,
+                detail="CosyVoice3 not available. 请确认已下载 Fun-CosyVoice3-0.5B-2512 并配置 COSYVOICE3_MODEL_DIR",
+            )
+        try:
+            return await asyncio.to_thread(
+                register_cosyvoice3_speaker,
+                request.reference_audio,
+                request.reference_text,
+                request.name,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error registering CosyVoice3 speaker: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Speaker registration failed: {str(e)}")
+
+    @router.get(
+        "/speakers",
+        dependencies=[Depends(optional_api_key)],
+        summary="List CosyVoice3 speakers",
+        operation_id="list_speakers",
+    )
+    async def list_speakers():
+        return {"object": "list", "data": await asyncio.to_thread(list_cosyvoice3_speakers)}
+
+    @router.delete(
+        "/speakers/{voice_id}",
+        dependencies=[Depends(optional_api_key)],
+        summary="Delete CosyVoice3 speaker",
+        operation_id="delete_speaker",
+    )
+    async def delete_speaker(voice_id: str):
+        if not await asyncio.to_thread(delete_cosyvoice3_speaker, voice_id):
+            raise HTTPException(status_code=404, detail=f"Speaker '{voice_id}' not found")
+        return {"voice_id": voice_id, "deleted": True}
+
     @router.post(
         "/load",
         dependencies=[Depends(optional_api_key)],
@@ -342,7 +692,8 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
         response_class=StreamingResponse,
         dependencies=[Depends(optional_api_key)],
         summary="Stream speech with word boundaries",
-        description="Edge TTS 流式生成，SSE 输出：先 words（词边界时间戳，viseme 口型驱动用），再 audio chunk（WAV base64）。",
+        description="Edge TTS 流式生成，SSE 输出：edge-tts 每产出一个句/词边界即发 words（viseme 口型驱动用），"
+                    "每收到一段 MP3 即增量解码并发 audio chunk（WAV 字节 base64，按序拼接即完整 WAV），最后 end。",
         operation_id="stream_tts_with_words",
     )
     async def stream_tts(request: TTSRequest):
@@ -357,27 +708,34 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
         volume = parse_volume(request.volume)
         voice = request.voice or request.voice_id
 
-        def sse_gen():
+        async def sse_gen() -> AsyncIterator[str]:
+            # 在请求所在事件循环内直接迭代 communicate.stream()：边界与音频到达即转发，
+            # 首个 audio 事件的延迟与 edge-tts 首个 MP3 块一致
+            events = iter_edge_tts_events(text=request.text, voice=voice, rate=rate, volume=volume)
+            encoder: Optional[StreamingAudioEncoder] = None
             try:
-                wav, words = asyncio.run(
-                    stream_tts_edge_with_words(
-                        text=request.text,
-                        voice=voice,
-                        rate=rate,
-                        volume=volume,
-                        target_sample_rate=request.sample_rate,
-                    )
-                )
+                async for event in events:
+                    if event["type"] == "words":
+                        yield _sse({"type": "words", **timestamps_payload(event["words"], request.timestamp_format)})
+                        continue
+                    if encoder is None:
+                        encoder = StreamingAudioEncoder("wav", request.sample_rate, input_rate=event["sample_rate"])
+                    data = encoder.encode(event["samples"])
+                    if data:
+                        yield _sse({"type": "audio", "chunk": base64.b64encode(data).decode("ascii")})
+                if encoder is not None:
+                    tail = encoder.close()
+                    encoder = None
+                    if tail:
+                        yield _sse({"type": "audio", "chunk": base64.b64encode(tail).decode("ascii")})
+                yield _sse({"type": "end"})
             except Exception as e:  # noqa: BLE001
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-                return
-
-            yield f"data: {json.dumps({'type': 'words', 'words': words})}\n\n"
-            chunk_size = 4096
-            for i in range(0, len(wav), chunk_size):
-                chunk = base64.b64encode(wav[i : i + chunk_size]).decode()
-                yield f"data: {json.dumps({'type': 'audio', 'chunk': chunk})}\n\n"
-            yield 'data: {"type": "end"}\n\n'
+                logger.error(f"Edge TTS streaming failed: {e}", exc_info=True)
+                yield _sse({"type": "error", "message": str(e)})
+            finally:
+                if encoder is not None:
+                    encoder.discard()
+                await events.aclose()
 
         return StreamingResponse(
             sse_gen(),
@@ -385,4 +743,73 @@ def create_tts_routes(args: Any, api_key: Optional[str] = None):
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
 
-    return router
\ No newline at end of file
+    @router.websocket("/ws")
+    async def tts_websocket(
+        websocket: WebSocket,
+        token: Optional[str] = Query(default=None),
+    ) -> None:
+        """流式合成 WebSocket 端点（kokoro / cosyvoice）
+
+        协议流程：
+        1. 客户端建立 WebSocket 连接（带 token 鉴权）
+        2. 客户端发送 JSON 请求（字段同 /v1/tts/generate）
+        3. 服务端返回 {"type": "start", engine, sample_rate, format: "pcm_s16le"}
+        4. 服务端逐块推送 binary 16-bit PCM（目标采样率）；kokoro 且 return_timestamps 时
+           每句音频前先推送 {"type": "words", words}（timestamp_format=binary 时为 timeline）
+        5. 服务端返回 {"type": "end"}；同一连接可继续发送下一条请求
+        """
+        await websocket.accept()
+        if api_key and token != api_key:
+            await websocket.send_json({"type": "error", "message": "Invalid or missing API token"})
+            await websocket.close(code=4001)
+            return
+
+        try:
+            while True:
+                message = await websocket.receive_json()
+                try:
+                    request = TTSRequest(**message)
+                except ValidationError as e:
+                    await websocket.send_json({"type": "error", "message": str(e.errors())})
+                    continue
+                if not request.text.strip():
+                    await websocket.send_json({"type": "error", "message": "No text provided"})
+                    continue
+
+                engine = select_engine(request.engine, request.text)
+                chunks = None
+                try:
+                    sync_chunks, input_rate = open_tts_stream(request, engine)
+                    chunks = iterate_in_thread(sync_chunks)
+                    encoder = StreamingAudioEncoder("pcm", request.sample_rate, input_rate=input_rate)
+                    await websocket.send_json({
+                        "type": "start",
+                        "engine": engine,
+                        "sample_rate": request.sample_rate,
+                        "format": "pcm_s16le",
+                    })
+                    while (item := await anext(chunks, None)) is not None:
+                        audio, words = item
+                        if words:
+                            await websocket.send_json({"type": "words", **timestamps_payload(words, request.timestamp_format)})
+                        data = await asyncio.to_thread(encoder.encode, audio)
+                        if data:
+                            await websocket.send_bytes(data)
+                    tail = encoder.close()
+                    if tail:
+                        await websocket.send_bytes(tail)
+                    await websocket.send_json({"type": "end"})
+                except HTTPException as e:
+                    await websocket.send_json({"type": "error", "message": str(e.detail)})
+                except WebSocketDisconnect:
+                    raise
+                except Exception as e:  # noqa: BLE001
+                    logger.error(f"TTS websocket synthesis failed: {e}", exc_info=True)
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                finally:
+                    if chunks is not None:
+                        await chunks.aclose()
+        except WebSocketDisconnect:
+            logger.debug("TTS websocket client disconnected")
+
+    return router
@@ -23,6 +23,7 @@ import os
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 
+from bookroom_audio.utils.audio_input import UploadSpoolingRoute
 from bookroom_audio.utils.utils_api import (
     get_api_key_dependency,
     logger,
@@ -67,6 +68,7 @@ def create_video_routes(args: Any, api_key: Optional[str] = None):
     router = APIRouter(
         prefix="/v1/video",
         tags=["video"],
+        route_class=UploadSpoolingRoute,
         responses={
             400: {"description": "Invalid request parameters"},
             401: {"description": "Unauthorized - Invalid API key"},
@@ -1,11 +1,17 @@
 import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+import numpy as np
 from ascii_colors import ASCIIColors
 from faster_whisper import WhisperModel
 from faster_whisper.transcribe import Segment
 import os
 
+from bookroom_audio.utils.audio_input import ASR_SAMPLE_RATE
 from bookroom_audio.utils.utils_api import (
     logger,
     parse_keep_alive,
@@ -18,11 +24,14 @@ except ImportError:
     LocalEntryNotFoundError = Exception
     HAS_HF_HUB = False
 
-model_client = None
-model_last_loaded = None
-
 ModelQueryResponse = Iterable[Segment]
 
+# 模型池 key：(model_size_or_path, device, compute_type)
+ModelKey = tuple[str, str, str]
+
+# 扩容副本失败（如显存不足）后暂停扩容的秒数，期间请求排队等待已有副本
+REPLICA_LOAD_BACKOFF_S = 30.0
+
 
 def normalize_language_code(language: str | None) -> str | None:
     if not language:
@@ -52,6 +61,12 @@ def print_model_loading(args: Any, params: dict):
     ASCIIColors.yellow(f"{args.model.compute_type}")
     ASCIIColors.white("    ├─ num_workers: ", end="")
     ASCIIColors.yellow(f"{args.model.num_workers}")
+    ASCIIColors.white("    ├─ whisper_replicas: ", end="")
+    ASCIIColors.yellow(f"{args.model.whisper_replicas}")
+    ASCIIColors.white("    ├─ whisper_batch_size: ", end="")
+    ASCIIColors.yellow(f"{args.model.whisper_batch_size}")
+    ASCIIColors.white("    ├─ whisper_long_audio_s: ", end="")
+    ASCIIColors.yellow(f"{args.model.whisper_long_audio_s}")
     ASCIIColors.white("    ├─ model_keep_alive: ", end="")
     ASCIIColors.yellow(f"{args.model.model_keep_alive}")
     ASCIIColors.white("    ├─ download_root: ", end="")
@@ -72,33 +87,26 @@ def print_transcribing_audio(params: dict):
     ASCIIColors.yellow(f"{params.get('language')}")
 
 
-async def load_model_task(args: Any, params: dict):
-    global model_client
-    global model_last_loaded
-    print_transcribing_audio(params)
-    if model_client is None:
-        print_model_loading(args, params)
-        model_last_loaded = datetime.now()
-        try:
-            from bookroom_audio.utils.config import get_config
-            config = get_config()
-            
-            # 强制使用本地文件模式，禁止自动下载
-            # 原因：非官方Whisper模型可能包含广告，必须手动下载官方版本
-            model_client = WhisperModel(
-                model_size_or_path=params.get("model_size_or_path"),
-                device=args.model.device,
-                compute_type=args.model.compute_type,
-                num_workers=args.model.num_workers,
-                download_root=config.cache.cache_dir,
-                local_files_only=True,  # 强制本地模式，禁止自动下载
-            )
-            ASCIIColors.green("\nModel has been loaded\n")
-        except LocalEntryNotFoundError as e:
-            model_name = params.get("model_size_or_path")
-            from bookroom_audio.utils.config import get_config
-            config = get_config()
-            error_msg = f"""
+def _build_whisper_model(args: Any, key: ModelKey) -> WhisperModel:
+    """构建单个 WhisperModel 副本（同步，放线程池执行）"""
+    model_name, device, compute_type = key
+    from bookroom_audio.utils.config import get_config
+    config = get_config()
+    try:
+        # 强制使用本地文件模式，禁止自动下载
+        # 原因：非官方Whisper模型可能包含广告，必须手动下载官方版本
+        model = WhisperModel(
+            model_size_or_path=model_name,
+            device=device,
+            compute_type=compute_type,
+            num_workers=args.model.num_workers,
+            download_root=config.cache.cache_dir,
+            local_files_only=True,  # 强制本地模式，禁止自动下载
+        )
+        ASCIIColors.green("\nModel has been loaded\n")
+        return model
+    except LocalEntryNotFoundError as e:
+        error_msg = f"""
 ⚠️  Whisper 模型 '{model_name}' 未在本地缓存中找到！
 
 🔒 安全提示：本系统禁止自动下载 Whisper 模型，
@@ -125,11 +133,10 @@ async def load_model_task(args: Any, params: dict):
 
 💡 提示：下载完成后请重启服务器或等待模型自动重载
 """
-            ASCIIColors.red(f"\nModel loading failed: {error_msg}")
-            raise RuntimeError(error_msg)
-        except Exception as e:
-            model_name = params.get("model_size_or_path")
-            error_msg = f"""
+        ASCIIColors.red(f"\nModel loading failed: {error_msg}")
+        raise RuntimeError(error_msg)
+    except Exception as e:
+        error_msg = f"""
 ❌ Whisper 模型加载失败: {str(e)}
 
 💡 请确保：
@@ -141,58 +148,356 @@ async def load_model_task(args: Any, params: dict):
    export HF_ENDPOINT=https://www.modelscope.cn
    huggingface-cli download openai/whisper-{model_name}
 """
-            ASCIIColors.red(f"\nModel loading failed: {error_msg}")
-            raise RuntimeError(error_msg)
+        ASCIIColors.red(f"\nModel loading failed: {error_msg}")
+        raise RuntimeError(error_msg)
+
+
+class _PoolEntry:
+    """单个 key 的副本集合"""
+
+    def __init__(self, key: ModelKey) -> None:
+        self.key = key
+        self.replicas: list[Any] = []
+        self.idle: deque[Any] = deque()
+        self.in_use = 0
+        self.loading = 0
+        self.first_load: Optional[asyncio.Task] = None
+        # 尚无可用副本时的加载失败次数与最近一次异常：等待中的请求据此共享失败，不再继续挂起
+        self.load_failures = 0
+        self.load_error: Optional[BaseException] = None
+        # 扩容失败后的退避截止时间（time.monotonic），之前不再尝试扩容
+        self.scale_up_after = 0.0
+        self.cond = asyncio.Condition()
+        self.evict_handle: Optional[asyncio.TimerHandle] = None
+        self.last_used: Optional[datetime] = None
+
+
+class WhisperModelPool:
+    """按 (model, device, compute_type) 分 key 的 Whisper 模型副本池
+
+    - 首个副本单飞加载：并发的首个请求共享同一次加载（成功或失败）
+    - 每个 key 最多 max_replicas 个副本：无空闲副本且未达上限时按需扩容，
+      并发请求各占一个副本，不再排队于同一个 CTranslate2 实例；已有副本时扩容失败
+      只暂停扩容 REPLICA_LOAD_BACKOFF_S 秒，发起方与等待中的请求继续排队等空闲副本
+    - 按 key 独立的空闲卸载：最后一个副本归还后启动 keep_alive 计时，
+      期间有新请求则取消计时（keep_alive < 0 表示永不卸载）
+    """
+
+    def __init__(self, loader: Callable[[ModelKey], Any]) -> None:
+        self._loader = loader
+        self._entries: dict[ModelKey, _PoolEntry] = {}
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        key: ModelKey,
+        max_replicas: int = 1,
+        keep_alive: float = -1,
+    ) -> AsyncIterator[Any]:
+        """借出一个模型副本，退出上下文时归还"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _PoolEntry(key)
+            self._entries[key] = entry
+        if entry.evict_handle is not None:
+            entry.evict_handle.cancel()
+            entry.evict_handle = None
+        # 先登记占用，避免加载/等待期间被空闲卸载
+        entry.in_use += 1
+        try:
+            model = await self._checkout(entry, max(1, max_replicas))
+        except BaseException:
+            entry.in_use -= 1
+            self._schedule_evict(entry, keep_alive)
+            raise
+
+        try:
+            yield model
+        finally:
+            async with entry.cond:
+                entry.idle.append(model)
+                entry.in_use -= 1
+                entry.last_used = datetime.now()
+                entry.cond.notify()
+            self._schedule_evict(entry, keep_alive)
+
+    async def _checkout(self, entry: _PoolEntry, max_replicas: int) -> Any:
+        # 首个副本：单飞加载，并发首请求共享结果
+        if not entry.replicas:
+            if entry.first_load is None:
+                entry.first_load = asyncio.create_task(self._load_first(entry))
+            await asyncio.shield(entry.first_load)
+
+        while True:
+            async with entry.cond:
+                failures = entry.load_failures
+                while True:
+                    if entry.idle:
+                        return entry.idle.popleft()
+                    if entry.load_failures != failures:
+                        raise entry.load_error
+                    if (
+                        len(entry.replicas) + entry.loading < max_replicas
+                        and time.monotonic() >= entry.scale_up_after
+                    ):
+                        entry.loading += 1
+                        break
+                    await entry.cond.wait()
+
+            # 扩容副本（锁外加载，不阻塞其它请求归还/借出）
+            try:
+                model = await asyncio.to_thread(self._loader, entry.key)
+            except BaseException as e:
+                async with entry.cond:
+                    entry.loading -= 1
+                    entry.cond.notify_all()
+                    if not isinstance(e, Exception):
+                        raise
+                    logger.warning(f"Whisper replica load failed for {entry.key}: {e}")
+                    if entry.replicas:
+                        # 已有副本：退避后再扩容，当前请求回到队列等待空闲副本
+                        entry.scale_up_after = time.monotonic() + REPLICA_LOAD_BACKOFF_S
+                        continue
+                    entry.load_failures += 1
+                    entry.load_error = e
+                raise
+            async with entry.cond:
+                entry.loading -= 1
+                entry.replicas.append(model)
+                return model
+
+    async def _load_first(self, entry: _PoolEntry) -> None:
+        try:
+            model = await asyncio.to_thread(self._loader, entry.key)
+        except BaseException:
+            # 加载失败：移除该 key，后续请求重新尝试
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+            raise
+        async with entry.cond:
+            entry.replicas.append(model)
+            entry.idle.append(model)
+            entry.cond.notify_all()
+
+    def _schedule_evict(self, entry: _PoolEntry, keep_alive: float) -> None:
+        if keep_alive is None or keep_alive < 0:
+            return
+        if entry.in_use > 0 or entry.loading > 0:
+            return
+        if entry.evict_handle is not None:
+            entry.evict_handle.cancel()
+        loop = asyncio.get_running_loop()
+        entry.evict_handle = loop.call_later(keep_alive, self._evict_if_idle, entry)
+
+    def _evict_if_idle(self, entry: _PoolEntry) -> None:
+        entry.evict_handle = None
+        if entry.in_use > 0 or entry.loading > 0:
+            return
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+            ASCIIColors.blue(f"\nModel {entry.key[0]} has been idle for too long, unloading...\n")
+
+    async def clear(self) -> None:
+        """卸载全部副本"""
+        for entry in self._entries.values():
+            if entry.evict_handle is not None:
+                entry.evict_handle.cancel()
+                entry.evict_handle = None
+        self._entries.clear()
+
+    def __contains__(self, key: ModelKey) -> bool:
+        return key in self._entries
+
+    def status(self) -> list[dict]:
+        """各 key 的副本状态"""
+        return [
+            {
+                "model": entry.key[0],
+                "device": entry.key[1],
+                "compute_type": entry.key[2],
+                "replicas": len(entry.replicas),
+                "in_use": entry.in_use,
+                "idle": len(entry.idle),
+                "last_used": entry.last_used.isoformat() if entry.last_used else None,
+            }
+            for entry in self._entries.values()
+        ]
+
+
+model_pool: Optional[WhisperModelPool] = None
+batch_scheduler = None
+
+
+def get_model_pool(args: Any) -> WhisperModelPool:
+    """获取全局 Whisper 模型池（首次调用时创建）"""
+    global model_pool
+    if model_pool is None:
+        model_pool = WhisperModelPool(lambda key: _build_whisper_model(args, key))
+    return model_pool
+
+
+def get_batch_scheduler(args: Any):
+    """获取全局跨请求微批调度器；WHISPER_BATCH_SIZE <= 1 时返回 None（逐请求推理）"""
+    global batch_scheduler
+    if args.model.whisper_batch_size <= 1:
+        return None
+    if batch_scheduler is None:
+        from bookroom_audio.models.whisper_batch import WhisperBatchScheduler
+        batch_scheduler = WhisperBatchScheduler(
+            args,
+            get_model_pool(args),
+            max_batch_size=args.model.whisper_batch_size,
+            max_wait_ms=args.model.whisper_batch_wait_ms,
+            chunk_batch_size=args.model.whisper_batch_chunks,
+        )
+    return batch_scheduler
+
+
+def model_key(args: Any, params: dict) -> ModelKey:
+    """请求参数对应的模型池 key（whisper_batch / whisper_windows / whisper_dual 共用）"""
+    return (
+        params.get("model_size_or_path"),
+        args.model.device,
+        args.model.compute_type,
+    )
 
 
+def _transcribe_all(model: WhisperModel, params: dict, language: Optional[str]) -> list[Segment]:
+    """在工作线程内完成解码（segments 为惰性生成器，必须在借出副本期间消费完）"""
+    segments, _ = model.transcribe(
+        audio=params.get("audio"),
+        task=params.get("task"),
+        language=language,
+    )
+    return list(segments)
+
+
+async def load_model_task(args: Any, params: dict):
+    print_transcribing_audio(params)
+    pool = get_model_pool(args)
+    key = model_key(args, params)
+    if key not in pool:
+        print_model_loading(args, params)
+
     original_language = params.get("language")
     normalized_language = normalize_language_code(original_language)
-    
+
     if original_language and original_language != normalized_language:
         ASCIIColors.yellow(f"Language code converted: '{original_language}' -> '{normalized_language}'")
 
-    result, _ = await asyncio.to_thread(
-        model_client.transcribe,
-        audio=params.get("audio"), 
-        task=params.get("task"), 
-        language=normalized_language,
-    )
-    model_last_loaded = datetime.now()
-    return result
+    # 长音频：VAD 切窗后在多个副本上并发识别
+    audio = params.get("audio")
+    long_audio_s = args.model.whisper_long_audio_s
+    if long_audio_s > 0 and isinstance(audio, np.ndarray) and len(audio) >= long_audio_s * ASR_SAMPLE_RATE:
+        from bookroom_audio.models.whisper_windows import transcribe_long_audio
+        return await transcribe_long_audio(args, {**params, "language": normalized_language})
+
+    scheduler = get_batch_scheduler(args)
+    if scheduler is not None:
+        return await scheduler.submit(
+            key, params.get("audio"), params.get("task"), normalized_language
+        )
+
+    async with pool.acquire(
+        key,
+        max_replicas=args.model.whisper_replicas,
+        keep_alive=parse_keep_alive(args.model.model_keep_alive),
+    ) as model:
+        return await asyncio.to_thread(_transcribe_all, model, params, normalized_language)
+
+
+class SegmentStream:
+    """逐段输出识别结果的异步迭代器
+
+    后台任务借出一个模型副本，在工作线程中消费 faster-whisper 的惰性 segments 生成器，
+    每解出一段即通过队列交给事件循环；副本在工作线程结束后才归还。
+    调用方提前停止迭代（如客户端断开）时调用 aclose()，工作线程在下一段处退出。
+    """
+
+    _DONE = object()
+
+    def __init__(self, args: Any, params: dict) -> None:
+        self._args = args
+        self._params = params
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._stop = threading.Event()
+        self._info_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.info: Any = None
+
+    def _produce(self, model: WhisperModel, language: Optional[str], loop) -> None:
+        segments, info = model.transcribe(
+            audio=self._params.get("audio"),
+            task=self._params.get("task"),
+            language=language,
+        )
+        loop.call_soon_threadsafe(self._set_info, info)
+        for segment in segments:
+            if self._stop.is_set():
+                break
+            loop.call_soon_threadsafe(self._queue.put_nowait, segment)
+
+    def _set_info(self, info: Any) -> None:
+        self.info = info
+        self._info_ready.set()
+
+    async def _run(self) -> None:
+        args, params = self._args, self._params
+        print_transcribing_audio(params)
+        pool = get_model_pool(args)
+        key = model_key(args, params)
+        if key not in pool:
+            print_model_loading(args, params)
+        language = normalize_language_code(params.get("language"))
+        loop = asyncio.get_running_loop()
+        try:
+            async with pool.acquire(
+                key,
+                max_replicas=args.model.whisper_replicas,
+                keep_alive=parse_keep_alive(args.model.model_keep_alive),
+            ) as model:
+                await asyncio.to_thread(self._produce, model, language, loop)
+        except BaseException as e:
+            self._queue.put_nowait(e)
+            raise
+        finally:
+            self._info_ready.set()
+            self._queue.put_nowait(self._DONE)
+
+    async def start(self) -> Any:
+        """开始识别，返回 TranscriptionInfo（语言检测完成后即返回）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        await self._info_ready.wait()
+        if self.info is None:
+            item = self._queue.get_nowait()
+            raise item if isinstance(item, BaseException) else RuntimeError("Transcription failed")
+        return self.info
+
+    def __aiter__(self) -> AsyncIterator[Segment]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Segment]:
+        await self.start()
+        while True:
+            item = await self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    async def aclose(self) -> None:
+        self._stop.set()
 
 
 async def cleanup_model():
-    global model_client
-    global model_last_loaded
-    if model_client is not None:
+    if model_pool is not None:
         try:
             ASCIIColors.blue("\nCleaning up model...\n")
-            model_client = None
-            model_last_loaded = None
+            await model_pool.clear()
         except Exception as e:
             ASCIIColors.red(f"\nError in model cleaning up: {e}\n")
         finally:
             ASCIIColors.green("\nModel has been cleaned up\n")
-
-
-async def run_model_loaded_process(args: Any):
-    global model_last_loaded
-    while True:
-        model_keep_alive = parse_keep_alive(args.model.model_keep_alive)
-        try:
-            if model_keep_alive < 0 or model_keep_alive is None:
-                break
-            await asyncio.sleep(60)
-            if (
-                model_last_loaded
-                and (datetime.now() - model_last_loaded).total_seconds()
-                > model_keep_alive
-            ):
-                ASCIIColors.blue("\nModel has been loaded for too long, unloading...\n")
-                await cleanup_model()
-        except asyncio.CancelledError:
-            print("Task was cancelled")
-            break
-        except Exception as e:
-            print(f"An error occurred: {e}")
-            break
\ No newline at end of file
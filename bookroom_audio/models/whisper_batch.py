@@ -0,0 +1,239 @@
+"""
+Whisper 跨请求微批调度
+
+在 load_model_task 前收集一个时间窗口内到达的文件识别请求，按 (模型 key, task, language)
+分组后交给 faster-whisper 的 BatchedInferencePipeline 作为一次批量推理执行，再把 segments
+按时间范围拆回各请求。
+
+实现方式：同组请求的音频首尾拼接为一条长音频，各请求独立做 VAD 切成不超过 30s 的片段，
+以 clip_timestamps 形式传入批量管线——每个片段即一个批内样本，跨请求的片段在同一次
+encoder/decoder 调用中解码；输出 segment 的时间为拼接后的全局时间，按请求偏移量拆回。
+
+注意：批量管线不做温度回退与上文条件（condition_on_previous_text），识别结果与逐条
+WhisperModel.transcribe 略有差异，因此默认关闭（WHISPER_BATCH_SIZE=1）。
+"""
+
+import asyncio
+import dataclasses
+from typing import Any, Optional
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, decode_audio
+from faster_whisper.transcribe import Segment
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from bookroom_audio.utils.utils_api import logger, parse_keep_alive
+
+
+# 批量管线单个片段的最大时长（Whisper 窗口长度）
+CHUNK_LENGTH_S = 30
+
+# 分组 key：(模型 key, task, language)
+BatchGroupKey = tuple[tuple[str, str, str], str, Optional[str]]
+
+
+class _PendingRequest:
+    """等待入批的单个请求"""
+
+    def __init__(self, audio: Any) -> None:
+        self.audio = audio
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _BatchGroup:
+    """同一分组下正在收集的请求"""
+
+    def __init__(self) -> None:
+        self.pending: list[_PendingRequest] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+def speech_clips(audio: np.ndarray, sampling_rate: int) -> list[tuple[int, int]]:
+    """VAD 切分并把相邻语音段贪心合并为不超过 CHUNK_LENGTH_S 的片段（采样点区间）"""
+    regions = get_speech_timestamps(
+        audio,
+        VadOptions(max_speech_duration_s=CHUNK_LENGTH_S, min_silence_duration_ms=160),
+    )
+    max_len = CHUNK_LENGTH_S * sampling_rate
+    clips: list[tuple[int, int]] = []
+    for region in regions:
+        start, end = int(region["start"]), int(region["end"])
+        if clips and end - clips[-1][0] <= max_len:
+            clips[-1] = (clips[-1][0], end)
+        else:
+            clips.append((start, end))
+    return clips
+
+
+def shift_segment(segment: Segment, offset: float, limit: float) -> Segment:
+    """把全局时间的 segment 平移回请求自身的时间轴"""
+    def _shift(value: float) -> float:
+        return round(min(max(value - offset, 0.0), limit), 3)
+
+    changes: dict[str, Any] = {"start": _shift(segment.start), "end": _shift(segment.end)}
+    if getattr(segment, "words", None):
+        changes["words"] = [
+            dataclasses.replace(w, start=_shift(w.start), end=_shift(w.end))
+            for w in segment.words
+        ]
+    if hasattr(segment, "_replace"):
+        return segment._replace(**changes)
+    return dataclasses.replace(segment, **changes)
+
+
+def run_batch(
+    model: Any,
+    audios: list[Any],
+    task: str,
+    language: Optional[str],
+    chunk_batch_size: int = 8,
+) -> list[list[Segment]]:
+    """对一组请求执行一次批量推理（同步，放线程池执行）
+
+    Args:
+        model: WhisperModel 实例
+        audios: 各请求的音频（文件路径 / 文件对象 / 16kHz float32 ndarray）
+        task: transcribe / translate
+        language: 语言代码；None 时按片段逐个检测语言（multilingual）
+        chunk_batch_size: 每次 encoder/decoder 调用的片段数
+
+    Returns:
+        与 audios 一一对应的 segments 列表
+    """
+    sampling_rate = model.feature_extractor.sampling_rate
+
+    arrays: list[np.ndarray] = []
+    for audio in audios:
+        if isinstance(audio, np.ndarray):
+            arrays.append(audio.astype(np.float32, copy=False))
+        else:
+            arrays.append(decode_audio(audio, sampling_rate=sampling_rate))
+
+    offsets: list[int] = []
+    clip_timestamps: list[dict] = []
+    cursor = 0
+    for array in arrays:
+        offsets.append(cursor)
+        for start, end in speech_clips(array, sampling_rate):
+            clip_timestamps.append({
+                "start": (cursor + start) / sampling_rate,
+                "end": (cursor + end) / sampling_rate,
+            })
+        cursor += len(array)
+
+    results: list[list[Segment]] = [[] for _ in arrays]
+    if not clip_timestamps:
+        return results
+
+    pipeline = BatchedInferencePipeline(model)
+    segments, _ = pipeline.transcribe(
+        np.concatenate(arrays),
+        language=language,
+        task=task,
+        multilingual=language is None,
+        clip_timestamps=clip_timestamps,
+        batch_size=chunk_batch_size,
+    )
+
+    # 片段不跨请求，按 segment 起点归属到对应请求
+    bounds = np.asarray(offsets[1:], dtype=np.float64) / sampling_rate
+    for segment in segments:
+        idx = int(np.searchsorted(bounds, segment.start, side="right"))
+        offset = offsets[idx] / sampling_rate
+        limit = len(arrays[idx]) / sampling_rate
+        results[idx].append(shift_segment(segment, offset, limit))
+    return results
+
+
+class WhisperBatchScheduler:
+    """跨请求微批调度器
+
+    - 同组请求在 max_wait_ms 窗口内收集，满 max_batch_size 立即出批
+    - 每个批次从模型池借出一个副本执行；不同分组 / 批次可并行占用多个副本
+    """
+
+    def __init__(
+        self,
+        args: Any,
+        pool: Any,
+        max_batch_size: int,
+        max_wait_ms: int,
+        chunk_batch_size: int,
+    ) -> None:
+        self._args = args
+        self._pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0, max_wait_ms) / 1000.0
+        self.chunk_batch_size = max(1, chunk_batch_size)
+        self._groups: dict[BatchGroupKey, _BatchGroup] = {}
+        # 事件循环只弱引用任务：持有运行中的批次，避免执行中被回收
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        key: tuple[str, str, str],
+        audio: Any,
+        task: str,
+        language: Optional[str],
+    ) -> list[Segment]:
+        """提交单个请求，等待所在批次完成后返回其 segments"""
+        group_key: BatchGroupKey = (key, task, language)
+        group = self._groups.get(group_key)
+        if group is None:
+            group = _BatchGroup()
+            self._groups[group_key] = group
+
+        request = _PendingRequest(audio)
+        group.pending.append(request)
+
+        if len(group.pending) >= self.max_batch_size:
+            self._dispatch(group_key)
+        elif group.timer is None:
+            loop = asyncio.get_running_loop()
+            group.timer = loop.call_later(self.max_wait_s, self._dispatch, group_key)
+
+        return await request.future
+
+    def _dispatch(self, group_key: BatchGroupKey) -> None:
+        group = self._groups.pop(group_key, None)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+            group.timer = None
+        batch = [r for r in group.pending if not r.future.cancelled()]
+        if batch:
+            task = asyncio.create_task(self._run(group_key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group_key: BatchGroupKey, batch: list[_PendingRequest]) -> None:
+        key, task, language = group_key
+        logger.info(
+            f"Whisper batch: model={key[0]} task={task} language={language} size={len(batch)}"
+        )
+        error: BaseException = RuntimeError("Whisper batch was cancelled")
+        try:
+            async with self._pool.acquire(
+                key,
+                max_replicas=self._args.model.whisper_replicas,
+                keep_alive=parse_keep_alive(self._args.model.model_keep_alive),
+            ) as model:
+                results = await asyncio.to_thread(
+                    run_batch,
+                    model,
+                    [r.audio for r in batch],
+                    task,
+                    language,
+                    self.chunk_batch_size,
+                )
+            for request, segments in zip(batch, results):
+                if not request.future.done():
+                    request.future.set_result(segments)
+        except Exception as e:
+            error = e
+        finally:
+            # 出错或被取消（如关停）时，仍在等待的请求一律收到异常，不会永远挂起
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
@@ -0,0 +1,161 @@
+"""
+Whisper 转写 + 翻译共享编码
+同一段音频同时需要原文转写（transcribe）与英文翻译（translate）时，只解码一次音频、
+每个窗口只跑一次 encoder，两个任务的 decoder 共享同一份 encoder 输出。
+
+实现方式：两个任务都走 faster-whisper 的 BatchedInferencePipeline，使用同一组 VAD
+片段（clip_timestamps），因此两次运行送入 encoder 的特征批完全相同。模型外包一层
+SharedEncoderModel，按特征内容摘要记忆 encode() 的输出；两个任务的 segments 生成器
+交替推进，encoder 输出被另一个任务取用后即丢弃，记忆中只保留最近几个批次。
+记忆未命中时照常计算 encoder，结果正确性不依赖命中率。
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.models.whisper import (
+    get_model_pool,
+    model_key,
+    normalize_language_code,
+    print_model_loading,
+    print_transcribing_audio,
+)
+from bookroom_audio.models.whisper_batch import speech_clips
+from bookroom_audio.utils.utils_api import logger, parse_keep_alive
+
+
+class SharedEncoderModel:
+    """WhisperModel 代理：encode() 按特征内容记忆，其余属性透传
+
+    每份 encoder 输出最多被 uses 个任务取用，取满即从记忆中移除。
+    """
+
+    def __init__(self, model: Any, uses: int = 2, max_entries: int = 4) -> None:
+        self._model = model
+        self._uses = uses
+        self._max_entries = max_entries
+        self._memo: OrderedDict[bytes, list] = OrderedDict()
+        self._lock = threading.Lock()
+        self.encoder_calls = 0
+        self.encoder_hits = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+    def encode(self, features: np.ndarray):
+        key = hashlib.blake2b(
+            np.ascontiguousarray(features).tobytes(), digest_size=16
+        ).digest() + str(features.shape).encode()
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._memo[key]
+                self.encoder_hits += 1
+                return entry[0]
+
+        output = self._model.encode(features)
+        with self._lock:
+            self.encoder_calls += 1
+            self._memo[key] = [output, self._uses - 1]
+            while len(self._memo) > self._max_entries:
+                self._memo.popitem(last=False)
+        return output
+
+
+def _interleave(
+    first: Iterator[Segment], second: Iterator[Segment]
+) -> tuple[list[Segment], list[Segment]]:
+    """交替推进两个 segments 生成器：总是推进进度（最后一段起点）落后的那个"""
+    results: tuple[list[Segment], list[Segment]] = ([], [])
+    iterators = [first, second]
+    progress = [-1.0, -1.0]
+    active = [True, True]
+    while any(active):
+        if all(active):
+            i = 0 if progress[0] <= progress[1] else 1
+        else:
+            i = 0 if active[0] else 1
+        segment = next(iterators[i], None)
+        if segment is None:
+            active[i] = False
+            continue
+        results[i].append(segment)
+        progress[i] = segment.start
+    return results
+
+
+def run_both_tasks(
+    model: Any,
+    audio: np.ndarray,
+    language: Optional[str],
+    chunk_batch_size: int = 8,
+) -> tuple[list[Segment], list[Segment], Optional[str]]:
+    """对同一段音频同时生成转写与英文翻译（同步，放线程池执行）
+
+    Returns:
+        (转写 segments, 翻译 segments, 语言)
+    """
+    sampling_rate = model.feature_extractor.sampling_rate
+    clips = speech_clips(audio, sampling_rate)
+    if not clips:
+        return [], [], language
+
+    clip_timestamps = [
+        {"start": start / sampling_rate, "end": end / sampling_rate} for start, end in clips
+    ]
+    shared = SharedEncoderModel(model)
+    pipeline = BatchedInferencePipeline(shared)
+
+    transcribe_segments, info = pipeline.transcribe(
+        audio,
+        task="transcribe",
+        language=language,
+        clip_timestamps=clip_timestamps,
+        batch_size=chunk_batch_size,
+    )
+    # 翻译沿用转写检测出的语言，不再重复语言检测
+    translate_segments, _ = pipeline.transcribe(
+        audio,
+        task="translate",
+        language=info.language,
+        clip_timestamps=clip_timestamps,
+        batch_size=chunk_batch_size,
+    )
+    transcribed, translated = _interleave(transcribe_segments, translate_segments)
+    logger.info(
+        f"Whisper transcribe+translate: {len(clips)} clips, "
+        f"encoder runs={shared.encoder_calls}, shared={shared.encoder_hits}"
+    )
+    return transcribed, translated, info.language
+
+
+async def load_model_task_both(args: Any, params: dict):
+    """从模型池借出一个副本，同时完成转写与翻译"""
+    print_transcribing_audio({**params, "task": "transcribe+translate"})
+    pool = get_model_pool(args)
+    key = model_key(args, params)
+    if key not in pool:
+        print_model_loading(args, params)
+
+    language = normalize_language_code(params.get("language"))
+    async with pool.acquire(
+        key,
+        max_replicas=args.model.whisper_replicas,
+        keep_alive=parse_keep_alive(args.model.model_keep_alive),
+    ) as model:
+        return await asyncio.to_thread(
+            run_both_tasks,
+            model,
+            params.get("audio"),
+            language,
+            args.model.whisper_batch_chunks,
+        )
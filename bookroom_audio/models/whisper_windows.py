@@ -0,0 +1,193 @@
+"""
+Whisper 分窗识别
+把一段音频按窗口（在静音点切开、互不重叠）送入模型池识别，再把各窗口的 segments
+平移回整段音频的时间轴。
+
+- transcribe_windows：按到达顺序逐窗识别，用于上传未结束即开始识别的增量接收模式
+- transcribe_long_audio：长音频先用 VAD 在静音处切窗，多个窗口并发占用模型池的多个副本
+  识别（CTranslate2 推理期间释放 GIL，线程即可并行），墙钟时间随副本数缩短
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+import numpy as np
+from ascii_colors import ASCIIColors
+from faster_whisper.transcribe import Segment
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from bookroom_audio.models.whisper import (
+    get_model_pool,
+    model_key,
+    normalize_language_code,
+    print_model_loading,
+    print_transcribing_audio,
+)
+from bookroom_audio.models.whisper_batch import shift_segment
+from bookroom_audio.utils.audio_input import ASR_SAMPLE_RATE
+from bookroom_audio.utils.utils_api import logger, parse_keep_alive
+
+# 窗口：(在整段音频中的起始样本, 16kHz float32 样本)
+Window = tuple[int, np.ndarray]
+
+
+def _transcribe_window(
+    model: Any, audio: np.ndarray, task: str, language: Optional[str]
+) -> tuple[list[Segment], Optional[str]]:
+    """识别单个窗口，返回 segments 与检测到的语言（同步，放线程池执行）"""
+    segments, info = model.transcribe(audio=audio, task=task, language=language)
+    return list(segments), info.language
+
+
+def to_global_timeline(segment: Segment, start_s: float, end_s: float) -> Segment:
+    """把窗口内时间的 segment 平移到整段音频时间轴，并限制在窗口范围内"""
+    return shift_segment(segment, offset=-start_s, limit=end_s)
+
+
+async def transcribe_windows(
+    args: Any,
+    params: dict,
+    windows: AsyncIterator[Window],
+    sampling_rate: int = ASR_SAMPLE_RATE,
+) -> list[Segment]:
+    """按到达顺序逐窗识别
+
+    每个窗口单独从模型池借出副本，窗口之间不占用模型，等待上传 / 解码期间其他请求可用。
+    未指定语言时，首个窗口检测到的语言用于后续窗口，避免窗口间语言跳变。
+    """
+    print_transcribing_audio(params)
+    pool = get_model_pool(args)
+    key = model_key(args, params)
+    if key not in pool:
+        print_model_loading(args, params)
+
+    original_language = params.get("language")
+    language = normalize_language_code(original_language)
+    if original_language and original_language != language:
+        ASCIIColors.yellow(f"Language code converted: '{original_language}' -> '{language}'")
+
+    task = params.get("task")
+    keep_alive = parse_keep_alive(args.model.model_keep_alive)
+    results: list[Segment] = []
+    count = 0
+    async for start, audio in windows:
+        if not len(audio):
+            continue
+        async with pool.acquire(
+            key, max_replicas=args.model.whisper_replicas, keep_alive=keep_alive
+        ) as model:
+            segments, detected = await asyncio.to_thread(
+                _transcribe_window, model, audio, task, language
+            )
+        if language is None and detected:
+            language = detected
+        start_s = start / sampling_rate
+        end_s = (start + len(audio)) / sampling_rate
+        results.extend(to_global_timeline(s, start_s, end_s) for s in segments)
+        count += 1
+        logger.debug(f"Whisper window {count}: {start_s:.2f}s-{end_s:.2f}s, {len(segments)} segments")
+    return results
+
+
+def split_at_silences(
+    audio: np.ndarray,
+    window_s: float,
+    sampling_rate: int = ASR_SAMPLE_RATE,
+) -> list[Window]:
+    """VAD 检测语音段，贪心合并为不超过 window_s 的窗口，切点取相邻语音段之间静音的中点
+
+    窗口首尾相接覆盖整段音频；没有检测到语音时返回空列表。
+    """
+    regions = get_speech_timestamps(
+        audio,
+        VadOptions(max_speech_duration_s=window_s, min_silence_duration_ms=300),
+        sampling_rate=sampling_rate,
+    )
+    if not regions:
+        return []
+
+    max_len = int(window_s * sampling_rate)
+    cuts = [0]
+    prev_end = None
+    for region in regions:
+        start, end = int(region["start"]), int(region["end"])
+        if prev_end is not None and end - cuts[-1] > max_len:
+            cuts.append((prev_end + start) // 2)
+        prev_end = end
+    cuts.append(len(audio))
+    return [(a, audio[a:b]) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _normalize_text(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def merge_window_segments(per_window: list[list[Segment]], tolerance_s: float = 1.0) -> list[Segment]:
+    """按窗口顺序合并（segments 已在全局时间轴上），去掉窗口边界处重复的文本
+
+    - 完全落在上一段结束之前的 segment 丢弃
+    - 窗口首段与上一窗口末段文本相同且时间相邻（tolerance_s 内）时视为重复，丢弃
+    """
+    merged: list[Segment] = []
+    for segments in per_window:
+        for i, segment in enumerate(segments):
+            if merged:
+                last = merged[-1]
+                if segment.end <= last.end and segment.start < last.end:
+                    continue
+                if (
+                    i == 0
+                    and segment.start - last.end <= tolerance_s
+                    and _normalize_text(segment.text) == _normalize_text(last.text)
+                ):
+                    continue
+            merged.append(segment)
+    return merged
+
+
+async def transcribe_long_audio(
+    args: Any,
+    params: dict,
+    sampling_rate: int = ASR_SAMPLE_RATE,
+) -> list[Segment]:
+    """长音频并发分窗识别
+
+    未指定语言时先识别首个窗口确定语言，其余窗口并发提交；模型池按 WHISPER_REPLICAS
+    限制同时占用的副本数，超出的窗口排队等待空闲副本。
+    """
+    audio = params.get("audio")
+    window_s = args.model.whisper_window_s
+    windows = await asyncio.to_thread(split_at_silences, audio, window_s, sampling_rate)
+    logger.info(
+        f"Whisper long audio: {len(audio) / sampling_rate:.1f}s -> {len(windows)} windows "
+        f"(window={window_s}s, replicas={args.model.whisper_replicas})"
+    )
+    if not windows:
+        return []
+
+    print_transcribing_audio(params)
+    pool = get_model_pool(args)
+    key = model_key(args, params)
+    if key not in pool:
+        print_model_loading(args, params)
+
+    task = params.get("task")
+    language = normalize_language_code(params.get("language"))
+    keep_alive = parse_keep_alive(args.model.model_keep_alive)
+
+    async def run(window: Window, lang: Optional[str]) -> tuple[list[Segment], Optional[str]]:
+        start, samples = window
+        async with pool.acquire(
+            key, max_replicas=args.model.whisper_replicas, keep_alive=keep_alive
+        ) as model:
+            segments, detected = await asyncio.to_thread(
+                _transcribe_window, model, samples, task, lang
+            )
+        start_s = start / sampling_rate
+        end_s = (start + len(samples)) / sampling_rate
+        return [to_global_timeline(s, start_s, end_s) for s in segments], detected
+
+    first, detected = await run(windows[0], language)
+    language = language or detected
+    rest = await asyncio.gather(*(run(w, language) for w in windows[1:]))
+    return merge_window_segments([first] + [segments for segments, _ in rest])
@@ -13,7 +13,6 @@ import uvicorn
 
 from bookroom_audio.models.whisper import (
     cleanup_model as cleanup_whisper_model,
-    run_model_loaded_process,
 )
 from bookroom_audio.api.routers.server_routes import create_server_routes
 from bookroom_audio.api.routers.transcribe_routes import create_transcribe_routes
@@ -22,6 +21,8 @@ from bookroom_audio.api.routers.tts_routes import create_tts_routes
 from bookroom_audio.api.routers.video_routes import create_video_routes
 from bookroom_audio.api.routers.image_routes import create_image_routes
 from bookroom_audio.api.routers.openai_routes import create_openai_routes
+from bookroom_audio.api.routers.batch_routes import create_batch_routes
+from bookroom_audio.services.batch_runner import get_batch_runner
 from bookroom_audio.utils.utils_api import (
     get_cors_origins,
     parse_args,
@@ -81,10 +82,17 @@ def create_app(args) -> FastAPI:
         signal.signal(signal.SIGTERM, signal_handler)
         
         try:
-            async with global_lock:
-                task = asyncio.create_task(run_model_loaded_process(args))
-                task.add_done_callback(app.state.background_tasks.discard)
-                logger.info(f"Process {os.getpid()} auto scan task started at startup.")
+            # Whisper 模型按 key 空闲卸载（见 models/whisper.py WhisperModelPool），无需后台轮询任务
+            # 批量任务：启动工作协程，继续执行上次未完成的任务
+            await get_batch_runner(args).start()
+            # Kokoro：预加载 KOKORO_PRELOAD_VOICES 中的音色（连带模型），首个请求不再等待下载 / 加载
+            if os.getenv("KOKORO_PRELOAD_VOICES"):
+                from bookroom_audio.api.routers.tts.engines import _check_kokoro_available, preload_kokoro_voices
+                if _check_kokoro_available():
+                    try:
+                        await asyncio.to_thread(preload_kokoro_voices)
+                    except Exception as e:
+                        logger.error(f"Kokoro voice preload failed: {e}")
             ASCIIColors.green("\nServer is ready to accept connections! 🚀\n")
             yield
         finally:
@@ -101,6 +109,11 @@ def create_app(args) -> FastAPI:
                             pass
             
             ASCIIColors.green("\nServer is shutting down! 🛑\n")
+
+            try:
+                await get_batch_runner(args).stop()
+            except Exception as e:
+                logger.error(f"Error during batch runner shutdown: {e}")
             
             # 在应用关闭时清理模型
             try:
@@ -115,6 +128,13 @@ def create_app(args) -> FastAPI:
             except Exception as e:
                 logger.error(f"Error during VL model cleanup: {e}")
             
+            # 回收 pyttsx3 worker 进程
+            try:
+                from bookroom_audio.api.routers.tts.pyttsx3_pool import shutdown_pyttsx3_pool
+                await asyncio.to_thread(shutdown_pyttsx3_pool)
+            except Exception as e:
+                logger.error(f"Error during pyttsx3 pool shutdown: {e}")
+
             # 清理流式 ASR 后端
             try:
                 from bookroom_audio.api.routers.transcribe_streaming.engines import (
@@ -151,6 +171,10 @@ def create_app(args) -> FastAPI:
             "name": "image",
             "description": "Image content analysis and moderation API routes. Supports Qwen3-VL models."
         },
+        {
+            "name": "batch",
+            "description": "Asynchronous batch jobs for bulk transcription and speech synthesis, persisted in a local SQLite store."
+        },
         {
             "name": "openai-compatible",
             "description": "OpenAI-compatible API routes. Supports audio transcription, translation, speech synthesis, video analysis, and image analysis."
@@ -186,6 +210,8 @@ def create_app(args) -> FastAPI:
 
     api_key = args.server.api_key
 
+    # 上传文件在阈值内保持在内存中，直接解码，不经过磁盘临时文件（上传路由按请求读取该阈值）
+    app.state.upload_spool_max_bytes = args.server.upload_spool_max_mb * 1024 * 1024
 
     # 自定义错误处理程序
     @app.exception_handler(HTTPException)
@@ -215,6 +241,7 @@ def create_app(args) -> FastAPI:
     app.include_router(create_video_routes(args, api_key))
     app.include_router(create_image_routes(args, api_key))
     app.include_router(create_openai_routes(args, api_key))
+    app.include_router(create_batch_routes(args, api_key))
 
     # 代理绝对 URI 路径归一化（沙箱代理会把绝对 URI 编码成 http%3A//...，FastAPI 会 404）
     app = _ProxyPathNormalizeMiddleware(app)
@@ -0,0 +1,144 @@
+"""
+文件识别准入控制
+每个 ASR 引擎一个有界队列：同时执行的请求数不超过 concurrency（0 不限，此时不排队也不拒绝），
+排队请求数不超过 max_queue；队列已满时立即拒绝（HTTP 429），并按观测到的实时率（RTF，处理耗时 / 音频时长）
+估算 Retry-After，避免突发请求全部挤进线程池、拖慢所有人的延迟。
+
+- 实时率与音频时长用指数滑动平均（EMA）跟踪，估算单个请求的服务时间
+- 计数：运行 / 排队中的请求数、已准入 / 已拒绝次数、排队等待时间
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+# 尚无观测数据时假定的单请求服务时间（秒）
+DEFAULT_SERVICE_S = 5.0
+EMA_ALPHA = 0.2
+
+
+class QueueFullError(Exception):
+    """队列已满，retry_after 为建议的重试等待秒数"""
+
+    def __init__(self, engine: str, retry_after: int) -> None:
+        self.engine = engine
+        self.retry_after = retry_after
+        super().__init__(f"ASR queue for '{engine}' is full, retry after {retry_after}s")
+
+
+def _ema(previous: Optional[float], value: float) -> float:
+    return value if previous is None else previous + EMA_ALPHA * (value - previous)
+
+
+class Ticket:
+    """一次准入；调用方在解码后填写 audio_seconds，用于更新实时率"""
+
+    def __init__(self) -> None:
+        self.audio_seconds: Optional[float] = None
+        self.wait_s = 0.0
+
+
+class AdmissionController:
+    """单个引擎的有界工作队列（须在同一事件循环中使用）"""
+
+    def __init__(self, engine: str, concurrency: int = 0, max_queue: int = 0) -> None:
+        self.engine = engine
+        # 0 表示不限并发数 / 排队数
+        self.concurrency = max(0, concurrency)
+        self.max_queue = max(0, max_queue)
+        self._semaphore = asyncio.Semaphore(self.concurrency) if self.concurrency else None
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.rtf_ema: Optional[float] = None
+        self.audio_s_ema: Optional[float] = None
+        self.service_s_ema: Optional[float] = None
+        self.wait_s_ema: Optional[float] = None
+        self.max_wait_s = 0.0
+
+    def estimated_service_s(self) -> float:
+        """单请求服务时间估计：平均音频时长 × 实时率，缺少音频时长时用平均耗时"""
+        if self.rtf_ema is not None and self.audio_s_ema is not None:
+            return self.rtf_ema * self.audio_s_ema
+        return self.service_s_ema if self.service_s_ema is not None else DEFAULT_SERVICE_S
+
+    def retry_after(self) -> int:
+        """排在当前所有请求之后所需的大致秒数"""
+        backlog = self.queued + self.running
+        return max(1, math.ceil(backlog * self.estimated_service_s() / max(1, self.concurrency)))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Ticket]:
+        """获取执行名额；队列已满时立即抛出 QueueFullError"""
+        if (
+            self.max_queue and self.concurrency
+            and self.running >= self.concurrency and self.queued >= self.max_queue
+        ):
+            self.rejected += 1
+            raise QueueFullError(self.engine, self.retry_after())
+
+        ticket = Ticket()
+        enqueued = time.monotonic()
+        self.queued += 1
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        ticket.wait_s = time.monotonic() - enqueued
+        self.wait_s_ema = _ema(self.wait_s_ema, ticket.wait_s)
+        self.max_wait_s = max(self.max_wait_s, ticket.wait_s)
+        self.admitted += 1
+        self.running += 1
+
+        started = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            self.running -= 1
+            if self._semaphore is not None:
+                self._semaphore.release()
+        self._observe(time.monotonic() - started, ticket.audio_seconds)
+
+    def _observe(self, elapsed: float, audio_seconds: Optional[float]) -> None:
+        self.service_s_ema = _ema(self.service_s_ema, elapsed)
+        if audio_seconds:
+            self.rtf_ema = _ema(self.rtf_ema, elapsed / audio_seconds)
+            self.audio_s_ema = _ema(self.audio_s_ema, audio_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_s_ema * 1000, 1) if self.wait_s_ema is not None else 0.0,
+            "wait_ms_max": round(self.max_wait_s * 1000, 1),
+            "rtf": round(self.rtf_ema, 4) if self.rtf_ema is not None else None,
+            "estimated_service_s": round(self.estimated_service_s(), 3),
+        }
+
+
+_controllers: dict[str, AdmissionController] = {}
+
+
+def get_admission_controller(args, engine: str) -> AdmissionController:
+    """按引擎获取全局准入控制器（首次调用时按 ASR_CONCURRENCY / ASR_MAX_QUEUE 创建）"""
+    controller = _controllers.get(engine)
+    if controller is None:
+        controller = AdmissionController(
+            engine,
+            concurrency=args.model.asr_concurrency,
+            max_queue=args.model.asr_max_queue,
+        )
+        _controllers[engine] = controller
+    return controller
+
+
+def admission_stats() -> dict:
+    return {engine: controller.stats() for engine, controller in _controllers.items()}
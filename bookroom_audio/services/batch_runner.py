@@ -0,0 +1,124 @@
+"""
+批量任务执行
+固定数量的工作协程从 BatchStore 领取任务项，按接口分派给处理函数，结果写回存储。
+
+- 每个工作协程优先领取与上一项相同 pack_key（同引擎 / 模型 / 参数）的项，模型保持加载状态，
+  多个工作协程并发提交时还可被 Whisper 跨请求微批等机制合并
+- 处理函数抛出 429（引擎队列已满）时项放回队列，等待 Retry-After 后重试，不计为失败
+- 启动时把上次中断的 running 项放回队列，服务重启后继续执行
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+from bookroom_audio.services.batch_store import BatchStore
+from bookroom_audio.utils.utils_api import logger
+
+# 处理函数：(任务项) -> 写入结果的 JSON 对象
+BatchHandler = Callable[[dict], Awaitable[Any]]
+
+# 空闲时兜底轮询间隔（秒）；正常情况下提交任务会立即唤醒工作协程
+IDLE_POLL_S = 30.0
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        store: BatchStore,
+        handlers: dict[str, BatchHandler],
+        workers: int = 2,
+    ) -> None:
+        self.store = store
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        recovered = await asyncio.to_thread(self.store.recover)
+        if recovered:
+            logger.info(f"[batch] Re-queued {recovered} interrupted items")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._wakeup.set()
+
+    def notify(self) -> None:
+        """有新任务提交时唤醒空闲的工作协程"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, worker_id: int) -> None:
+        last_key: Optional[str] = None
+        while True:
+            item = await asyncio.to_thread(self.store.claim_next, last_key)
+            if item is None:
+                self._wakeup.clear()
+                # 清除后再确认一次，避免错过清除前刚提交的任务
+                if not await asyncio.to_thread(self.store.has_pending):
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=IDLE_POLL_S)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+            last_key = item["pack_key"]
+            await self._run_item(worker_id, item)
+
+    async def _run_item(self, worker_id: int, item: dict) -> None:
+        job_id, index = item["job_id"], item["index"]
+        handler = self.handlers.get(item["endpoint"])
+        try:
+            if handler is None:
+                raise ValueError(f"Unsupported endpoint: {item['endpoint']}")
+            result = await handler(item)
+        except asyncio.CancelledError:
+            # 服务关闭：保持 running，下次启动由 recover() 放回队列
+            raise
+        except HTTPException as e:
+            if e.status_code == 429:
+                retry_after = float((e.headers or {}).get("Retry-After", 1))
+                await asyncio.to_thread(self.store.requeue_item, job_id, index)
+                await asyncio.sleep(retry_after)
+                return
+            await asyncio.to_thread(self.store.fail_item, job_id, index, str(e.detail))
+        except Exception as e:
+            logger.error(f"[batch] {job_id}#{index} failed: {e}", exc_info=True)
+            await asyncio.to_thread(self.store.fail_item, job_id, index, str(e))
+        else:
+            await asyncio.to_thread(self.store.complete_item, job_id, index, result)
+            logger.debug(f"[batch] worker {worker_id} finished {job_id}#{index}")
+
+
+_runner: Optional[BatchRunner] = None
+
+
+def batch_dir(args) -> str:
+    return args.server.batch_dir or os.path.join(args.cache.cache_dir, "batches")
+
+
+def get_batch_runner(args, handlers: Optional[dict[str, BatchHandler]] = None) -> BatchRunner:
+    """全局批量执行器（首次调用时按 BATCH_DIR / BATCH_WORKERS 创建）"""
+    global _runner
+    if _runner is None:
+        _runner = BatchRunner(
+            BatchStore(batch_dir(args)),
+            handlers or {},
+            workers=args.server.batch_workers,
+        )
+    elif handlers:
+        _runner.handlers.update(handlers)
+    return _runner
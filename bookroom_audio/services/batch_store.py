@@ -0,0 +1,292 @@
+"""
+批量任务持久化存储
+SQLite 单文件保存批量任务（job）与其中每一项（item）的状态和结果，服务重启后未完成的任务
+继续执行。
+
+- jobs：任务元信息（接口、状态、创建 / 完成时间、metadata）
+- items：每项的请求体、状态（pending / running / completed / failed / cancelled）、结果或错误、
+  尝试次数；pack_key 为同模型同参数的分组键，工作线程优先领取与上一项相同分组的项，
+  使同一模型连续处理
+- 任务的输入文件放在 <job_id>/inputs/，任务结束（全部项完成 / 失败 / 取消）后删除
+- 所有方法同步，调用方放线程池执行；内部用锁串行化对连接的访问
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+JOB_IN_PROGRESS = "in_progress"
+JOB_COMPLETED = "completed"
+JOB_CANCELLED = "cancelled"
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_COMPLETED = "completed"
+ITEM_FAILED = "failed"
+ITEM_CANCELLED = "cancelled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    completed_at INTEGER,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    custom_id TEXT,
+    body TEXT NOT NULL,
+    pack_key TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status, job_id, idx);
+"""
+
+
+class BatchStore:
+    """批量任务存储（目录下 batches.db，任务文件放在 <directory>/<job_id>/）"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "batches.db"), check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def inputs_dir(self, job_id: str) -> str:
+        return os.path.join(self.job_dir(job_id), "inputs")
+
+    def remove_inputs(self, job_id: str) -> None:
+        """删除任务的输入文件；任务目录随之为空（无合成输出）时一并删除"""
+        shutil.rmtree(self.inputs_dir(job_id), ignore_errors=True)
+        try:
+            os.rmdir(self.job_dir(job_id))
+        except OSError:
+            pass
+
+    # ---- 任务 ----
+    @staticmethod
+    def new_job_id() -> str:
+        return f"batch_{uuid.uuid4().hex}"
+
+    def create_job(
+        self,
+        endpoint: str,
+        items: list[dict],
+        metadata: Optional[dict] = None,
+        job_id: Optional[str] = None,
+    ) -> dict:
+        """items: [{'custom_id', 'body', 'pack_key'}]；job_id 为空时新生成（预先写入输入文件时由调用方生成）"""
+        job_id = job_id or self.new_job_id()
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs (id, endpoint, status, created_at, metadata) VALUES (?, ?, ?, ?, ?)",
+                (job_id, endpoint, JOB_IN_PROGRESS, now, json.dumps(metadata or {}, ensure_ascii=False)),
+            )
+            self._conn.executemany(
+                "INSERT INTO items (job_id, idx, custom_id, body, pack_key, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, i, item.get("custom_id"), json.dumps(item["body"], ensure_ascii=False),
+                     item.get("pack_key"), ITEM_PENDING, now)
+                    for i, item in enumerate(items)
+                ],
+            )
+            self._conn.execute("COMMIT")
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        return self._job_dict(row, counts)
+
+    def list_jobs(self, limit: int = 20) -> list[dict]:
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)
+            ).fetchall()]
+        return [job for job in (self.get_job(i) for i in ids) if job is not None]
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row, counts: dict) -> dict:
+        return {
+            "id": row["id"],
+            "object": "batch",
+            "endpoint": row["endpoint"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "completed_at": row["completed_at"],
+            "request_counts": {
+                "total": sum(counts.values()),
+                "pending": counts.get(ITEM_PENDING, 0) + counts.get(ITEM_RUNNING, 0),
+                "completed": counts.get(ITEM_COMPLETED, 0),
+                "failed": counts.get(ITEM_FAILED, 0),
+                "cancelled": counts.get(ITEM_CANCELLED, 0),
+            },
+            "metadata": json.loads(row["metadata"] or "{}"),
+        }
+
+    def cancel_job(self, job_id: str) -> Optional[dict]:
+        """取消任务：未开始的项标记为 cancelled，执行中的项照常完成（最后一项结束时删除输入文件）"""
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE items SET status = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (ITEM_CANCELLED, now, job_id, ITEM_PENDING),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, completed_at = COALESCE(completed_at, ?) "
+                "WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, now, job_id, JOB_IN_PROGRESS),
+            )
+            running = self._count_unfinished(job_id)
+            self._conn.execute("COMMIT")
+        if not running:
+            self.remove_inputs(job_id)
+        return self.get_job(job_id)
+
+    def _count_unfinished(self, job_id: str) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN (?, ?)",
+            (job_id, ITEM_PENDING, ITEM_RUNNING),
+        ).fetchone()[0]
+
+    # ---- 任务项 ----
+    def claim_next(self, prefer_pack_key: Optional[str] = None) -> Optional[dict]:
+        """领取下一个待处理项并标记为 running；优先与 prefer_pack_key 同组，其次按提交顺序"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items.* FROM items JOIN jobs ON jobs.id = items.job_id "
+                "WHERE items.status = ? AND jobs.status = ? "
+                "ORDER BY (items.pack_key IS ?) DESC, jobs.created_at, jobs.rowid, items.idx LIMIT 1",
+                (ITEM_PENDING, JOB_IN_PROGRESS, prefer_pack_key),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE items SET status = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (ITEM_RUNNING, int(time.time()), row["job_id"], row["idx"]),
+            )
+            endpoint = self._conn.execute(
+                "SELECT endpoint FROM jobs WHERE id = ?", (row["job_id"],)
+            ).fetchone()[0]
+        return {
+            "job_id": row["job_id"],
+            "index": row["idx"],
+            "custom_id": row["custom_id"],
+            "endpoint": endpoint,
+            "body": json.loads(row["body"]),
+            "pack_key": row["pack_key"],
+            "attempts": row["attempts"] + 1,
+        }
+
+    def _finish_item(self, job_id: str, index: int, status: str, result: Any, error: Optional[str]) -> None:
+        now = int(time.time())
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "UPDATE items SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE job_id = ? AND idx = ?",
+                (status, None if result is None else json.dumps(result, ensure_ascii=False, default=str),
+                 error, now, job_id, index),
+            )
+            remaining = self._count_unfinished(job_id)
+            if not remaining:
+                self._conn.execute(
+                    "UPDATE jobs SET status = CASE WHEN status = ? THEN ? ELSE status END, "
+                    "completed_at = COALESCE(completed_at, ?) WHERE id = ?",
+                    (JOB_IN_PROGRESS, JOB_COMPLETED, now, job_id),
+                )
+            self._conn.execute("COMMIT")
+        if not remaining:
+            self.remove_inputs(job_id)
+
+    def complete_item(self, job_id: str, index: int, result: Any) -> None:
+        self._finish_item(job_id, index, ITEM_COMPLETED, result, None)
+
+    def fail_item(self, job_id: str, index: int, error: str) -> None:
+        self._finish_item(job_id, index, ITEM_FAILED, None, error)
+
+    def requeue_item(self, job_id: str, index: int) -> None:
+        """放回队列（如引擎队列已满），不计入失败；任务已取消时改为 cancelled"""
+        with self._lock:
+            cancelled = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND status = ?", (job_id, JOB_CANCELLED)
+            ).fetchone() is not None
+        if cancelled:
+            self._finish_item(job_id, index, ITEM_CANCELLED, None, None)
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET status = ?, updated_at = ? WHERE job_id = ? AND idx = ? AND status = ?",
+                (ITEM_PENDING, int(time.time()), job_id, index, ITEM_RUNNING),
+            )
+
+    def recover(self) -> int:
+        """启动时把上次中断的 running 项放回队列，返回放回的数量"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE items SET status = ? WHERE status = ?", (ITEM_PENDING, ITEM_RUNNING)
+            )
+            return cursor.rowcount
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM items JOIN jobs ON jobs.id = items.job_id "
+                "WHERE items.status = ? AND jobs.status = ? LIMIT 1",
+                (ITEM_PENDING, JOB_IN_PROGRESS),
+            ).fetchone() is not None
+
+    def item_results(self, job_id: str, finished_only: bool = True) -> list[dict]:
+        """按提交顺序返回各项结果；finished_only 时只含已结束（完成 / 失败 / 取消）的项"""
+        query = "SELECT * FROM items WHERE job_id = ?"
+        params: tuple = (job_id,)
+        if finished_only:
+            query += " AND status IN (?, ?, ?)"
+            params += (ITEM_COMPLETED, ITEM_FAILED, ITEM_CANCELLED)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY idx", params).fetchall()
+        return [
+            {
+                "index": row["idx"],
+                "custom_id": row["custom_id"],
+                "status": row["status"],
+                "response": json.loads(row["result"]) if row["result"] else None,
+                "error": row["error"],
+            }
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
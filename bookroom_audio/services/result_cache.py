@@ -0,0 +1,254 @@
+"""
+内容寻址结果缓存
+以内容摘要（SHA-256）为 key 缓存推理结果，避免相同输入重复跑模型。
+
+- 内存层：OrderedDict LRU，按条目数限制
+- 磁盘层：每个 key 一个文件（<dir>/<key[:2]>/<key>），按总字节数限制，超出时按访问时间
+  淘汰最久未用的文件；启动时扫描目录重建索引，重启后仍可命中
+- 单飞：同一 key 的并发请求只执行一次计算，其余请求等待并共享结果（或异常）
+- 计数：内存 / 磁盘命中、未命中、合并的并发请求数
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from bookroom_audio.utils.utils_api import logger
+
+
+def content_key(*parts) -> str:
+    """把若干 key 组成部分（bytes / str / None）合成为一个 SHA-256 十六进制 key"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            part = b"\x00"
+        elif isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def hash_file(fileobj, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件对象内容的 SHA-256（同步，放线程池执行），结束后回到文件开头"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+class _DiskTier:
+    """按字节数限制的磁盘缓存层（所有方法同步，调用方放线程池执行）"""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load_index(self) -> None:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            with self._lock:
+                self._bytes -= self._index.pop(key, 0)
+            return None
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(value)
+            self._bytes += len(value)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    @property
+    def entries(self) -> int:
+        return len(self._index)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+class ResultCache:
+    """两级（内存 LRU + 磁盘）内容寻址缓存，值为 bytes"""
+
+    def __init__(
+        self,
+        name: str,
+        memory_items: int = 256,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        self.name = name
+        self.memory_items = max(0, memory_items)
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._disk = _DiskTier(disk_dir, disk_max_bytes) if disk_dir and disk_max_bytes > 0 else None
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory_items > 0 or self._disk is not None
+
+    def _remember(self, key: str, value: bytes) -> None:
+        if self.memory_items <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return value
+        if self._disk is not None:
+            value = await asyncio.to_thread(self._disk.get, key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+        return None
+
+    async def put(self, key: str, value: bytes) -> None:
+        self._remember(key, value)
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.put, key, value)
+            except OSError as e:
+                logger.warning(f"[{self.name} cache] Failed to write disk entry: {e}")
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        命中直接返回；未命中时执行 compute 并写入缓存；同 key 并发请求共享同一次计算。
+
+        计算在缓存持有的任务中执行，各调用方经 asyncio.shield 等待：某个调用方（包括发起计算的那个）
+        被取消只结束它自己的等待，不会让共享同一次计算的其他调用方收到 CancelledError。
+        """
+        if not self.enabled:
+            return await compute()
+
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            # 所有调用方都已取消时无人取结果，避免 "Task exception was never retrieved"
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[bytes]]) -> bytes:
+        try:
+            value = await compute()
+            await self.put(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self.memory_items,
+            "disk_entries": self._disk.entries if self._disk else 0,
+            "disk_bytes": self._disk.bytes if self._disk else 0,
+            "disk_max_bytes": self._disk.max_bytes if self._disk else 0,
+        }
+
+
+_caches: dict[str, ResultCache] = {}
+
+
+def get_result_cache(args, name: str) -> ResultCache:
+    """按名称获取全局缓存实例（首次调用时按 CacheConfig 创建，磁盘目录为 <result_cache_dir>/<name>）"""
+    cache = _caches.get(name)
+    if cache is None:
+        config = args.cache
+        base_dir = config.result_cache_dir or os.path.join(config.cache_dir, "results")
+        cache = ResultCache(
+            name,
+            memory_items=config.result_cache_memory_items,
+            disk_dir=os.path.join(base_dir, name),
+            disk_max_bytes=config.result_cache_disk_mb * 1024 * 1024,
+        )
+        _caches[name] = cache
+    return cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,167 @@
+"""
+文件识别 VAD 预过滤
+识别前用 VAD 找出语音段，只把语音段（含少量前后留白）拼接后送入 Whisper / Qwen3-ASR，
+长时间静音（停顿、翻页）不再参与解码；识别结果的时间戳再映射回原始音频时间轴。
+
+VAD 可选：
+- silero：faster-whisper 自带的 Silero VAD（onnx，无需额外依赖）
+- fsmn：与流式识别子系统共用的 FunASR fsmn-vad 模型（需安装 funasr）
+"""
+
+import threading
+from typing import Any, Optional
+
+import numpy as np
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from bookroom_audio.utils.audio_input import ASR_SAMPLE_RATE
+from bookroom_audio.utils.utils_api import logger
+
+VAD_METHODS = ("off", "silero", "fsmn")
+
+# fsmn-vad 输出不含留白，前后各补 200ms，避免截掉词首词尾
+FSMN_PAD_MS = 200
+
+_fsmn_lock = threading.Lock()
+
+
+def _silero_regions(audio: np.ndarray, sampling_rate: int) -> list[tuple[int, int]]:
+    regions = get_speech_timestamps(audio, VadOptions(), sampling_rate=sampling_rate)
+    return [(int(r["start"]), int(r["end"])) for r in regions]
+
+
+def _fsmn_regions(audio: np.ndarray, sampling_rate: int) -> list[tuple[int, int]]:
+    from bookroom_audio.api.routers.transcribe_streaming.engines.sensevoice import _get_vad_model
+
+    vad_model = _get_vad_model()
+    with _fsmn_lock:
+        results = vad_model.generate(input=audio, cache={}, is_final=True)
+    pad = FSMN_PAD_MS * sampling_rate // 1000
+    regions = []
+    for start_ms, end_ms in (results[0].get("value") or []) if results else []:
+        start = max(0, start_ms * sampling_rate // 1000 - pad)
+        end = min(len(audio), end_ms * sampling_rate // 1000 + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def detect_speech(
+    audio: np.ndarray, method: str, sampling_rate: int = ASR_SAMPLE_RATE
+) -> list[tuple[int, int]]:
+    """返回语音段采样点区间 [(start, end)]，按时间排序且互不重叠
+
+    fsmn 不可用（未安装 funasr）时回退到 silero。
+    """
+    if method == "fsmn":
+        from bookroom_audio.api.routers.transcribe_streaming.engines.base import EngineUnavailableError
+
+        try:
+            return _fsmn_regions(audio, sampling_rate)
+        except EngineUnavailableError as e:
+            logger.warning(f"fsmn-vad unavailable ({e}), falling back to silero VAD")
+    return _silero_regions(audio, sampling_rate)
+
+
+class SpeechTimeline:
+    """拼接后音频时间 -> 原始音频时间的映射"""
+
+    def __init__(self, regions: list[tuple[int, int]], total_samples: int, sampling_rate: int) -> None:
+        self.regions = regions
+        self.total_samples = total_samples
+        self.sampling_rate = sampling_rate
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        # 每个语音段在拼接音频中的起点
+        self._compact_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(regions) else lengths
+        self._original_starts = np.array([start for start, _ in regions], dtype=np.int64)
+        self.speech_samples = int(lengths.sum())
+
+    @property
+    def skipped_fraction(self) -> float:
+        if not self.total_samples:
+            return 0.0
+        return 1.0 - self.speech_samples / self.total_samples
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """拼接音频中的时间（秒）映射回原始时间；段边界上的结束时间归属前一段"""
+        if not len(self.regions):
+            return t
+        sample = t * self.sampling_rate
+        side = "left" if is_end else "right"
+        idx = max(0, int(np.searchsorted(self._compact_starts, sample, side=side)) - 1)
+        start, end = self.regions[idx]
+        original = self._original_starts[idx] + (sample - self._compact_starts[idx])
+        return round(float(min(original, end)) / self.sampling_rate, 3)
+
+    def restore_segments(self, segments: list) -> list:
+        """把格式化结果中 dict 形式 segments 的 start / end 映射回原始时间（原地修改）"""
+        for segment in segments:
+            if not isinstance(segment, dict):
+                continue
+            if isinstance(segment.get("start"), (int, float)):
+                segment["start"] = self.to_original(segment["start"])
+            if isinstance(segment.get("end"), (int, float)):
+                segment["end"] = self.to_original(segment["end"], is_end=True)
+        return segments
+
+
+class _VadStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.audio_seconds = 0.0
+        self.speech_seconds = 0.0
+
+    def record(self, timeline: SpeechTimeline) -> None:
+        self.requests += 1
+        self.audio_seconds += timeline.total_samples / timeline.sampling_rate
+        self.speech_seconds += timeline.speech_samples / timeline.sampling_rate
+
+    def as_dict(self) -> dict:
+        skipped = self.audio_seconds - self.speech_seconds
+        return {
+            "requests": self.requests,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "skipped_seconds": round(skipped, 3),
+            "skipped_fraction": round(skipped / self.audio_seconds, 4) if self.audio_seconds else 0.0,
+        }
+
+
+_stats = _VadStats()
+
+
+def vad_stats() -> dict:
+    return _stats.as_dict()
+
+
+def prefilter_audio(
+    audio: np.ndarray, method: str, sampling_rate: int = ASR_SAMPLE_RATE
+) -> tuple[np.ndarray, SpeechTimeline]:
+    """去掉非语音部分（同步，放线程池执行）
+
+    Returns:
+        (拼接后的语音音频, 时间映射)
+    """
+    regions = detect_speech(audio, method, sampling_rate)
+    timeline = SpeechTimeline(regions, len(audio), sampling_rate)
+    _stats.record(timeline)
+    logger.info(
+        f"VAD prefilter ({method}): {len(regions)} speech regions, "
+        f"skipped {timeline.skipped_fraction:.1%} of {len(audio) / sampling_rate:.1f}s"
+    )
+    if not regions:
+        return audio[:0], timeline
+    compact = np.concatenate([audio[start:end] for start, end in regions])
+    return compact, timeline
+
+
+def restore_result(result: dict, timeline: Optional[SpeechTimeline]) -> dict:
+    """把 process_audio_task 的格式化结果（含可选 translation）映射回原始时间轴"""
+    if timeline is None:
+        return result
+    timeline.restore_segments(result.get("segments") or [])
+    translation: Any = result.get("translation")
+    if isinstance(translation, dict):
+        timeline.restore_segments(translation.get("segments") or [])
+    return result
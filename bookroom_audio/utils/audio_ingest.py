@@ -0,0 +1,296 @@
+"""
+文件识别增量接收
+请求体仍在上传时就开始解码与识别：multipart 分块写入 ByteStreamPipe，解码线程用 PyAV
+从管道增量解码为 16kHz 单声道 float32，AudioWindower 按静音点切成窗口交给模型。
+
+- ByteStreamPipe：线程安全、只增不减的字节缓冲，读端阻塞等待后续数据；支持回退 seek，
+  向后 seek / SEEK_END 会等到对应数据（或上传结束）到达，因此 moov 在末尾的 mp4 也能解码，
+  只是退化为上传完成后才开始。缓冲为 SpooledTemporaryFile：超过 UPLOAD_SPOOL_MAX_MB 后
+  溢写到磁盘匿名临时文件，与普通上传一致
+- MultipartAudioExtractor：基于 python-multipart 的回调解析器，分离文本字段与音频文件分块
+- AudioWindower：累积样本，在目标时长附近能量最低处切窗，保证窗口边界落在停顿上
+"""
+
+import io
+import tempfile
+import threading
+from typing import Callable, Optional
+
+import av
+import numpy as np
+
+try:
+    import python_multipart as multipart
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+
+from bookroom_audio.utils.audio_input import ASR_SAMPLE_RATE, DEFAULT_SPOOL_MAX_BYTES
+
+# multipart 中被视为音频文件的字段名（与 /v1/audio/transcriptions 一致）
+AUDIO_FIELD_NAMES = ("file", "file_upload")
+
+
+class ByteStreamPipe(io.RawIOBase):
+    """写端在事件循环中追加数据，读端在解码线程中阻塞读取
+
+    spool_max_bytes：内存中最多保留的字节数，超过后整个缓冲溢写到磁盘临时文件（关闭时删除）
+    """
+
+    def __init__(self, spool_max_bytes: int = DEFAULT_SPOOL_MAX_BYTES) -> None:
+        super().__init__()
+        # 容器需要回退 seek（如 mp4 末尾的 moov），不能丢弃已读数据，只能换到磁盘
+        self._file = tempfile.SpooledTemporaryFile(max_size=max(0, spool_max_bytes))
+        self._size = 0
+        self._pos = 0
+        self._eof = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    # ---- 写端 ----
+    def feed(self, data: bytes) -> None:
+        if not data:
+            return
+        with self._cond:
+            self._file.seek(self._size)
+            self._file.write(data)
+            self._size += len(data)
+            self._cond.notify_all()
+
+    def finish(self) -> None:
+        """上传结束"""
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    def abort(self, error: BaseException) -> None:
+        """上传中断：唤醒并终止读端"""
+        with self._cond:
+            self._error = error
+            self._eof = True
+            self._cond.notify_all()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        with self._cond:
+            self._file.close()
+        super().close()
+
+    # ---- 读端 ----
+    def _wait_for(self, predicate: Callable[[], bool]) -> None:
+        self._cond.wait_for(lambda: predicate() or self._eof)
+        if self._error is not None:
+            raise self._error
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        with self._cond:
+            self._wait_for(lambda: self._size > self._pos)
+            n = min(len(b), self._size - self._pos)
+            if n <= 0:
+                return 0
+            self._file.seek(self._pos)
+            n = self._file.readinto(memoryview(b)[:n])
+            self._pos += n
+            return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        with self._cond:
+            if whence == io.SEEK_SET:
+                target = offset
+            elif whence == io.SEEK_CUR:
+                target = self._pos + offset
+            elif whence == io.SEEK_END:
+                self._wait_for(lambda: False)
+                target = self._size + offset
+            else:
+                raise ValueError(f"Invalid whence: {whence}")
+            if target < 0:
+                raise ValueError("Negative seek position")
+            if target > self._size:
+                self._wait_for(lambda: self._size >= target)
+            self._pos = min(target, self._size)
+            return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def decode_incremental(
+    source,
+    on_samples: Callable[[np.ndarray], None],
+    sampling_rate: int = ASR_SAMPLE_RATE,
+) -> int:
+    """从文件对象增量解码音频，每解出一批帧即回调（同步，放线程池执行）
+
+    Returns:
+        解码得到的总样本数
+    """
+    resampler = av.audio.resampler.AudioResampler(
+        format="flt", layout="mono", rate=sampling_rate
+    )
+    total = 0
+    with av.open(source, mode="r", metadata_errors="ignore") as container:
+        frames = iter(container.decode(audio=0))
+        while True:
+            try:
+                frame = next(frames)
+            except StopIteration:
+                frame = None  # 冲刷重采样器
+            except av.error.InvalidDataError:
+                continue
+            if frame is not None:
+                frame.pts = None  # 忽略时间戳检查（同 faster_whisper.decode_audio）
+            for out in resampler.resample(frame):
+                samples = out.to_ndarray().reshape(-1)
+                total += len(samples)
+                on_samples(samples)
+            if frame is None:
+                break
+    return total
+
+
+class MultipartAudioExtractor:
+    """把 multipart/form-data 分块拆为文本字段与音频文件数据
+
+    音频文件分块直接回调 on_audio，不在内存中另存整个请求体；文本字段收集到 fields。
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        on_audio: Callable[[bytes], None],
+    ) -> None:
+        _, options = multipart.multipart.parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise ValueError("Missing boundary in multipart/form-data")
+
+        self.fields: dict[str, str] = {}
+        self.audio_seen = False
+        self.audio_filename: Optional[str] = None
+        self._on_audio = on_audio
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._part_name: Optional[str] = None
+        self._part_filename: Optional[str] = None
+        self._part_value = bytearray()
+        self._part_is_audio = False
+
+        callbacks = {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        }
+        self._parser = multipart.MultipartParser(boundary, callbacks)
+
+    def write(self, chunk: bytes) -> None:
+        self._parser.write(chunk)
+
+    def finalize(self) -> None:
+        self._parser.finalize()
+
+    def _on_part_begin(self) -> None:
+        self._part_name = None
+        self._part_filename = None
+        self._part_value = bytearray()
+        self._part_is_audio = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field.extend(data[start:end])
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value.extend(data[start:end])
+
+    def _on_header_end(self) -> None:
+        if bytes(self._header_field).lower() == b"content-disposition":
+            _, options = multipart.multipart.parse_options_header(bytes(self._header_value))
+            if b"name" in options:
+                self._part_name = options[b"name"].decode("latin-1")
+            if b"filename" in options:
+                self._part_filename = options[b"filename"].decode("utf-8", "replace")
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+
+    def _on_headers_finished(self) -> None:
+        # 只接收第一个音频文件分块
+        self._part_is_audio = (
+            not self.audio_seen
+            and (self._part_filename is not None or self._part_name in AUDIO_FIELD_NAMES)
+        )
+        if self._part_is_audio:
+            self.audio_seen = True
+            self.audio_filename = self._part_filename
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part_is_audio:
+            self._on_audio(bytes(data[start:end]))
+        elif self._part_filename is None:
+            self._part_value.extend(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if not self._part_is_audio and self._part_name and self._part_filename is None:
+            self.fields[self._part_name] = self._part_value.decode("utf-8", "replace")
+
+
+class AudioWindower:
+    """把增量到达的样本切成窗口，切点取目标时长前 search_s 范围内能量最低的 20ms 帧"""
+
+    def __init__(
+        self,
+        window_s: float,
+        sampling_rate: int = ASR_SAMPLE_RATE,
+        search_s: float = 5.0,
+    ) -> None:
+        self.sampling_rate = sampling_rate
+        self.window = max(1, int(window_s * sampling_rate))
+        self.search = min(int(search_s * sampling_rate), self.window // 2)
+        self.frame = max(1, sampling_rate // 50)
+        self._chunks: list[np.ndarray] = []
+        self._pending = 0
+        self._offset = 0
+
+    def push(self, samples: np.ndarray) -> list[tuple[int, np.ndarray]]:
+        """追加样本，返回已完整的窗口 [(起始样本, 样本)]"""
+        if len(samples):
+            self._chunks.append(samples)
+            self._pending += len(samples)
+        windows = []
+        while self._pending >= self.window:
+            buffer = np.concatenate(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+            cut = self._cut_point(buffer)
+            windows.append((self._offset, buffer[:cut]))
+            rest = buffer[cut:]
+            self._chunks = [rest] if len(rest) else []
+            self._pending = len(rest)
+            self._offset += cut
+        return windows
+
+    def flush(self) -> Optional[tuple[int, np.ndarray]]:
+        """上传结束，返回剩余样本组成的最后一个窗口"""
+        if not self._pending:
+            return None
+        buffer = np.concatenate(self._chunks)
+        self._chunks, self._pending = [], 0
+        return self._offset, buffer
+
+    def _cut_point(self, buffer: np.ndarray) -> int:
+        if self.search < self.frame:
+            return self.window
+        region = buffer[self.window - self.search:self.window]
+        n_frames = len(region) // self.frame
+        energy = np.square(region[:n_frames * self.frame]).reshape(n_frames, self.frame).mean(axis=1)
+        # 能量相同时取最靠后的帧，窗口尽量接近目标时长
+        quietest = n_frames - 1 - int(np.argmin(energy[::-1]))
+        return self.window - self.search + quietest * self.frame + self.frame // 2
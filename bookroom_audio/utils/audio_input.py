@@ -0,0 +1,90 @@
+"""
+文件识别音频输入处理
+上传音频直接在内存中解码为 16kHz 单声道 float32 ndarray 交给模型，不再落盘中转。
+
+上传文件由 Starlette 以 SpooledTemporaryFile 接收：不超过阈值时全程在内存，超过阈值才
+溢写到磁盘匿名临时文件，请求结束时随 UploadFile 关闭自动删除。阈值由 UPLOAD_SPOOL_MAX_MB 配置，
+写入 app.state.upload_spool_max_bytes，由上传路由的 UploadSpoolingRoute 按请求应用。
+"""
+
+import asyncio
+from typing import Any, BinaryIO, Callable, Coroutine, Union
+
+import numpy as np
+from faster_whisper import decode_audio
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+# 模型输入采样率（Whisper / Qwen3-ASR 均为 16kHz）
+ASR_SAMPLE_RATE = 16000
+
+# 上传内存缓冲阈值默认值（UPLOAD_SPOOL_MAX_MB=16）
+DEFAULT_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def upload_spool_max_bytes(request: Request) -> int:
+    """当前应用配置的上传内存缓冲阈值（未配置时用默认值）"""
+    app = request.scope.get("app")
+    value = getattr(getattr(app, "state", None), "upload_spool_max_bytes", None)
+    return DEFAULT_SPOOL_MAX_BYTES if value is None else max(0, int(value))
+
+
+class UploadSpoolingRequest(Request):
+    """multipart 表单按 upload_spool_max_bytes 缓冲上传文件的请求（不修改 Starlette 全局的解析器）"""
+
+    async def _get_form(
+        self,
+        *,
+        max_files: Union[int, float] = 1000,
+        max_fields: Union[int, float] = 1000,
+        max_part_size: int = 1024 * 1024,
+    ) -> FormData:
+        if self._form is not None or not self.headers.get("content-type", "").startswith("multipart/form-data"):
+            return await super()._get_form(
+                max_files=max_files, max_fields=max_fields, max_part_size=max_part_size
+            )
+        parser = MultiPartParser(
+            self.headers,
+            self.stream(),
+            max_files=max_files,
+            max_fields=max_fields,
+            max_part_size=max_part_size,
+        )
+        parser.spool_max_size = upload_spool_max_bytes(self)
+        try:
+            self._form = await parser.parse()
+        except MultiPartException as exc:
+            raise HTTPException(status_code=400, detail=exc.message)
+        return self._form
+
+
+class UploadSpoolingRoute(APIRoute):
+    """接收上传文件的路由：请求体按 UploadSpoolingRequest 解析"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def spooling_handler(request: Request) -> Response:
+            return await handler(UploadSpoolingRequest(request.scope, request.receive))
+
+        return spooling_handler
+
+
+def decode_audio_source(
+    source: Union[str, BinaryIO],
+    sampling_rate: int = ASR_SAMPLE_RATE,
+) -> np.ndarray:
+    """把文件路径或文件对象解码为单声道 float32 ndarray（同步，放线程池执行）"""
+    if hasattr(source, "seek"):
+        source.seek(0)
+    audio = decode_audio(source, sampling_rate=sampling_rate)
+    if audio.size == 0:
+        raise ValueError("Decoded audio is empty")
+    return audio
+
+
+async def decode_upload(upload: Any, sampling_rate: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """直接从 UploadFile 的底层文件对象解码，不复制整段内容、不写临时文件"""
+    return await asyncio.to_thread(decode_audio_source, upload.file, sampling_rate)
@@ -21,6 +21,11 @@ class ServerConfig:
     ssl: bool = False
     ssl_certfile: Optional[str] = None
     ssl_keyfile: Optional[str] = None
+    # 上传文件内存缓冲阈值（MB）：不超过该大小的上传全程在内存中解码，超过才溢写到磁盘临时文件
+    upload_spool_max_mb: int = 16
+    # 批量任务：工作协程数、SQLite 存储目录（默认 <cache_dir>/batches）
+    batch_workers: int = 2
+    batch_dir: Optional[str] = None
     
     @classmethod
     def from_env(cls) -> 'ServerConfig':
@@ -35,6 +40,9 @@ class ServerConfig:
             ssl=str(os.getenv("SERVER_SSL", "False")).lower() == "true",
             ssl_certfile=os.getenv("SERVER_SSL_CERTFILE", None),
             ssl_keyfile=os.getenv("SERVER_SSL_KEYFILE", None),
+            upload_spool_max_mb=int(os.getenv("UPLOAD_SPOOL_MAX_MB", "16")),
+            batch_workers=int(os.getenv("BATCH_WORKERS", "2")),
+            batch_dir=os.getenv("BATCH_DIR", None),
         )
 
 
@@ -45,10 +53,27 @@ class ModelConfig:
     asr_engine: str = "qwen-asr"
     asr_model: str = "medium"
     asr_language: str = "zh"
+    # 文件识别 VAD 预过滤：off / silero / fsmn
+    asr_vad_filter: str = "off"
+    # 文件识别准入控制（每个引擎）：同时执行数、排队上限（0 不限）
+    asr_concurrency: int = 0
+    asr_max_queue: int = 32
     
     # TTS 配置
     tts_engine: str = "chattts"
     tts_language: str = "zh"
+    # ChatTTS 跨请求合批：单批最多合并的文本数（<=1 关闭）、收集窗口毫秒数
+    chattts_batch_size: int = 1
+    chattts_batch_wait_ms: int = 50
+    # 长文本并行合成：每引擎同时合成的段数（<=1 关闭）、每段最大字数、段间交叉淡化毫秒数
+    tts_parallel_workers: int = 1
+    tts_segment_chars: int = 200
+    tts_crossfade_ms: int = 30
+    # pyttsx3 常驻 worker 进程数（<=0 关闭，使用线程本地引擎）
+    pyttsx3_workers: int = 0
+    # TTS 文本前端：中文数字 / 日期读法开关、逐句规范化结果与 G2P 的 LRU 缓存条数（<=0 关闭）
+    tts_normalize_numbers: bool = True
+    tts_frontend_cache_items: int = 4096
     
     # VL (Vision-Language) 配置
     vl_model: str = "medium"
@@ -60,6 +85,18 @@ class ModelConfig:
     model_keep_alive: str = "5m"
     num_workers: int = 1
 
+    # Whisper 文件识别配置
+    # 每个 (model, device, compute_type) 最多保留的 WhisperModel 副本数，并发请求各占一个副本
+    whisper_replicas: int = 1
+    # 跨请求微批：单批最多合并的请求数（<=1 关闭）、收集窗口毫秒数、每次 encoder/decoder 调用的片段数
+    whisper_batch_size: int = 1
+    whisper_batch_wait_ms: int = 50
+    whisper_batch_chunks: int = 8
+    # 增量接收 / 长音频模式的目标窗口时长（秒）
+    whisper_window_s: int = 30
+    # 长音频模式阈值（秒）：不短于该时长的音频按 VAD 静音切窗并在多个副本上并发识别，0 关闭
+    whisper_long_audio_s: int = 0
+
     # 流式 ASR 配置
     # 注：模型默认值对应官方简写别名（funasr 自动映射 ModelScope 仓库）
     # 权威定义见 transcribe_streaming/constants.py 的 DefaultModel 枚举
@@ -99,10 +136,21 @@ class ModelConfig:
             asr_engine=os.getenv("ASR_ENGINE", "qwen-asr"),
             asr_model=os.getenv("ASR_MODEL", "medium"),
             asr_language=os.getenv("ASR_LANGUAGE", "zh"),
+            asr_vad_filter=os.getenv("ASR_VAD_FILTER", "off").lower(),
+            asr_concurrency=int(os.getenv("ASR_CONCURRENCY", "0")),
+            asr_max_queue=int(os.getenv("ASR_MAX_QUEUE", "32")),
             
             # TTS 配置
             tts_engine=os.getenv("TTS_ENGINE", "chattts"),
             tts_language=os.getenv("TTS_LANGUAGE", "zh"),
+            chattts_batch_size=int(os.getenv("CHATTTS_BATCH_SIZE", "1")),
+            chattts_batch_wait_ms=int(os.getenv("CHATTTS_BATCH_WAIT_MS", "50")),
+            tts_parallel_workers=int(os.getenv("TTS_PARALLEL_WORKERS", "1")),
+            tts_segment_chars=int(os.getenv("TTS_SEGMENT_CHARS", "200")),
+            tts_crossfade_ms=int(os.getenv("TTS_CROSSFADE_MS", "30")),
+            pyttsx3_workers=int(os.getenv("PYTTSX3_WORKERS", "0")),
+            tts_normalize_numbers=str(os.getenv("TTS_NORMALIZE_NUMBERS", "True")).lower() == "true",
+            tts_frontend_cache_items=int(os.getenv("TTS_FRONTEND_CACHE_ITEMS", "4096")),
             
             # VL 配置
             vl_model=os.getenv("VL_MODEL", "medium"),
@@ -113,6 +161,14 @@ class ModelConfig:
             compute_type=os.getenv("COMPUTE_TYPE", "int8"),
             model_keep_alive=os.getenv("MODEL_KEEP_ALIVE", "5m"),
             num_workers=int(os.getenv("NUM_WORKERS", "1")),
+
+            # Whisper 文件识别配置
+            whisper_replicas=int(os.getenv("WHISPER_REPLICAS", "1")),
+            whisper_batch_size=int(os.getenv("WHISPER_BATCH_SIZE", "1")),
+            whisper_batch_wait_ms=int(os.getenv("WHISPER_BATCH_WAIT_MS", "50")),
+            whisper_batch_chunks=int(os.getenv("WHISPER_BATCH_CHUNKS", "8")),
+            whisper_window_s=int(os.getenv("WHISPER_WINDOW_S", "30")),
+            whisper_long_audio_s=int(os.getenv("WHISPER_LONG_AUDIO_S", "0")),
             
             # 流式 ASR 配置
             # 注：模型默认值对应官方简写别名（funasr 自动映射 ModelScope 仓库）
@@ -146,6 +202,12 @@ class CacheConfig:
     
     # 模型源配置
     model_source: str = "huggingface"  # huggingface, modelscope, local
+
+    # 推理结果缓存（内容寻址）：内存 LRU 条目数、磁盘层容量（MB），均为 0 时关闭
+    result_cache_memory_items: int = 256
+    result_cache_disk_mb: int = 1024
+    # 磁盘层目录，默认 <cache_dir>/results
+    result_cache_dir: Optional[str] = None
     
     @classmethod
     def from_env(cls) -> 'CacheConfig':
@@ -177,6 +239,9 @@ class CacheConfig:
             hf_endpoint=os.getenv("HF_ENDPOINT", None),
             hf_token=os.getenv("HF_TOKEN", None),
             model_source=os.getenv("MODEL_SOURCE", "huggingface"),
+            result_cache_memory_items=int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "256")),
+            result_cache_disk_mb=int(os.getenv("RESULT_CACHE_DISK_MB", "1024")),
+            result_cache_dir=os.getenv("RESULT_CACHE_DIR", None),
         )
     
     def setup_environment(self):
@@ -340,6 +405,8 @@ def print_config_summary():
     print(f"  - Host: {config.server.host}")
     print(f"  - Port: {config.server.port}")
     print(f"  - Workers: {config.server.workers}")
+    print(f"  - Upload Spool Max: {config.server.upload_spool_max_mb}MB")
+    print(f"  - Batch Workers: {config.server.batch_workers} (dir: {config.server.batch_dir or '<cache_dir>/batches'})")
     print(f"  - Debug: {config.server.debug}")
     print(f"  - API Key: {'已设置' if config.server.api_key else '未设置'}")
     
@@ -347,13 +414,23 @@ def print_config_summary():
     print(f"  - ASR Engine: {config.model.asr_engine}")
     print(f"  - ASR Model: {config.model.asr_model}")
     print(f"  - ASR Language: {config.model.asr_language}")
+    print(f"  - ASR VAD Filter: {config.model.asr_vad_filter}")
+    print(f"  - ASR Concurrency: {config.model.asr_concurrency} (queue: {config.model.asr_max_queue}, 0 = unlimited)")
     print(f"  - TTS Engine: {config.model.tts_engine}")
     print(f"  - TTS Language: {config.model.tts_language}")
+    print(f"  - ChatTTS Batch Size: {config.model.chattts_batch_size} (wait {config.model.chattts_batch_wait_ms}ms)")
+    print(f"  - TTS Parallel Workers: {config.model.tts_parallel_workers} (segment {config.model.tts_segment_chars} chars, crossfade {config.model.tts_crossfade_ms}ms)")
+    print(f"  - pyttsx3 Workers: {config.model.pyttsx3_workers}")
+    print(f"  - TTS Text Frontend: numbers {config.model.tts_normalize_numbers}, cache {config.model.tts_frontend_cache_items} items")
     print(f"  - VL Model: {config.model.vl_model}")
     print(f"  - VL Frame Interval: {config.model.vl_frame_interval}s")
     print(f"  - Device: {config.model.device}")
     print(f"  - Compute Type: {config.model.compute_type}")
     print(f"  - Model Keep Alive: {config.model.model_keep_alive}")
+    print(f"  - Whisper Replicas: {config.model.whisper_replicas}")
+    print(f"  - Whisper Batch Size: {config.model.whisper_batch_size} (wait {config.model.whisper_batch_wait_ms}ms)")
+    print(f"  - Whisper Window: {config.model.whisper_window_s}s")
+    print(f"  - Whisper Long Audio: {config.model.whisper_long_audio_s}s (0 = off)")
     
     print("\n🌊 流式 ASR 配置:")
     print(f"  - Streaming Engine: {config.model.streaming_asr_engine}")
@@ -373,5 +450,6 @@ def print_config_summary():
     print(f"  - HF Datasets Offline: {config.cache.hf_datasets_offline}")
     print(f"  - HF Endpoint: {config.cache.hf_endpoint or '默认'}")
     print(f"  - Model Source: {config.cache.model_source}")
+    print(f"  - Result Cache: {config.cache.result_cache_memory_items} items in memory, {config.cache.result_cache_disk_mb}MB on disk")
     
     print("\n" + "="*60 + "\n")
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+字幕渲染
+把识别结果的 segments（start / end 秒与 text）渲染为 SRT 或 WebVTT。
+
+- render_subtitles：整段结果一次渲染
+- iter_subtitle_chunks：消费流式识别的 segment 事件，每解出一段即输出一条字幕，
+  下游（如字幕封装）无需等待整段识别结束
+"""
+
+from typing import AsyncIterator, Iterable
+
+from bookroom_audio.utils.utils_api import logger
+
+SUBTITLE_FORMATS = ("srt", "vtt")
+
+SUBTITLE_MEDIA_TYPES = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+
+def format_timestamp(seconds: float, fmt: str = "srt") -> str:
+    """秒 -> HH:MM:SS,mmm（SRT）或 HH:MM:SS.mmm（VTT）"""
+    millis = max(0, int(round(seconds * 1000)))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    separator = "," if fmt == "srt" else "."
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def subtitle_header(fmt: str) -> str:
+    return "WEBVTT\n\n" if fmt == "vtt" else ""
+
+
+def render_cue(index: int, start: float, end: float, text: str, fmt: str = "srt") -> str:
+    """渲染单条字幕（含结尾空行）；SRT 带序号，VTT 不带"""
+    end = max(end, start)
+    timing = f"{format_timestamp(start, fmt)} --> {format_timestamp(end, fmt)}"
+    lines = [str(index), timing] if fmt == "srt" else [timing]
+    lines.append(text.strip())
+    return "\n".join(lines) + "\n\n"
+
+
+def render_subtitles(segments: Iterable[dict], fmt: str = "srt") -> str:
+    """渲染完整字幕文件；跳过空文本与缺少时间戳的 segment"""
+    parts = [subtitle_header(fmt)]
+    index = 0
+    for segment in segments:
+        text = (segment.get("text") or "").strip()
+        start, end = segment.get("start"), segment.get("end")
+        if not text or start is None or end is None:
+            continue
+        index += 1
+        parts.append(render_cue(index, float(start), float(end), text, fmt))
+    return "".join(parts)
+
+
+async def iter_subtitle_chunks(events: AsyncIterator[dict], fmt: str = "srt") -> AsyncIterator[str]:
+    """把 iter_segment_events 产生的事件转为字幕文本块：先输出文件头，之后每段一条"""
+    header = subtitle_header(fmt)
+    if header:
+        yield header
+    index = 0
+    async for event in events:
+        if event["type"] == "segment":
+            text = (event.get("text") or "").strip()
+            if not text:
+                continue
+            index += 1
+            yield render_cue(index, event["start"], event["end"], text, fmt)
+        elif event["type"] == "error":
+            # 字幕格式无法携带错误事件；VTT 写入 NOTE 注释，SRT 直接结束
+            logger.warning(f"Subtitle stream ended early: {event.get('message')}")
+            if fmt == "vtt":
+                message = str(event.get("message", "")).replace("-->", "->")
+                yield f"NOTE transcription failed: {message}\n\n"
+            return
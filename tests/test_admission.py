@@ -0,0 +1,157 @@
+"""
+文件识别准入控制单元测试。
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from bookroom_audio.api.routers import transcribe_routes
+from bookroom_audio.services import admission
+from bookroom_audio.services.admission import AdmissionController, QueueFullError
+
+
+def test_limits_concurrency_and_rejects_when_queue_full():
+    async def scenario():
+        controller = AdmissionController("whisper", concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        running = []
+
+        async def job(i):
+            async with controller.admit():
+                running.append(i)
+                await release.wait()
+
+        first = asyncio.create_task(job(1))
+        second = asyncio.create_task(job(2))
+        await asyncio.sleep(0)
+        assert running == [1]
+        assert controller.running == 1 and controller.queued == 1
+
+        with pytest.raises(QueueFullError) as excinfo:
+            async with controller.admit():
+                pass
+        assert excinfo.value.retry_after >= 1
+        assert controller.rejected == 1
+
+        release.set()
+        await asyncio.gather(first, second)
+        assert running == [1, 2]
+        assert controller.stats()["admitted"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_zero_concurrency_is_unlimited():
+    async def scenario():
+        controller = AdmissionController("whisper", concurrency=0, max_queue=1)
+        release = asyncio.Event()
+        running = []
+
+        async def job(i):
+            async with controller.admit():
+                running.append(i)
+                await release.wait()
+
+        jobs = [asyncio.create_task(job(i)) for i in range(4)]
+        await asyncio.sleep(0)
+        assert running == [0, 1, 2, 3]
+        assert controller.queued == 0 and controller.rejected == 0
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_follows_observed_rtf():
+    controller = AdmissionController("whisper", concurrency=2, max_queue=4)
+    controller._observe(elapsed=5.0, audio_seconds=50.0)  # RTF 0.1，平均音频 50s
+    assert controller.estimated_service_s() == pytest.approx(5.0)
+
+    controller.running, controller.queued = 2, 4
+    assert controller.retry_after() == 15  # 6 个请求 × 5s / 2 并发
+    assert controller.stats()["rtf"] == pytest.approx(0.1)
+
+
+def test_full_queue_maps_to_429(monkeypatch):
+    args = SimpleNamespace(
+        model=SimpleNamespace(asr_engine="whisper", model="tiny", language=None),
+        cache=SimpleNamespace(result_cache_memory_items=0, result_cache_disk_mb=0,
+                              result_cache_dir=None, cache_dir="/tmp"),
+    )
+
+    class Full:
+        def admit(self):
+            raise QueueFullError("whisper", 7)
+
+    monkeypatch.setattr(transcribe_routes, "get_admission_controller", lambda a, e: Full())
+    async def fake_resolve(*a):
+        return np.zeros(16000, dtype=np.float32)
+
+    monkeypatch.setattr(transcribe_routes, "resolve_file_input", fake_resolve)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(transcribe_routes.cached_process_audio_task(
+            args, None, None, None, None, task="transcribe", engine="whisper",
+        ))
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "7"
+
+
+def test_stats_are_keyed_by_engine(monkeypatch):
+    monkeypatch.setattr(admission, "_controllers", {})
+    args = SimpleNamespace(model=SimpleNamespace(asr_concurrency=2, asr_max_queue=0))
+    controller = admission.get_admission_controller(args, "qwen-asr")
+    assert admission.get_admission_controller(args, "qwen-asr") is controller
+    assert admission.admission_stats()["qwen-asr"]["concurrency"] == 2
+
+
+def test_streaming_response_holds_slot_until_finished(monkeypatch):
+    from bookroom_audio.models import whisper
+    from bookroom_audio.models.whisper import WhisperModelPool
+    from tests.test_whisper_stream import FakeModel
+
+    monkeypatch.setattr(admission, "_controllers", {})
+    monkeypatch.setattr(whisper, "print_transcribing_audio", lambda params: None)
+    monkeypatch.setattr(whisper, "print_model_loading", lambda args, params: None)
+    monkeypatch.setattr(whisper, "model_pool", WhisperModelPool(lambda key: FakeModel(n=3, delay=0)))
+    args = SimpleNamespace(model=SimpleNamespace(
+        asr_concurrency=1, asr_max_queue=0, model="tiny", language=None, device="cpu",
+        compute_type="int8", whisper_replicas=1, model_keep_alive="-1",
+    ))
+
+    async def never_disconnect():
+        await asyncio.Event().wait()
+
+    async def serve(fail_send: bool):
+        stream, slot = await transcribe_routes.open_whisper_stream(args, None, None, None, "transcribe")
+        response = transcribe_routes.event_stream_response(
+            transcribe_routes.iter_segment_events(stream), "sse", slot
+        )
+        controller = admission.get_admission_controller(args, "whisper")
+        running_while_sending = []
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                running_while_sending.append(controller.running)
+                if fail_send:
+                    raise OSError("client disconnected")
+
+        try:
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, never_disconnect, send)
+        except Exception:  # noqa: BLE001  断开时 Starlette 抛出 ClientDisconnect
+            pass
+        return running_while_sending, controller.stats()
+
+    async def scenario():
+        return await serve(fail_send=False), await serve(fail_send=True)
+
+    (running, stats), (running_disconnected, stats_disconnected) = asyncio.run(scenario())
+    assert running and set(running) == {1}
+    assert stats["running"] == 0 and stats["admitted"] == 1
+    # 客户端断开：名额同样归还
+    assert running_disconnected == [1]
+    assert stats_disconnected["running"] == 0 and stats_disconnected["admitted"] == 2
@@ -0,0 +1,134 @@
+"""
+文件识别增量接收单元测试：字节管道、multipart 拆分、静音点切窗、边上传边解码。
+"""
+
+import io
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+from bookroom_audio.utils.audio_ingest import (
+    AudioWindower,
+    ByteStreamPipe,
+    MultipartAudioExtractor,
+    decode_incremental,
+)
+
+
+def make_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (np.sin(2 * np.pi * 440 * t) * 0.3 * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def test_pipe_read_blocks_until_data_and_supports_seek():
+    pipe = ByteStreamPipe()
+    got = []
+    reader = threading.Thread(target=lambda: got.append(pipe.read(4)))
+    reader.start()
+    pipe.feed(b"ab")
+    pipe.feed(b"cd")
+    reader.join(timeout=1)
+    assert got == [b"ab"] or got == [b"abcd"]
+
+    pipe.finish()
+    assert pipe.seek(0) == 0
+    assert pipe.read() == b"abcd"
+    assert pipe.seek(-1, io.SEEK_END) == 3
+    assert pipe.read() == b"d"
+
+
+def test_pipe_spills_to_disk_above_spool_limit():
+    pipe = ByteStreamPipe(spool_max_bytes=8)
+    data = bytes(range(256)) * 4
+    for i in range(0, len(data), 100):
+        pipe.feed(data[i:i + 100])
+    pipe.finish()
+    assert pipe.size == len(data)
+    assert not isinstance(pipe._file._file, io.BytesIO)  # 已溢写到临时文件
+    assert pipe.read(10) == data[:10]
+    assert pipe.seek(-6, io.SEEK_END) == len(data) - 6
+    assert pipe.read() == data[-6:]
+    pipe.seek(0)
+    assert pipe.read() == data
+    pipe.close()
+
+
+def test_pipe_abort_wakes_reader():
+    pipe = ByteStreamPipe()
+    errors = []
+
+    def read():
+        try:
+            pipe.read(1)
+        except RuntimeError as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    pipe.abort(RuntimeError("client gone"))
+    reader.join(timeout=1)
+    assert not reader.is_alive() and len(errors) == 1
+
+
+def test_multipart_extractor_splits_fields_and_audio():
+    body = (
+        b"--XyZ\r\n"
+        b'Content-Disposition: form-data; name="language"\r\n\r\n'
+        b"zh\r\n"
+        b"--XyZ\r\n"
+        b'Content-Disposition: form-data; name="file_upload"; filename="a.wav"\r\n'
+        b"Content-Type: audio/wav\r\n\r\n"
+        b"RIFF....data\r\n"
+        b"--XyZ--\r\n"
+    )
+    audio = bytearray()
+    extractor = MultipartAudioExtractor("multipart/form-data; boundary=XyZ", audio.extend)
+    for i in range(0, len(body), 7):
+        extractor.write(body[i:i + 7])
+    extractor.finalize()
+    assert extractor.fields == {"language": "zh"}
+    assert extractor.audio_filename == "a.wav"
+    assert bytes(audio) == b"RIFF....data"
+
+
+def test_multipart_extractor_requires_boundary():
+    with pytest.raises(ValueError):
+        MultipartAudioExtractor("multipart/form-data", lambda _: None)
+
+
+def test_windower_cuts_at_quietest_frame():
+    sr = 1000
+    windower = AudioWindower(window_s=10, sampling_rate=sr, search_s=4)
+    audio = np.ones(25 * sr, dtype=np.float32)
+    audio[8000:8100] = 0.0  # 第 8 秒处的停顿
+    windows = windower.push(audio[:12000]) + windower.push(audio[12000:])
+    last = windower.flush()
+    assert windows[0][0] == 0 and 8000 <= len(windows[0][1]) <= 8100
+    starts = [w[0] for w in windows] + [last[0]]
+    lengths = [len(w[1]) for w in windows] + [len(last[1])]
+    assert sum(lengths) == len(audio)
+    assert starts == [0] + list(np.cumsum(lengths[:-1]))
+
+
+def test_decode_while_uploading():
+    data = make_wav(3.0, sample_rate=8000)
+    pipe = ByteStreamPipe()
+    chunks = []
+    decoder = threading.Thread(target=decode_incremental, args=(pipe, chunks.append))
+    decoder.start()
+    for i in range(0, len(data), 1000):
+        pipe.feed(data[i:i + 1000])
+    pipe.finish()
+    decoder.join(timeout=5)
+    total = sum(len(c) for c in chunks)
+    assert len(chunks) > 1
+    assert abs(total - 3 * 16000) <= 160
@@ -0,0 +1,66 @@
+"""
+文件识别上传音频内存解码单元测试（用内存 WAV，不落盘）。
+"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from bookroom_audio.utils.audio_input import (
+    ASR_SAMPLE_RATE,
+    UploadSpoolingRoute,
+    decode_audio_source,
+)
+
+
+def make_wav(seconds: float, sample_rate: int = 8000) -> io.BytesIO:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (np.sin(2 * np.pi * 440 * t) * 0.5 * 32767).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+    return buf
+
+
+def test_decode_file_object_resamples_to_16k():
+    buf = make_wav(1.0)
+    buf.seek(0, io.SEEK_END)  # 已被读过的文件对象也应从头解码
+    audio = decode_audio_source(buf)
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - ASR_SAMPLE_RATE) <= 160
+
+
+def test_decode_invalid_bytes_raises():
+    with pytest.raises(Exception):
+        decode_audio_source(io.BytesIO(b"not audio at all"))
+
+
+def test_upload_spool_threshold_is_per_app():
+    from fastapi import APIRouter, FastAPI, File, UploadFile
+    from fastapi.testclient import TestClient
+    from starlette.formparsers import MultiPartParser
+
+    def make_app(spool_max_bytes):
+        router = APIRouter(route_class=UploadSpoolingRoute)
+
+        @router.post("/upload")
+        async def upload(file: UploadFile = File(...)):
+            return {"on_disk": bool(file.file._rolled), "size": len(await file.read())}
+
+        app = FastAPI()
+        if spool_max_bytes is not None:
+            app.state.upload_spool_max_bytes = spool_max_bytes
+        app.include_router(router)
+        return TestClient(app)
+
+    original = MultiPartParser.spool_max_size
+    data = make_wav(1.0).getvalue()  # 约 16KB
+    files = {"file": ("a.wav", data, "audio/wav")}
+    assert make_app(1024).post("/upload", files=files).json() == {"on_disk": True, "size": len(data)}
+    assert make_app(None).post("/upload", files=files).json() == {"on_disk": False, "size": len(data)}
+    assert MultiPartParser.spool_max_size == original  # 不修改全局解析器
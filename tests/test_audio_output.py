@@ -0,0 +1,75 @@
+"""
+TTS 音频输出（多相重采样 / WAV 写入）单元测试。
+"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from bookroom_audio.api.routers.tts.audio_output import (
+    _polyphase_filter,
+    decode_audio,
+    resample,
+    to_wav,
+    wav_bytes,
+)
+
+
+def reference_resample(x: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """朴素实现：零插值 → 完整 FIR 卷积 → 抽取（与多相实现数学等价）"""
+    from math import gcd
+
+    g = gcd(orig_sr, target_sr)
+    up, down = target_sr // g, orig_sr // g
+    h = _polyphase_filter(up, down).T.reshape(-1).astype(np.float64)
+    half_len = 10 * max(up, down)
+    h = h[:2 * half_len + 1]
+    stuffed = np.zeros(len(x) * up)
+    stuffed[::up] = x
+    full = np.convolve(stuffed, h)
+    n_out = -(-len(x) * up // down)
+    return full[half_len::down][:n_out]
+
+
+@pytest.mark.parametrize("target_sr", [16000, 22050, 44100, 48000])
+def test_resample_matches_reference_convolution(target_sr):
+    x = np.random.default_rng(0).uniform(-1, 1, 2400).astype(np.float32)
+    out = resample(x, 24000, target_sr)
+    expected = reference_resample(x.astype(np.float64), 24000, target_sr)
+    assert len(out) == len(expected) == -(-2400 * target_sr // 24000)
+    assert np.max(np.abs(out - expected)) < 1e-4
+
+
+def test_resample_preserves_tone_and_rejects_alias():
+    t = np.arange(24000) / 24000
+    tone = np.sin(2 * np.pi * 1000 * t).astype(np.float32)
+    out = resample(tone, 24000, 16000)
+    expected = np.sin(2 * np.pi * 1000 * np.arange(len(out)) / 16000)
+    assert np.max(np.abs(out[200:-200] - expected[200:-200])) < 1e-2
+
+    # 10kHz 高于 16kHz 的奈奎斯特频率，应被低通滤除而不是折叠到 6kHz
+    alias = resample(np.sin(2 * np.pi * 10000 * t).astype(np.float32), 24000, 16000)
+    assert np.sqrt(np.mean(alias[200:-200] ** 2)) < 1e-2
+
+
+def test_same_rate_skips_resampling():
+    x = np.linspace(-1, 1, 100, dtype=np.float32)
+    assert resample(x, 24000, 24000) is x
+
+
+def test_wav_bytes_header_and_clipping():
+    data = wav_bytes(np.array([0.0, 0.5, 2.0, -2.0], dtype=np.float32), 22050)
+    with wave.open(io.BytesIO(data)) as w:
+        assert (w.getnchannels(), w.getsampwidth(), w.getframerate()) == (1, 2, 22050)
+        frames = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+    assert frames.tolist() == [0, 16383, 32767, -32767]
+
+
+def test_to_wav_decode_roundtrip():
+    samples = (0.3 * np.sin(np.linspace(0, 200, 4800))).astype(np.float32)
+    decoded, sr = decode_audio(to_wav(samples, 24000, 16000))
+    assert sr == 16000
+    assert len(decoded) == 3200
+    assert np.max(np.abs(decoded - resample(samples, 24000, 16000))) < 1e-3
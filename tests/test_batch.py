@@ -0,0 +1,194 @@
+"""
+批量任务存储、执行与接口单元测试（识别 / 合成用替身）。
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import transcribe_routes, tts_routes
+from bookroom_audio.api.routers.batch_routes import create_batch_routes
+from bookroom_audio.services import batch_runner, result_cache
+from bookroom_audio.services.batch_runner import BatchRunner
+from bookroom_audio.services.batch_store import BatchStore
+
+
+def items(*keys):
+    return [{"custom_id": f"c{i}", "body": {"n": i}, "pack_key": key} for i, key in enumerate(keys)]
+
+
+def test_store_claims_same_pack_key_first_and_completes_job(tmp_path):
+    store = BatchStore(str(tmp_path))
+    job = store.create_job("/v1/tts/generate", items("a", "b", "a"))
+    assert job["status"] == "in_progress" and job["request_counts"]["total"] == 3
+
+    first = store.claim_next()
+    assert first["index"] == 0
+    second = store.claim_next(prefer_pack_key="a")
+    assert second["index"] == 2  # 跳过 b，继续同组
+    third = store.claim_next(prefer_pack_key="a")
+    assert third["index"] == 1
+    assert store.claim_next() is None
+
+    store.complete_item(job["id"], 0, {"ok": True})
+    store.fail_item(job["id"], 1, "boom")
+    store.complete_item(job["id"], 2, {"ok": True})
+    job = store.get_job(job["id"])
+    assert job["status"] == "completed"
+    assert job["request_counts"] == {"total": 3, "pending": 0, "completed": 2, "failed": 1, "cancelled": 0}
+    assert [r["custom_id"] for r in store.item_results(job["id"])] == ["c0", "c1", "c2"]
+
+
+def test_store_recover_and_cancel(tmp_path):
+    store = BatchStore(str(tmp_path))
+    job = store.create_job("/v1/tts/generate", items("a", "a"))
+    store.claim_next()
+    store.close()
+
+    # 模拟重启：running 项放回队列
+    store = BatchStore(str(tmp_path))
+    assert store.recover() == 1
+    store.cancel_job(job["id"])
+    job = store.get_job(job["id"])
+    assert job["status"] == "cancelled"
+    assert job["request_counts"]["cancelled"] == 2
+    assert store.claim_next() is None
+
+
+def test_inputs_removed_when_cancelled_job_drains(tmp_path):
+    store = BatchStore(str(tmp_path))
+    job_id = store.new_job_id()
+    os.makedirs(store.inputs_dir(job_id))
+    open(os.path.join(store.inputs_dir(job_id), "0.audio"), "wb").close()
+    store.create_job("/x", items("a", "a"), job_id=job_id)
+    running = store.claim_next()
+
+    store.cancel_job(job_id)
+    assert os.path.exists(store.inputs_dir(job_id))  # 执行中的项仍需读取输入
+    store.complete_item(job_id, running["index"], {"ok": True})
+    assert not os.path.exists(store.job_dir(job_id))
+
+
+def test_runner_resumes_and_retries_after_queue_full(tmp_path):
+    from fastapi import HTTPException
+
+    store = BatchStore(str(tmp_path))
+    job = store.create_job("/x", items("a", "a", "a"))
+    store.claim_next()  # 上次运行中断时正在处理
+    calls = []
+
+    async def handler(item):
+        calls.append(item["index"])
+        if len(calls) == 1:
+            raise HTTPException(status_code=429, headers={"Retry-After": "0"})
+        return {"index": item["index"]}
+
+    async def scenario():
+        runner = BatchRunner(store, {"/x": handler}, workers=1)
+        await runner.start()
+        for _ in range(200):
+            if store.get_job(job["id"])["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    asyncio.run(scenario())
+    assert store.get_job(job["id"])["request_counts"]["completed"] == 3
+    assert sorted(set(calls)) == [0, 1, 2] and len(calls) == 4
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "_runner", None)
+    monkeypatch.setattr(result_cache, "_caches", {})
+    args = SimpleNamespace(
+        server=SimpleNamespace(batch_dir=str(tmp_path), batch_workers=2),
+        cache=SimpleNamespace(cache_dir=str(tmp_path), result_cache_memory_items=0,
+                              result_cache_disk_mb=0, result_cache_dir=None),
+        model=SimpleNamespace(asr_engine="whisper"),
+    )
+    app = FastAPI()
+    app.include_router(create_batch_routes(args))
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(batch_runner._runner.stop)
+
+
+def wait_done(client, job_id):
+    for _ in range(300):
+        job = client.get(f"/v1/batches/{job_id}").json()
+        if job["status"] != "in_progress":
+            return job
+        time.sleep(0.01)
+    raise AssertionError("batch did not finish")
+
+
+def test_transcription_batch_end_to_end(client, monkeypatch):
+    seen = []
+
+    async def fake_cached(args, file, file_upload, model, language, task, engine):
+        with open(file, "rb") as f:
+            seen.append(f.read())
+        return {"text": f"text-{len(seen)}", "segments": []}, 1.5
+
+    monkeypatch.setattr(transcribe_routes, "cached_process_audio_task", fake_cached)
+    response = client.post("/v1/batches", json={
+        "endpoint": "/v1/audio/transcriptions",
+        "items": [
+            {"custom_id": "ch1", "body": {"audio_base64": base64.b64encode(b"one").decode()}},
+            {"custom_id": "ch2", "body": {"audio_base64": base64.b64encode(b"two").decode(), "task": "translate"}},
+        ],
+        "metadata": {"book": "x"},
+    })
+    assert response.status_code == 200
+    job = wait_done(client, response.json()["id"])
+    assert job["request_counts"]["completed"] == 2
+    assert job["metadata"] == {"book": "x"}
+    assert sorted(seen) == [b"one", b"two"]
+
+    lines = client.get(f"/v1/batches/{job['id']}/results").text.splitlines()
+    results = [json.loads(line) for line in lines]
+    assert [r["custom_id"] for r in results] == ["ch1", "ch2"]
+    assert results[0]["response"]["duration"] == 1.5
+    # 任务结束后输入文件已删除
+    assert not os.path.exists(batch_runner._runner.store.job_dir(job["id"]))
+
+
+def test_tts_batch_writes_audio(client, monkeypatch):
+    async def fake_synthesize(request):
+        return b"RIFF" + request.text.encode(), "kokoro", None
+
+    monkeypatch.setattr(tts_routes, "synthesize_tts", fake_synthesize)
+    response = client.post("/v1/batches", json={
+        "endpoint": "/v1/tts/generate",
+        "items": [{"body": {"text": "你好", "engine": "kokoro"}}],
+    })
+    job = wait_done(client, response.json()["id"])
+    result = json.loads(client.get(f"/v1/batches/{job['id']}/results").text)
+    assert result["status"] == "completed"
+    audio = client.get(result["response"]["audio_url"])
+    assert audio.status_code == 200 and audio.content == "RIFF你好".encode()
+
+
+def test_rejects_invalid_manifest(client):
+    assert client.post("/v1/batches", json={"endpoint": "/v1/nope", "items": [{"body": {}}]}).status_code == 400
+    bad = client.post("/v1/batches", json={"endpoint": "/v1/audio/transcriptions", "items": [{"body": {}}]})
+    assert bad.status_code == 400
+
+    # 不接受服务端路径；校验失败时已写入的前几项输入文件被删除
+    audio = base64.b64encode(b"one").decode()
+    bad = client.post("/v1/batches", json={
+        "endpoint": "/v1/audio/transcriptions",
+        "items": [{"body": {"audio_base64": audio}}, {"body": {"file": "/etc/passwd"}}],
+    })
+    assert bad.status_code == 400 and "'file' is not supported" in bad.json()["detail"]
+    store_dir = batch_runner._runner.store.directory
+    assert [name for name in os.listdir(store_dir) if name.startswith("batch_")] == []
+    assert client.get("/v1/batches/batch_missing").status_code == 404
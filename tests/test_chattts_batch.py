@@ -0,0 +1,126 @@
+"""
+ChatTTS 跨请求合批调度单元测试（ChatTTS 用替身）。
+"""
+
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+
+import av
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.openai_routes import create_openai_routes
+from bookroom_audio.api.routers.tts import chattts_batch, engines
+from bookroom_audio.api.routers.tts.chattts_batch import ChatTTSBatchScheduler
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.api.routers.tts_routes import synthesize_tts
+
+STEP = 2400  # 每步 0.1s @24kHz
+
+
+@pytest.fixture
+def infer_calls(monkeypatch):
+    """替身 infer(stream=True)：每条文本两步，样本值为 len(text)，便于核对拆分是否正确"""
+    calls = []
+
+    def fake_batch(texts, emotion="neutral"):
+        calls.append((list(texts), emotion))
+        for _ in range(2):
+            yield [np.full(STEP, len(t) / 100, dtype=np.float32) for t in texts]
+
+    monkeypatch.setattr(engines, "iter_audio_chatt_batch", fake_batch)
+    return calls
+
+
+def test_concurrent_requests_share_one_infer_per_emotion(infer_calls):
+    scheduler = ChatTTSBatchScheduler(max_batch_size=8, max_wait_ms=20)
+
+    async def scenario():
+        return await asyncio.gather(
+            scheduler.synthesize("a", "neutral"),
+            scheduler.synthesize("bb", "neutral"),
+            scheduler.synthesize("ccc", "unknown"),
+            scheduler.synthesize("dddd", "happy"),
+        )
+
+    results = asyncio.run(scenario())
+    # 归一化后情感相同的请求合为一批
+    assert sorted(len(texts) for texts, _ in infer_calls) == [1, 3]
+    grouped = next(call for call in infer_calls if len(call[0]) == 3)
+    assert sorted(grouped[0]) == ["a", "bb", "ccc"] and grouped[1] == "neutral"
+    for text, samples in zip(["a", "bb", "ccc", "dddd"], results):
+        assert len(samples) == 2 * STEP
+        assert np.allclose(samples, len(text) / 100)
+
+
+def test_full_batch_dispatches_without_waiting(infer_calls):
+    scheduler = ChatTTSBatchScheduler(max_batch_size=2, max_wait_ms=60000)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(scheduler.synthesize("a"), scheduler.synthesize("b")), timeout=5,
+        )
+
+    assert len(asyncio.run(scenario())) == 2
+    assert [texts for texts, _ in infer_calls] == [["a", "b"]]
+
+
+def test_inference_error_reaches_every_request(monkeypatch):
+    def broken(texts, emotion="neutral"):
+        raise RuntimeError("model not loaded")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(engines, "iter_audio_chatt_batch", broken)
+    scheduler = ChatTTSBatchScheduler(max_batch_size=4, max_wait_ms=10)
+
+    async def scenario():
+        return await asyncio.gather(
+            scheduler.synthesize("a"), scheduler.synthesize("b"), return_exceptions=True,
+        )
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_cancelled_batch_ends_every_request(monkeypatch):
+    def slow(texts, emotion="neutral"):
+        time.sleep(0.1)
+        yield [np.zeros(STEP, dtype=np.float32) for _ in texts]
+
+    monkeypatch.setattr(engines, "iter_audio_chatt_batch", slow)
+    scheduler = ChatTTSBatchScheduler(max_batch_size=2, max_wait_ms=60000)
+
+    async def scenario():
+        requests = asyncio.gather(
+            scheduler.synthesize("a"), scheduler.synthesize("b"), return_exceptions=True,
+        )
+        await asyncio.sleep(0.01)
+        # 批次任务由调度器持有；关停时取消它，各请求应收到异常而不是一直等 _DONE
+        (batch_task,) = scheduler._tasks
+        batch_task.cancel()
+        return await asyncio.wait_for(requests, timeout=1.0)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+
+def test_routes_use_scheduler_when_enabled(infer_calls, monkeypatch):
+    monkeypatch.setattr(chattts_batch, "_scheduler", ChatTTSBatchScheduler(max_batch_size=8, max_wait_ms=20))
+    monkeypatch.setattr(tts_routes, "_check_chattss_available", lambda: True)
+
+    audio_data, engine, _ = asyncio.run(synthesize_tts(TTSRequest(text="你好", engine="chattts")))
+    assert engine == "chattts" and audio_data.startswith(b"RIFF")
+
+    app = FastAPI()
+    app.include_router(create_openai_routes(SimpleNamespace()))
+    response = TestClient(app).post("/v1/audio/speech", json={"model": "tts-1", "input": "你好", "response_format": "flac"})
+    assert response.status_code == 200
+    with av.open(io.BytesIO(response.content)) as container:
+        samples = sum(frame.samples for frame in container.decode(audio=0))
+    assert samples == 2 * STEP
+    assert len(infer_calls) == 2
@@ -0,0 +1,136 @@
+"""
+CosyVoice3 说话人档案单元测试（模型用替身）。
+"""
+
+import base64
+import io
+import json
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts import engines
+from bookroom_audio.api.routers.tts_routes import create_tts_routes
+from bookroom_audio.services import result_cache
+
+VOICE_ID = "spk_0123456789abcdef"
+
+
+class FakeCosyVoice3:
+    sample_rate = 24000
+
+    def __init__(self):
+        self.frontend = SimpleNamespace(spk2info={}, device="cpu")
+        self.extracted = []
+        self.calls = []
+
+    def add_zero_shot_spk(self, prompt_text, prompt_wav, spk_id):
+        self.extracted.append((prompt_text, prompt_wav, spk_id))
+        self.frontend.spk2info[spk_id] = {"llm_embedding": np.ones(4, dtype=np.float32)}
+        return True
+
+    def inference_zero_shot(self, tts_text, prompt_text, prompt_wav, zero_shot_spk_id="", stream=False):
+        self.calls.append({"prompt_wav": prompt_wav, "zero_shot_spk_id": zero_shot_spk_id})
+        yield {"tts_speech": np.zeros((1, 2400), dtype=np.float32)}
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    fake = FakeCosyVoice3()
+    monkeypatch.setenv("COSYVOICE3_SPEAKER_DIR", str(tmp_path / "speakers"))
+    monkeypatch.setattr(engines, "_get_cosyvoice3_model", lambda: fake)
+    monkeypatch.setattr(engines, "_cosyvoice3_model", fake)
+    monkeypatch.setattr(tts_routes, "_check_cosyvoice3_available", lambda: True)
+    monkeypatch.setattr(result_cache, "_caches", {})
+    return fake
+
+
+@pytest.fixture
+def client(tmp_path, model):
+    args = SimpleNamespace(cache=SimpleNamespace(
+        cache_dir=str(tmp_path), result_cache_memory_items=0,
+        result_cache_disk_mb=0, result_cache_dir=None,
+    ))
+    app = FastAPI()
+    app.include_router(create_tts_routes(args))
+    return TestClient(app)
+
+
+def write_profile(tmp_path, voice_id=VOICE_ID):
+    directory = tmp_path / "speakers"
+    directory.mkdir(exist_ok=True)
+    meta = {"voice_id": voice_id, "name": "narrator", "reference_text": "样本<|endofprompt|>",
+            "created_at": 1, "model": "Fun-CosyVoice3-0___5B-2512"}
+    (directory / f"{voice_id}.json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+def reference_wav() -> str:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\1\0" * 16000)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def test_generate_with_voice_id_skips_reference_audio(client, model, tmp_path):
+    write_profile(tmp_path)
+    model.frontend.spk2info[VOICE_ID] = {"llm_embedding": np.ones(4)}
+
+    response = client.post("/v1/tts/generate", json={"text": "你好", "engine": "cosyvoice3", "voice_id": VOICE_ID})
+    assert response.status_code == 200
+    assert response.content.startswith(b"RIFF")
+    assert model.calls == [{"prompt_wav": "", "zero_shot_spk_id": VOICE_ID}]
+    assert model.extracted == []
+
+
+def test_unknown_voice_id_is_rejected(client):
+    response = client.post("/v1/tts/generate", json={"text": "你好", "engine": "cosyvoice3", "voice_id": VOICE_ID})
+    assert response.status_code == 400
+    assert "voice_id" in response.json()["detail"]
+    assert engines.get_cosyvoice3_speaker("../etc/passwd") is None
+
+
+def test_list_and_delete_profiles(client, model, tmp_path):
+    write_profile(tmp_path)
+    model.frontend.spk2info[VOICE_ID] = {}
+
+    listed = client.get("/v1/tts/speakers").json()["data"]
+    assert [s["voice_id"] for s in listed] == [VOICE_ID]
+
+    assert client.delete(f"/v1/tts/speakers/{VOICE_ID}").status_code == 200
+    assert VOICE_ID not in model.frontend.spk2info
+    assert client.get("/v1/tts/speakers").json()["data"] == []
+    assert client.delete(f"/v1/tts/speakers/{VOICE_ID}").status_code == 404
+
+
+def test_register_extracts_once_and_reloads_from_disk(client, model):
+    pytest.importorskip("torch")
+    audio = reference_wav()
+
+    first = client.post("/v1/tts/speakers", json={"reference_audio": audio, "reference_text": "样本", "name": "n"})
+    assert first.status_code == 200
+    voice_id = first.json()["voice_id"]
+    assert first.json()["reference_text"] == "样本<|endofprompt|>"
+    again = client.post("/v1/tts/speakers", json={"reference_audio": audio, "reference_text": "样本"})
+    assert again.json()["voice_id"] == voice_id
+    assert len(model.extracted) == 1
+
+    # 模拟重启：内存中的特征丢失，按 voice_id 合成时从磁盘加载，不再提取
+    model.frontend.spk2info.clear()
+    response = client.post("/v1/tts/generate", json={"text": "你好", "engine": "cosyvoice3", "voice_id": voice_id})
+    assert response.status_code == 200
+    assert voice_id in model.frontend.spk2info
+    assert len(model.extracted) == 1
+
+
+def test_register_rejects_invalid_audio(client):
+    response = client.post("/v1/tts/speakers", json={"reference_audio": "!!!not-base64"})
+    assert response.status_code == 400
@@ -0,0 +1,148 @@
+"""
+/v1/tts/stream（Edge TTS SSE）单元测试：替身 Communicate 与本地假 edge-tts WebSocket 服务。
+"""
+
+import asyncio
+import base64
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import av
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts import engines
+from bookroom_audio.api.routers.tts.streaming_encoder import StreamingAudioEncoder
+
+SR = 24000
+VOICE = "zh-CN-XiaoxiaoNeural"
+
+
+def mp3_chunks(seconds: float, parts: int) -> list[bytes]:
+    """24kHz 单声道 MP3，按字节均匀切成 parts 块（块边界不对齐 MP3 帧）"""
+    t = np.arange(int(seconds * SR)) / SR
+    encoder = StreamingAudioEncoder("mp3", SR)
+    data = encoder.encode((0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)) + encoder.close()
+    size = -(-len(data) // parts)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class FakeCommunicate:
+    """替身 edge_tts.Communicate：先发句边界，再逐块发 MP3；progress 记录已发出的块数"""
+
+    progress: list[int] = []
+
+    def __init__(self, text, voice, rate="+0%", volume="+0%"):
+        self.text = text
+
+    async def stream(self):
+        yield {"type": "SentenceBoundary", "offset": 0, "duration": 10_000_000, "text": "你好世界"}
+        for i, data in enumerate(mp3_chunks(1.0, 4)):
+            FakeCommunicate.progress.append(i)
+            await asyncio.sleep(0)
+            yield {"type": "audio", "data": data}
+
+
+@pytest.fixture
+def fake_edge(monkeypatch):
+    FakeCommunicate.progress = []
+    monkeypatch.setattr(engines, "edge_tts", SimpleNamespace(Communicate=FakeCommunicate), raising=False)
+    monkeypatch.setattr(tts_routes, "EDGE_TTS_AVAILABLE", True)
+    return FakeCommunicate.progress
+
+
+def test_audio_is_forwarded_before_stream_finishes(fake_edge):
+    async def scenario():
+        events = []
+        async for event in engines.iter_edge_tts_events("你好世界", VOICE):
+            events.append((event["type"], len(fake_edge)))
+        return events
+
+    events = asyncio.run(scenario())
+    assert events[0] == ("words", 0)
+    first_audio = next(progress for kind, progress in events if kind == "audio")
+    assert first_audio < 4
+
+
+def test_sse_interleaves_words_and_incremental_wav(fake_edge):
+    app = FastAPI()
+    app.include_router(tts_routes.create_tts_routes(SimpleNamespace()))
+    response = TestClient(app).post("/v1/tts/stream", json={"text": "你好世界", "voice": VOICE, "sample_rate": 16000})
+    assert response.status_code == 200
+
+    events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[0]["type"] == "words"
+    assert [w["text"] for w in events[0]["words"]] == list("你好世界")
+    assert events[-1]["type"] == "end"
+    assert sum(e["type"] == "audio" for e in events) > 1
+
+    wav = b"".join(base64.b64decode(e["chunk"]) for e in events if e["type"] == "audio")
+    with av.open(io.BytesIO(wav)) as container:
+        assert container.streams.audio[0].rate == 16000
+        samples = sum(frame.samples for frame in container.decode(audio=0))
+    assert abs(samples / 16000 - 1.0) < 0.1
+
+
+def test_unsupported_voice_sends_error_event(fake_edge):
+    app = FastAPI()
+    app.include_router(tts_routes.create_tts_routes(SimpleNamespace()))
+    response = TestClient(app).post("/v1/tts/stream", json={"text": "你好", "voice": "xx-Unknown"})
+    events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events == [{"type": "error", "message": events[0]["message"]}]
+    assert "Unsupported voice" in events[0]["message"]
+
+
+def test_against_local_fake_edge_tts_server(monkeypatch):
+    """真实 edge_tts 客户端连接本地假服务（协议：文本帧为 audio.metadata / turn.*，二进制帧为 2 字节头长 + 头 + MP3）"""
+    edge_tts = pytest.importorskip("edge_tts")
+    web = pytest.importorskip("aiohttp.web")
+
+    def text_frame(path: str, body: str) -> str:
+        return f"X-RequestId:{uuid.uuid4().hex}\r\nContent-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
+
+    def audio_frame(data: bytes) -> bytes:
+        header = f"X-RequestId:{uuid.uuid4().hex}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode()
+        return len(header).to_bytes(2, "big") + header + data
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.receive()  # speech.config
+        await ws.receive()  # ssml
+        await ws.send_str(text_frame("turn.start", "{}"))
+        metadata = {"Metadata": [{"Type": "SentenceBoundary", "Data": {
+            "Offset": 1_000_000, "Duration": 8_000_000,
+            "text": {"Text": "你好世界", "Length": 4, "BoundaryType": "SentenceBoundary"},
+        }}]}
+        await ws.send_str(text_frame("audio.metadata", json.dumps(metadata)))
+        for data in mp3_chunks(1.0, 4):
+            await ws.send_bytes(audio_frame(data))
+        await ws.send_str(text_frame("turn.end", "{}"))
+        await ws.close()
+        return ws
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/edge", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(edge_tts.communicate, "WSS_URL", f"ws://127.0.0.1:{port}/edge?TrustedClientToken=test")
+        try:
+            return [event async for event in engines.iter_edge_tts_events("你好世界", VOICE)]
+        finally:
+            await runner.cleanup()
+
+    events = asyncio.run(scenario())
+    words = [w for e in events if e["type"] == "words" for w in e["words"]]
+    assert [w["text"] for w in words] == list("你好世界")
+    assert words[0]["start_ms"] == 100.0
+    samples = sum(len(e["samples"]) for e in events if e["type"] == "audio")
+    assert abs(samples / SR - 1.0) < 0.1
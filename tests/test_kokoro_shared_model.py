@@ -0,0 +1,130 @@
+"""
+Kokoro 共享模型与音色缓存单元测试（kokoro 包用替身）。
+"""
+
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bookroom_audio.api.routers.tts import engines
+
+
+class Pack(np.ndarray):
+    """替身音色张量：支持 .to(device)"""
+
+    def to(self, device):
+        return self
+
+
+def make_pack(value: float) -> Pack:
+    return np.full((510, 256), value, dtype=np.float32).view(Pack)
+
+
+@pytest.fixture
+def kokoro(monkeypatch, tmp_path):
+    state = SimpleNamespace(models=[], pipelines=[], voice_loads=[], calls=[], g2p=[])
+
+    class KModel:
+        def __init__(self, repo_id=None):
+            self.repo_id = repo_id
+            self.device = "cpu"
+            state.models.append(self)
+
+        def to(self, device):
+            return self
+
+        def eval(self):
+            return self
+
+        def parameters(self):
+            return [np.zeros(1024 * 1024, dtype=np.float32)]
+
+    class KPipeline:
+        def __init__(self, lang_code, repo_id=None, model=True):
+            assert isinstance(model, KModel), "pipeline must receive the shared model"
+            self.lang_code, self.repo_id, self.model = lang_code, repo_id, model
+            self.voices = {}
+            self.g2p = self._g2p
+            state.pipelines.append(self)
+
+        def _g2p(self, text):
+            state.g2p.append((self.lang_code, text))
+            return text.lower(), None
+
+        def load_single_voice(self, name):
+            state.voice_loads.append((self.repo_id, name))
+            self.voices[name] = make_pack(float(len(state.voice_loads)))
+            return self.voices[name]
+
+        def __call__(self, text, voice=None, speed=1.0):
+            state.calls.append((self.lang_code, voice))
+            self.g2p(text)
+            yield SimpleNamespace(audio=np.zeros(2400, dtype=np.float32), pred_dur=None, phonemes=None)
+
+    monkeypatch.setitem(sys.modules, "kokoro", SimpleNamespace(KModel=KModel, KPipeline=KPipeline))
+    monkeypatch.setattr(engines, "_kokoro_device", lambda: "cpu")
+    monkeypatch.setattr(engines, "_kokoro_models", {})
+    monkeypatch.setattr(engines, "_kokoro_pipelines", {})
+    monkeypatch.setattr(engines, "_kokoro_voices", {})
+    monkeypatch.setenv("KOKORO_HF_HOME", str(tmp_path))
+    return state
+
+
+def test_pipelines_of_one_repo_share_a_model(kokoro, monkeypatch):
+    monkeypatch.setenv("KOKORO_REPO_ID", "hexgrad/Kokoro-82M-v1.1-zh")
+    engines.generate_audio_kokoro("你好", voice="zf_001")
+    engines.generate_audio_kokoro("hello", voice="af_maple")
+    engines.generate_audio_kokoro("hola", voice="ef_dora")
+
+    assert len(kokoro.pipelines) == 3
+    assert len(kokoro.models) == 1
+    assert all(p.model is kokoro.models[0] for p in kokoro.pipelines)
+    assert engines._kokoro_memory()["models_mb"] == {"hexgrad/Kokoro-82M-v1.1-zh": 4.0}
+
+
+def test_different_repos_load_separate_models(kokoro):
+    engines.generate_audio_kokoro("你好", voice="zf_001")
+    engines.generate_audio_kokoro("hello", voice="af_heart")
+    engines.generate_audio_kokoro("bonjour", voice="ff_siwis")
+
+    assert sorted(m.repo_id for m in kokoro.models) == ["hexgrad/Kokoro-82M", "hexgrad/Kokoro-82M-v1.1-zh"]
+
+
+def test_blended_voice_is_memoized(kokoro):
+    for _ in range(3):
+        engines.generate_audio_kokoro("你好", voice="zf_001,zf_002")
+    engines.generate_audio_kokoro("你好", voice="zf_002")
+
+    assert kokoro.voice_loads == [
+        ("hexgrad/Kokoro-82M-v1.1-zh", "zf_001"),
+        ("hexgrad/Kokoro-82M-v1.1-zh", "zf_002"),
+    ]
+    blended = kokoro.calls[0][1]
+    assert all(voice is blended for _, voice in kokoro.calls[:3])
+    assert np.allclose(blended, 1.5)
+    assert kokoro.calls[3][1] is engines._kokoro_voices[("hexgrad/Kokoro-82M-v1.1-zh", "zf_002")]
+    assert kokoro.pipelines[0].voices == {}
+
+
+def test_preload_voices(kokoro, monkeypatch):
+    monkeypatch.setenv("KOKORO_PRELOAD_VOICES", "zf_001; af_heart,af_bella\nzm_010")
+    assert engines.preload_kokoro_voices() == ["zf_001", "af_heart,af_bella", "zm_010"]
+    loads = len(kokoro.voice_loads)
+    assert loads == 4
+
+    engines.generate_audio_kokoro("hello", voice="af_heart,af_bella")
+    assert len(kokoro.voice_loads) == loads
+    memory = engines._kokoro_memory()
+    assert memory["voices_cached"] == 5
+    assert memory["voices_mb"] == 2.49
+
+
+def test_non_english_g2p_is_memoized(kokoro):
+    for _ in range(3):
+        engines.generate_audio_kokoro("你好", voice="zf_001")
+        engines.generate_audio_kokoro("Hello", voice="af_heart")
+
+    assert kokoro.g2p.count(("z", "你好")) == 1
+    assert kokoro.g2p.count(("a", "Hello")) == 3
@@ -0,0 +1,120 @@
+"""
+长文本并行合成单元测试（引擎用替身）。
+"""
+
+import asyncio
+import base64
+import io
+import json
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts import long_text
+from bookroom_audio.api.routers.tts.audio_output import wav_bytes
+from bookroom_audio.api.routers.tts.long_text import SegmentStitcher, iter_long_text, split_segments
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.services import result_cache
+
+SR = 16000
+FADE = 160  # 10ms @16kHz
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    cfg = SimpleNamespace(tts_parallel_workers=2, tts_segment_chars=6, tts_crossfade_ms=10)
+    monkeypatch.setattr(long_text, "_long_text_config", lambda: cfg)
+    monkeypatch.setattr(long_text, "_engine_slots", {})
+    return cfg
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """替身单段合成：每段 0.1s 常数波形（值为段号），越靠前的段越慢完成；记录并发峰值"""
+    state = {"active": 0, "peak": 0, "texts": []}
+
+    async def fake_single(request):
+        index = len(state["texts"])
+        state["texts"].append(request.text)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.03 * (3 - index) if index < 3 else 0)
+        state["active"] -= 1
+        samples = np.full(SR // 10, (index + 1) / 10, dtype=np.float32)
+        words = [{"text": request.text[0], "start_ms": 0.0, "end_ms": 50.0}] if request.return_timestamps else None
+        return wav_bytes(samples, request.sample_rate), request.engine, words
+
+    monkeypatch.setattr(tts_routes, "_synthesize_single_tts", fake_single)
+    return state
+
+
+def test_split_segments_packs_sentences():
+    assert split_segments("一二。三四！五六七八九十？尾", 6) == ["一二。三四！", "五六七八九十？", "尾"]
+    assert split_segments("Pi is 3.14 today. Next one.", 20) == ["Pi is 3.14 today.", "Next one."]
+    # 句间空格按衔接处字符决定：含中文的英文句子、英文后接中文句
+    assert split_segments("Hello. He said 你好. 然后走了。", 40) == ["Hello. He said 你好.然后走了。"]
+    assert split_segments("第一句。Second one. 第三句", 40) == ["第一句。Second one.第三句"]
+
+
+def test_stitcher_crossfades_and_tracks_positions():
+    stitcher = SegmentStitcher(4)
+    out1, start1 = stitcher.push(np.ones(10, dtype=np.float32))
+    out2, start2 = stitcher.push(np.zeros(10, dtype=np.float32))
+    tail = stitcher.close()
+    stitched = np.concatenate([out1, out2, tail])
+
+    assert (start1, start2) == (0, 6)
+    assert len(stitched) == 16
+    assert np.all(stitched[:6] == 1) and np.all(stitched[10:] == 0)
+    assert np.all(np.diff(stitched[6:10]) < 0)
+
+
+def test_segments_run_concurrently_and_yield_in_order(engine):
+    request = TTSRequest(text="甲甲甲甲。乙乙乙乙。丙丙丙丙。丁丁。", engine="kokoro", sample_rate=SR, return_timestamps=True)
+
+    async def scenario():
+        return [item async for item in iter_long_text(request, tts_routes._synthesize_single_tts)]
+
+    items = asyncio.run(scenario())
+    samples = np.concatenate([audio for audio, _ in items])
+    assert engine["peak"] == 2
+    assert len(samples) == 4 * (SR // 10) - 3 * FADE
+    assert np.allclose(samples[:SR // 10 - FADE], 0.1, atol=1e-3)
+    assert np.allclose(samples[-(SR // 10 - FADE):], 0.4, atol=1e-3)
+
+    words = [w for _, ws in items for w in ws]
+    assert [w["text"] for w in words] == ["甲", "乙", "丙", "丁"]
+    assert [w["start_ms"] for w in words] == [0.0, 90.0, 180.0, 270.0]
+
+
+def test_generate_uses_long_text_mode(engine, monkeypatch, tmp_path):
+    monkeypatch.setattr(result_cache, "_caches", {})
+    args = SimpleNamespace(cache=SimpleNamespace(
+        cache_dir=str(tmp_path), result_cache_memory_items=0,
+        result_cache_disk_mb=0, result_cache_dir=None,
+    ))
+    app = FastAPI()
+    app.include_router(tts_routes.create_tts_routes(args))
+    text = "甲甲甲甲。乙乙乙乙。丙丙丙丙。"
+
+    # 同一事件循环内发出全部请求（引擎 worker 池的信号量按进程共享）
+    with TestClient(app) as client:
+        response = client.post("/v1/tts/generate", json={"text": text, "engine": "edge-tts"})
+        assert response.status_code == 200
+        with wave.open(io.BytesIO(response.content)) as w:
+            assert w.getnframes() == 3 * (SR // 10) - 2 * FADE
+
+        streamed = client.post("/v1/tts/generate", json={"text": text, "engine": "edge-tts", "stream": True})
+        assert streamed.headers["content-type"] == "audio/wav"
+        assert len(streamed.content) == 44 + 2 * (3 * (SR // 10) - 2 * FADE)
+
+        sse = client.post("/v1/tts/generate", json={"text": text, "engine": "kokoro", "stream": True, "return_timestamps": True})
+        events = [json.loads(line[6:]) for line in sse.text.splitlines() if line.startswith("data: ")]
+        assert [e["type"] for e in events if e["type"] != "audio"] == ["words", "words", "words", "end"]
+        audio = b"".join(base64.b64decode(e["chunk"]) for e in events if e["type"] == "audio")
+        assert len(audio) == 44 + 2 * (3 * (SR // 10) - 2 * FADE)
@@ -0,0 +1,89 @@
+"""
+pyttsx3 进程池单元测试（worker 内用替身合成函数，fork 启动）。
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts import pyttsx3_pool
+from bookroom_audio.api.routers.tts.pyttsx3_pool import Pyttsx3ProcessPool
+
+
+def echo_backend():
+    pid = os.getpid()
+
+    def synthesize(text, voice_id, rate, volume, target_sample_rate):
+        if text == "boom":
+            raise ValueError("bad text")
+        if text == "crash":
+            os._exit(3)
+        time.sleep(0.1)
+        return f"{pid}:{text}:{target_sample_rate}".encode()
+
+    return synthesize
+
+
+def broken_backend():
+    raise ImportError("No module named 'pyttsx3'")
+
+
+@pytest.fixture
+def pool():
+    pool = Pyttsx3ProcessPool(2, backend=echo_backend, context="fork")
+    yield pool
+    pool.shutdown()
+
+
+def test_jobs_run_in_parallel_worker_processes(pool):
+    async def scenario():
+        start = time.monotonic()
+        results = await asyncio.gather(*(pool.synthesize(f"t{i}", target_sample_rate=8000) for i in range(4)))
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(scenario())
+    parts = [r.decode().split(":") for r in results]
+    assert [p[1:] for p in parts] == [[f"t{i}", "8000"] for i in range(4)]
+    assert len({p[0] for p in parts}) == 2
+    assert str(os.getpid()) not in {p[0] for p in parts}
+    assert elapsed < 0.4 + 1.0  # 4 个 0.1s 任务，2 个 worker 并行（含进程启动）
+
+
+def test_synthesis_error_is_raised(pool):
+    with pytest.raises(RuntimeError, match="bad text"):
+        asyncio.run(pool.synthesize("boom"))
+
+
+def test_crashed_worker_fails_its_job_and_is_replaced(pool):
+    async def scenario():
+        with pytest.raises(RuntimeError, match="exited with code 3"):
+            await asyncio.wait_for(pool.synthesize("crash"), timeout=10)
+        return await asyncio.wait_for(
+            asyncio.gather(pool.synthesize("a"), pool.synthesize("b")), timeout=10,
+        )
+
+    assert [r.split(b":")[1] for r in asyncio.run(scenario())] == [b"a", b"b"]
+
+
+def test_backend_init_failure_fails_pending_jobs():
+    pool = Pyttsx3ProcessPool(1, backend=broken_backend, context="fork")
+    try:
+        with pytest.raises(RuntimeError, match="pyttsx3 workers unavailable: ImportError"):
+            asyncio.run(asyncio.wait_for(pool.synthesize("a"), timeout=10))
+    finally:
+        pool.shutdown()
+
+
+def test_route_uses_pool_when_enabled(pool, monkeypatch):
+    monkeypatch.setattr(pyttsx3_pool, "_pool", pool)
+    monkeypatch.setattr(tts_routes, "PYTTSX3_AVAILABLE", True)
+
+    async def scenario():
+        return await tts_routes.synthesize_tts(tts_routes.TTSRequest(text="hello", engine="pyttsx3"))
+
+    audio_data, engine, _ = asyncio.run(scenario())
+    assert engine == "pyttsx3"
+    assert audio_data.split(b":")[1:] == [b"hello", b"16000"]
@@ -0,0 +1,180 @@
+"""
+内容寻址结果缓存单元测试：内存 LRU、磁盘层容量淘汰与重启后命中、并发请求合并（含转写路由）。
+"""
+
+import asyncio
+import io
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from bookroom_audio.api.routers import transcribe_routes
+from bookroom_audio.services import result_cache
+from bookroom_audio.services.result_cache import ResultCache, content_key, hash_file
+
+
+def test_content_key_separates_parts():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key("a", None) != content_key("a", "")
+    assert content_key("x", "whisper", "tiny") == content_key("x", "whisper", "tiny")
+
+
+def test_hash_file_rewinds():
+    f = io.BytesIO(b"audio bytes")
+    f.seek(5)
+    digest = hash_file(f)
+    assert f.tell() == 0
+    assert digest == hash_file(io.BytesIO(b"audio bytes"))
+
+
+def test_memory_lru_evicts_oldest():
+    cache = ResultCache("t", memory_items=2)
+
+    async def main():
+        await cache.put("a", b"1")
+        await cache.put("b", b"2")
+        assert await cache.get("a") == b"1"  # a 变为最近使用
+        await cache.put("c", b"3")
+        return await cache.get("a"), await cache.get("b"), await cache.get("c")
+
+    assert asyncio.run(main()) == (b"1", None, b"3")
+
+
+def test_disk_tier_budget_and_reload(tmp_path):
+    async def fill():
+        cache = ResultCache("t", memory_items=0, disk_dir=str(tmp_path), disk_max_bytes=25)
+        for key in ("k1", "k2", "k3"):
+            await cache.put(key, b"x" * 10)
+        return cache.stats()
+
+    stats = asyncio.run(fill())
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] == 20
+
+    async def reload():
+        cache = ResultCache("t", memory_items=4, disk_dir=str(tmp_path), disk_max_bytes=25)
+        return await cache.get("k1"), await cache.get("k3"), cache.stats()
+
+    missing, value, stats = asyncio.run(reload())
+    assert missing is None and value == b"x" * 10
+    assert stats["disk_hits"] == 1
+
+
+def test_concurrent_identical_requests_run_once():
+    cache = ResultCache("t", memory_items=8)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"result"
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+        again = await cache.get_or_compute("k", compute)
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert results == [b"result"] * 5 and again == b"result"
+    assert calls == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["memory_hits"]) == (1, 4, 1)
+
+
+def test_failed_compute_is_shared_and_not_cached():
+    cache = ResultCache("t", memory_items=8)
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model failed")
+
+    async def main():
+        results = await asyncio.gather(
+            *(cache.get_or_compute("k", boom) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", boom)
+
+    asyncio.run(main())
+    assert cache.stats()["misses"] == 2
+
+
+def test_cancelled_originator_does_not_fail_other_waiters():
+    cache = ResultCache("t", memory_items=8)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"result"
+
+    async def main():
+        originator = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        originator.cancel()  # 发起计算的客户端断开
+        with pytest.raises(asyncio.CancelledError):
+            await originator
+        return await waiter, await cache.get("k")
+
+    assert asyncio.run(main()) == (b"result", b"result")
+    assert calls == 1
+
+
+def test_coalesced_transcription_survives_originator_disconnect(monkeypatch):
+    args = SimpleNamespace(
+        model=SimpleNamespace(asr_engine="whisper", model="tiny", language=None, asr_vad_filter="off"),
+        cache=SimpleNamespace(result_cache_memory_items=8, result_cache_disk_mb=0,
+                              result_cache_dir=None, cache_dir="/tmp"),
+    )
+    calls = 0
+
+    class Open:
+        @asynccontextmanager
+        async def admit(self):
+            await asyncio.sleep(0.03)  # 排队等待期间发起请求断开
+            yield SimpleNamespace(audio_seconds=0.0)
+
+    async def fake_resolve(file, file_upload):
+        # 请求结束后 FastAPI 会关闭其 UploadFile
+        assert not file_upload.file.closed
+        return np.zeros(16000, dtype=np.float32)
+
+    async def fake_process(args, audio, model, language, task, engine):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"text": "ok"}
+
+    monkeypatch.setattr(result_cache, "_caches", {})
+    monkeypatch.setattr(transcribe_routes, "get_admission_controller", lambda a, e: Open())
+    monkeypatch.setattr(transcribe_routes, "resolve_file_input", fake_resolve)
+    monkeypatch.setattr(transcribe_routes, "process_audio_task", fake_process)
+
+    def upload():
+        return SimpleNamespace(file=io.BytesIO(b"same audio"), filename="a.wav")
+
+    async def transcribe(file_upload):
+        return await transcribe_routes.cached_process_audio_task(
+            args, None, file_upload, None, None, task="transcribe", engine="whisper",
+        )
+
+    async def main():
+        first, second = upload(), upload()
+        originator = asyncio.create_task(transcribe(first))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(transcribe(second))
+        await asyncio.sleep(0.01)
+        originator.cancel()
+        first.file.close()
+        with pytest.raises(asyncio.CancelledError):
+            await originator
+        return await follower
+
+    assert asyncio.run(main()) == ({"text": "ok"}, 1.0)
+    assert calls == 1
@@ -0,0 +1,111 @@
+"""
+TTS 流式编码单元测试（ChatTTS 用替身）。
+"""
+
+import asyncio
+import io
+import threading
+from types import SimpleNamespace
+
+import av
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers.openai_routes import create_openai_routes
+from bookroom_audio.api.routers.tts import engines
+from bookroom_audio.api.routers.tts.streaming_encoder import StreamingAudioEncoder, encode_stream
+
+SR = 24000
+
+
+def tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+def decoded_seconds(data: bytes) -> tuple[str, float]:
+    with av.open(io.BytesIO(data)) as container:
+        samples = sum(frame.samples for frame in container.decode(audio=0))
+        return container.format.name, samples / container.streams.audio[0].rate
+
+
+@pytest.mark.parametrize("fmt, container", [
+    ("mp3", "mp3"), ("opus", "ogg"), ("aac", "aac"), ("flac", "flac"), ("wav", "wav"),
+])
+def test_encodes_incrementally_to_matching_container(fmt, container):
+    encoder = StreamingAudioEncoder(fmt, SR)
+    audio = tone(2.0)
+    chunks = [encoder.encode(audio[i:i + SR // 5]) for i in range(0, len(audio), SR // 5)]
+    chunks.append(encoder.close())
+
+    # 首个 200ms 块之后的若干块内已有输出，而不是全部堆到 close()
+    assert any(chunks[:3])
+    name, seconds = decoded_seconds(b"".join(chunks))
+    assert container in name
+    assert seconds == pytest.approx(2.0, abs=0.1)
+
+
+def test_pcm_is_raw_int16():
+    encoder = StreamingAudioEncoder("pcm", SR)
+    data = encoder.encode(np.array([0.0, 1.0, -1.0], dtype=np.float32)) + encoder.close()
+    assert np.frombuffer(data, dtype="<i2").tolist() == [0, 32767, -32767]
+
+
+def test_speech_route_streams_requested_format(monkeypatch):
+    closed = []
+
+    def fake_iter_audio_chatt(text, voice=None, emotion="neutral"):
+        try:
+            for _ in range(5):
+                yield tone(0.2)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(engines, "iter_audio_chatt", fake_iter_audio_chatt)
+    app = FastAPI()
+    app.include_router(create_openai_routes(SimpleNamespace()))
+    client = TestClient(app)
+
+    response = client.post("/v1/audio/speech", json={"model": "tts-1", "input": "你好", "response_format": "opus"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/ogg"
+    name, seconds = decoded_seconds(response.content)
+    assert "ogg" in name and seconds == pytest.approx(1.0, abs=0.1)
+    assert closed
+
+    bad = client.post("/v1/audio/speech", json={"model": "tts-1", "input": "hi", "response_format": "ogg"})
+    assert bad.status_code == 400
+
+
+def test_encode_stream_closes_sync_generator_after_pending_step():
+    started, release = threading.Event(), threading.Event()
+    produced, closed = [], []
+
+    def slow_chunks():
+        try:
+            for i in range(5):
+                if i == 1:
+                    started.set()
+                    release.wait(5)
+                produced.append(i)
+                yield tone(0.1)
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        stream = encode_stream(slow_chunks(), "wav", 16000, input_rate=SR)
+        await stream.__anext__()
+        reader = asyncio.ensure_future(stream.__anext__())
+        await asyncio.to_thread(started.wait, 5)
+        reader.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        with pytest.raises((asyncio.CancelledError, StopAsyncIteration)):
+            await reader
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert closed == [True]
+    assert produced == [0, 1]
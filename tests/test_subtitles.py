@@ -0,0 +1,81 @@
+"""
+SRT / WebVTT 字幕渲染与流式输出单元测试。
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import transcribe_routes
+from bookroom_audio.api.routers.openai_routes import create_openai_routes
+from bookroom_audio.utils.subtitles import format_timestamp, iter_subtitle_chunks, render_subtitles
+
+SEGMENTS = [
+    {'text': ' Hello there.', 'start': 0.0, 'end': 1.5},
+    {'text': '  ', 'start': 1.5, 'end': 2.0},
+    {'text': 'Second line', 'start': 3661.25, 'end': 3663.0},
+]
+
+
+def test_format_timestamp():
+    assert format_timestamp(3661.25, "srt") == "01:01:01,250"
+    assert format_timestamp(59.9996, "vtt") == "00:01:00.000"
+
+
+def test_render_srt_and_vtt():
+    assert render_subtitles(SEGMENTS, "srt") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+        "2\n01:01:01,250 --> 01:01:03,000\nSecond line\n\n"
+    )
+    assert render_subtitles(SEGMENTS, "vtt") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nHello there.\n\n"
+        "01:01:01.250 --> 01:01:03.000\nSecond line\n\n"
+    )
+
+
+def test_stream_writes_one_cue_per_segment():
+    async def events():
+        for i, segment in enumerate(SEGMENTS, 1):
+            yield {'type': 'segment', 'id': i, **segment}
+        yield {'type': 'done', 'text': ''}
+
+    async def collect():
+        return [chunk async for chunk in iter_subtitle_chunks(events(), "vtt")]
+
+    chunks = asyncio.run(collect())
+    assert chunks[0] == "WEBVTT\n\n"
+    assert len(chunks) == 3
+    assert "".join(chunks) == render_subtitles(SEGMENTS, "vtt")
+
+
+def test_stream_stops_on_error():
+    async def events():
+        yield {'type': 'segment', 'id': 1, **SEGMENTS[0]}
+        yield {'type': 'error', 'message': 'boom'}
+
+    async def collect():
+        return [chunk async for chunk in iter_subtitle_chunks(events(), "srt")]
+
+    assert asyncio.run(collect()) == [render_subtitles(SEGMENTS[:1], "srt")]
+
+
+def test_openai_route_returns_srt(monkeypatch):
+    async def fake_cached(args, file, file_upload, model, language, task, engine):
+        return {'text': 'Hello there.', 'segments': SEGMENTS}, 3663.0
+
+    monkeypatch.setattr(transcribe_routes, "cached_process_audio_task", fake_cached)
+    args = SimpleNamespace(model=SimpleNamespace(asr_language="zh"))
+    app = FastAPI()
+    app.include_router(create_openai_routes(args))
+
+    response = TestClient(app).post(
+        "/v1/audio/transcriptions",
+        files={"file": ("a.wav", b"RIFF", "audio/wav")},
+        data={"model": "whisper-1", "response_format": "srt"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-subrip")
+    assert response.text.startswith("1\n00:00:00,000 --> 00:00:01,500\nHello there.")
@@ -0,0 +1,116 @@
+"""
+TTS 文本前端单元测试：translate 表与原逐字实现一致、中文数字 / 日期读法、按引擎规范化与逐句缓存。
+"""
+
+import random
+import re
+
+import pytest
+
+from bookroom_audio.api.routers.tts import text_frontend
+from bookroom_audio.api.routers.tts.text_frontend import (
+    FULLWIDTH_PUNCTUATION_MAP,
+    cardinal_zh,
+    normalize_numbers_zh,
+    normalize_text,
+    preprocess_text_for_chattts,
+    split_sentences,
+)
+
+
+def loop_preprocess_for_chattts(text):
+    """原 utils.preprocess_text_for_chattts 的逐字实现（参照）"""
+    result = []
+    for ch in text:
+        mapped = FULLWIDTH_PUNCTUATION_MAP.get(ch)
+        if mapped is not None:
+            result.append(mapped)
+            continue
+        code = ord(ch)
+        if 0xFF01 <= code <= 0xFF5E:
+            result.append(chr(code - 0xFEE0))
+        elif ch == "\u3000":
+            result.append(" ")
+        else:
+            result.append(ch)
+    text = "".join(result)
+    text = re.sub(r'[^\u4e00-\u9fffA-Za-z0-9，。、,.!?;:"\'()\[\]<>~+\-*/%=&#@ ]', "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@pytest.fixture
+def frontend(monkeypatch):
+    """重建规范化函数：数字读法开启、缓存 64 条"""
+    monkeypatch.setattr(text_frontend, "_frontend_config", lambda: (True, 64))
+    monkeypatch.setattr(text_frontend, "_piece_normalizer", None)
+
+
+def test_chattts_preprocess_matches_loop():
+    rng = random.Random(0)
+    alphabet = (
+        "".join(FULLWIDTH_PUNCTUATION_MAP)
+        + "".join(chr(c) for c in range(0xFF01, 0xFF5F, 3))
+        + "你好世界abcXYZ019 \t\n\u3000\u200b😀é«»"
+    )
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert preprocess_text_for_chattts(text) == loop_preprocess_for_chattts(text)
+
+
+@pytest.mark.parametrize("digits, expected", [
+    ("0", "零"), ("7", "七"), ("10", "十"), ("15", "十五"), ("105", "一百零五"),
+    ("1000", "一千"), ("1010", "一千零一十"), ("10001", "一万零一"), ("110000", "十一万"),
+    ("100010000", "一亿零一万"), ("100001000", "一亿零一千"), ("007", "零零七"),
+    ("13800138000", "一三八零零一三八零零零"),
+])
+def test_cardinal_zh(digits, expected):
+    assert cardinal_zh(digits) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024年3月5日发布", "二零二四年三月五日发布"),
+    ("日期 2024-03-05。", "日期 二零二四年三月五日。"),
+    ("1998年的冬天", "一九九八年的冬天"),
+    ("会议在10:30开始", "会议在十点三十分开始"),
+    ("现在8:05:09", "现在八点零五分零九秒"),
+    ("增长12.5%，占3/4", "增长百分之十二点五，占四分之三"),
+    ("共1,234人，圆周率3.14", "共一千二百三十四人，圆周率三点一四"),
+    ("第3章", "第三章"),
+    ("型号 MP3 与 v2.0 不变", "型号 MP3 与 v2.0 不变"),
+    ("25:70 不是时间", "25:70 不是时间"),
+    ("English 2024 stays", "English 2024 stays"),
+])
+def test_normalize_numbers_zh(text, expected):
+    assert normalize_numbers_zh(text) == expected
+
+
+def test_normalize_text_per_engine(frontend):
+    text = "第３章：2024年3月5日，共12人\u200b。"
+    assert normalize_text(text, "kokoro") == "第三章：二零二四年三月五日，共十二人。"
+    assert normalize_text(text, "edge-tts") == "第3章：2024年3月5日，共12人。"
+    assert normalize_text(text, "chattts") == "第三章:二零二四年三月五日,共十二人."
+    assert normalize_text("", "kokoro") == ""
+
+
+def test_repeated_sentences_hit_cache(frontend):
+    chapter = "他说：“好的。”\n" * 50 + "第1节完。"
+    expected = "他说：“好的。”\n" * 50 + "第一节完。"
+    assert normalize_text(chapter, "kokoro") == expected
+    assert normalize_text(chapter, "kokoro") == expected
+
+    # 片段："他说…”"、"\n他说…”"（×49）、"\n第1节完。" → 3 个不同片段，其余均命中
+    info = text_frontend.frontend_cache_info()
+    assert info["misses"] == 3
+    assert info["hits"] == 48 + 51
+    assert info["max_items"] == 64
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setattr(text_frontend, "_frontend_config", lambda: (False, 0))
+    monkeypatch.setattr(text_frontend, "_piece_normalizer", None)
+    assert normalize_text("第1节", "kokoro") == "第1节"
+    assert text_frontend.frontend_cache_info() == {}
+
+
+def test_split_sentences():
+    assert split_sentences("你好。今天3.5度！Hi. OK") == ["你好。", "今天3.5度！", "Hi.", "OK"]
@@ -0,0 +1,163 @@
+"""
+时间戳模块单元测试：向量化结果与原逐字符 / 逐词循环实现逐项一致，二进制时间线往返。
+"""
+
+import base64
+import random
+import re
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts.timestamps import (
+    Timeline,
+    durations_timeline,
+    even_split_timeline,
+    kokoro_timeline,
+    timestamps_payload,
+)
+from bookroom_audio.services import result_cache
+
+
+def loop_kokoro_timestamps(phonemes, pred_dur):
+    """原 engines._kokoro_timestamps 的逐字符游标实现（参照）"""
+    pd = np.asarray(pred_dur, dtype=np.float64)
+    if len(pd) < 3:
+        return []
+    words = []
+    left = right = 2.0 * max(0.0, pd[0] - 3.0)
+    i = 1
+    cur = None
+    for ch in phonemes:
+        if i >= len(pd) - 1:
+            break
+        if ch == " ":
+            if cur is not None:
+                cur["end_ms"] = round((left / 80.0) * 1000.0, 2)
+                words.append(cur)
+                cur = None
+            left = right + pd[i]
+            right = left + pd[i]
+            i += 1
+            continue
+        if cur is None:
+            cur = {"text": ch, "start_ms": round((right / 80.0) * 1000.0, 2), "end_ms": 0.0}
+        else:
+            cur["text"] += ch
+        left = right + 2.0 * pd[i]
+        right = left
+        cur["end_ms"] = round((left / 80.0) * 1000.0, 2)
+        i += 1
+    if cur is not None:
+        words.append(cur)
+    return words
+
+
+def loop_split_sentence(sentence, start_ms, duration_ms):
+    """原 engines._split_sentence_to_visemes 的逐词实现（参照）"""
+    units = []
+    if re.search(r"[\u4e00-\u9fff]", sentence):
+        for ch in sentence:
+            if ch.strip() and not re.match(r"[，。！？、；：''（）\s]", ch):
+                units.append(ch)
+    else:
+        units = [w for w in sentence.split() if w]
+    if not units:
+        return []
+    seg = duration_ms / len(units)
+    return [
+        {"text": u, "start_ms": round(start_ms + i * seg, 1), "end_ms": round(start_ms + (i + 1) * seg, 1)}
+        for i, u in enumerate(units)
+    ]
+
+
+def test_kokoro_matches_loop_on_random_inputs():
+    rng = random.Random(0)
+    for _ in range(300):
+        phonemes = "".join(rng.choice("ab ɕʂ ") for _ in range(rng.randint(0, 40)))
+        # pred_dur 可比 phonemes 短（截断）或长
+        pred = [rng.randint(0, 20) for _ in range(rng.randint(0, len(phonemes) + 4))]
+        assert kokoro_timeline(phonemes, pred).to_words(2) == loop_kokoro_timestamps(phonemes, pred)
+
+
+def test_even_split_matches_loop():
+    cases = [
+        ("你好，世界！", 1234.5, 987.6),
+        ("Hello big   world", 0, 1000),
+        ("混合 text 中文。", 10.0, 333.3),
+        ("，。", 0, 100),
+        ("", 0, 100),
+    ]
+    for sentence, start, duration in cases:
+        assert even_split_timeline(sentence, start, duration).to_words(1) == loop_split_sentence(sentence, start, duration)
+
+
+def test_quotes_carry_no_viseme():
+    assert [w["text"] for w in even_split_timeline('他说：“好”"嗯"‘哦’（笑）', 0, 100).to_words(1)] == ["他", "说", "好", "嗯", "哦", "笑"]
+
+
+def test_durations_timeline_is_contiguous():
+    timeline = durations_timeline(["a", "b", "c"], [100, 50.5, 20], start_ms=10)
+    assert timeline.to_words(1) == [
+        {"text": "a", "start_ms": 10.0, "end_ms": 110.0},
+        {"text": "b", "start_ms": 110.0, "end_ms": 160.5},
+        {"text": "c", "start_ms": 160.5, "end_ms": 180.5},
+    ]
+    with pytest.raises(ValueError):
+        durations_timeline(["a"], [1, 2])
+
+
+def test_binary_timeline_roundtrip():
+    words = [
+        {"text": "ni3", "start_ms": 175.0, "end_ms": 612.5},
+        {"text": "", "start_ms": 612.5, "end_ms": 650.0},
+        {"text": "世界😀", "start_ms": 650.0, "end_ms": 1040.4},
+    ]
+    data = Timeline.from_words(words).to_bytes()
+    assert data[:4] == b"BKTL"
+    assert len(data) == 16 + 3 * 12 + 4 + len("ni3世界😀".encode())
+
+    decoded = Timeline.from_bytes(data)
+    assert decoded.texts == ["ni3", "", "世界😀"]
+    assert decoded.start_ms.tolist() == [175, 612, 650]
+    assert decoded.end_ms.tolist() == [612, 650, 1040]
+
+    assert Timeline.from_bytes(Timeline.empty().to_bytes()).texts == []
+    with pytest.raises(ValueError):
+        Timeline.from_bytes(data[:-1])
+
+
+def test_generate_returns_binary_timeline(monkeypatch, tmp_path):
+    words = [{"text": "ni3", "start_ms": 175.0, "end_ms": 612.5}]
+
+    async def fake_synthesize(request):
+        return b"RIFF", "kokoro", words
+
+    monkeypatch.setattr(tts_routes, "synthesize_tts", fake_synthesize)
+    monkeypatch.setattr(result_cache, "_caches", {})
+    args = SimpleNamespace(cache=SimpleNamespace(
+        cache_dir=str(tmp_path), result_cache_memory_items=0,
+        result_cache_disk_mb=0, result_cache_dir=None,
+    ))
+    app = FastAPI()
+    app.include_router(tts_routes.create_tts_routes(args))
+    client = TestClient(app)
+
+    body = {"text": "你好", "engine": "kokoro", "return_timestamps": True}
+    assert client.post("/v1/tts/generate", json=body).json()["words"] == words
+
+    response = client.post("/v1/tts/generate", json={**body, "timestamp_format": "binary"}).json()
+    assert "words" not in response
+    assert Timeline.from_bytes(base64.b64decode(response["timeline"])).texts == ["ni3"]
+
+    assert client.post("/v1/tts/generate", json={**body, "timestamp_format": "xml"}).status_code == 422
+
+
+def test_payload_formats():
+    assert timestamps_payload(None) == {"words": None}
+    payload = timestamps_payload([], "binary")
+    assert Timeline.from_bytes(base64.b64decode(payload["timeline"])).texts == []
@@ -0,0 +1,94 @@
+"""
+/v1/tts/generate 合成结果缓存单元测试（合成用替身）。
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.api.routers.tts_routes import cached_synthesize_tts, create_tts_routes, etag_matches
+from bookroom_audio.services import result_cache
+
+
+@pytest.fixture
+def args(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "_caches", {})
+    return SimpleNamespace(cache=SimpleNamespace(
+        cache_dir=str(tmp_path), result_cache_memory_items=16,
+        result_cache_disk_mb=1, result_cache_dir=None,
+    ))
+
+
+@pytest.fixture
+def synth_calls(monkeypatch):
+    calls = []
+
+    async def fake_synthesize(request):
+        calls.append(request.text)
+        await asyncio.sleep(0.01)
+        return b"RIFF" + str(len(calls)).encode(), "kokoro", None
+
+    monkeypatch.setattr(tts_routes, "synthesize_tts", fake_synthesize)
+    return calls
+
+
+def test_normalized_text_hits_cache_and_concurrent_requests_share(args, synth_calls):
+    async def scenario():
+        first = TTSRequest(text="你好，  世界", engine="kokoro")
+        same = TTSRequest(text=" 你好， 世界\n", engine="kokoro")
+        results = await asyncio.gather(*(cached_synthesize_tts(args, r) for r in (first, same, first)))
+        other_voice = await cached_synthesize_tts(args, TTSRequest(text="你好，  世界", engine="kokoro", voice="zm_010"))
+        return results, other_voice
+
+    results, other_voice = asyncio.run(scenario())
+    assert len({r[0] for r in results}) == 1
+    assert len({r[3] for r in results}) == 1
+    assert other_voice[0] != results[0][0]
+    assert len(synth_calls) == 2
+
+
+def test_etag_and_if_none_match(args, synth_calls):
+    app = FastAPI()
+    app.include_router(create_tts_routes(args))
+    client = TestClient(app)
+    body = {"text": "hello", "engine": "kokoro"}
+
+    response = client.post("/v1/tts/generate", json=body)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    cached = client.post("/v1/tts/generate", json=body, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert client.post("/v1/tts/generate", json=body, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert len(synth_calls) == 1
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
+
+
+def test_etag_differs_per_representation(args, synth_calls):
+    app = FastAPI()
+    app.include_router(create_tts_routes(args))
+    client = TestClient(app)
+    body = {"text": "hello", "engine": "kokoro"}
+
+    wav_etag = client.post("/v1/tts/generate", json=body).headers["etag"]
+    json_body = {**body, "return_timestamps": True}
+    json_etag = client.post("/v1/tts/generate", json=json_body).headers["etag"]
+    binary_body = {**json_body, "timestamp_format": "binary"}
+    binary_etag = client.post("/v1/tts/generate", json=binary_body).headers["etag"]
+    assert len({wav_etag, json_etag, binary_etag}) == 3
+
+    # 拿 WAV 的 ETag 请求 JSON / 二进制时间线：不能返回 304
+    assert client.post("/v1/tts/generate", json=json_body, headers={"If-None-Match": wav_etag}).status_code == 200
+    assert client.post("/v1/tts/generate", json=binary_body, headers={"If-None-Match": json_etag}).status_code == 200
+    assert client.post("/v1/tts/generate", json=binary_body, headers={"If-None-Match": binary_etag}).status_code == 304
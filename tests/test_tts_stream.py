@@ -0,0 +1,259 @@
+"""
+/v1/tts/generate 流式合成与 /v1/tts/ws 单元测试（Kokoro / CosyVoice2 用替身）。
+"""
+
+import asyncio
+import base64
+import io
+import json
+import threading
+import wave
+from types import SimpleNamespace
+
+import av
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from bookroom_audio.api.routers import tts_routes
+from bookroom_audio.api.routers.tts.schemas import TTSRequest
+from bookroom_audio.api.routers.tts_routes import create_tts_routes, stream_tts_response
+
+SR = 24000
+
+
+def sentence(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+@pytest.fixture
+def produced(monkeypatch):
+    """替身 pipeline：三句各 0.5s，记录已产出的句数"""
+    produced = []
+
+    def fake_iter(text, voice=None, return_timestamps=False):
+        for i in range(3):
+            produced.append(i)
+            words = [{"text": f"w{i}", "start_ms": i * 500.0, "end_ms": i * 500.0 + 400.0}] if return_timestamps else []
+            yield sentence(0.5), words
+
+    monkeypatch.setattr(tts_routes, "_check_kokoro_available", lambda: True)
+    monkeypatch.setattr(tts_routes, "iter_audio_kokoro", fake_iter)
+    return produced
+
+
+def decoded(data: bytes) -> tuple[int, float]:
+    with av.open(io.BytesIO(data)) as container:
+        samples = sum(frame.samples for frame in container.decode(audio=0))
+        rate = container.streams.audio[0].rate
+        return rate, samples / rate
+
+
+def test_first_chunk_is_sent_after_first_sentence(produced):
+    async def scenario():
+        response = await stream_tts_response(TTSRequest(text="一。二。三。", engine="kokoro", stream=True), "kokoro")
+        body = response.body_iterator
+        first = await body.__anext__()
+        produced_at_first = len(produced)
+        rest = [chunk async for chunk in body]
+        return response, first, produced_at_first, b"".join([first, *rest])
+
+    response, first, produced_at_first, data = asyncio.run(scenario())
+    assert response.media_type == "audio/wav"
+    assert first.startswith(b"RIFF") and len(first) > 44
+    assert produced_at_first <= 2
+    rate, seconds = decoded(data)
+    assert rate == 16000
+    assert abs(seconds - 1.5) < 0.01
+
+
+def test_timestamps_are_interleaved_with_audio(produced):
+    client = TestClient(_app())
+    response = client.post("/v1/tts/generate", json={
+        "text": "一。二。三。", "engine": "kokoro", "stream": True, "return_timestamps": True,
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.split("\n\n") if line]
+
+    types = [e["type"] for e in events]
+    assert types[:6] == ["words", "audio", "words", "audio", "words", "audio"]
+    assert types[-1] == "end"
+    assert [e["words"][0]["start_ms"] for e in events if e["type"] == "words"] == [0.0, 500.0, 1000.0]
+
+    audio = b"".join(base64.b64decode(e["chunk"]) for e in events if e["type"] == "audio")
+    rate, seconds = decoded(audio)
+    assert rate == 16000 and abs(seconds - 1.5) < 0.01
+
+
+def test_non_streaming_request_keeps_full_wav(monkeypatch, tmp_path):
+    from bookroom_audio.services import result_cache
+
+    monkeypatch.setattr(result_cache, "_caches", {})
+
+    async def fake_synthesize(request):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\0\0" * 160)
+        return buf.getvalue(), "kokoro", None
+
+    monkeypatch.setattr(tts_routes, "synthesize_tts", fake_synthesize)
+    response = TestClient(_app(tmp_path)).post("/v1/tts/generate", json={"text": "hi", "engine": "kokoro"})
+    assert response.status_code == 200
+    assert response.headers["etag"]
+
+
+def test_errors_before_first_sentence_return_500(monkeypatch):
+    def broken(text, voice=None, return_timestamps=False):
+        raise RuntimeError("voice not found")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(tts_routes, "_check_kokoro_available", lambda: True)
+    monkeypatch.setattr(tts_routes, "iter_audio_kokoro", broken)
+    response = TestClient(_app()).post("/v1/tts/generate", json={"text": "hi", "engine": "kokoro", "stream": True})
+    assert response.status_code == 500
+    assert "voice not found" in response.json()["detail"]
+
+
+def test_disconnect_during_synthesis_waits_and_closes_generator(monkeypatch):
+    """客户端在某句合成途中断开：等该句返回后关闭生成器，不再继续合成"""
+    started, release = threading.Event(), threading.Event()
+    produced, closed = [], []
+
+    def slow_iter(text, voice=None, return_timestamps=False):
+        try:
+            for i in range(5):
+                if i == 1:
+                    started.set()
+                    release.wait(5)
+                produced.append(i)
+                yield sentence(0.1), []
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(tts_routes, "_check_kokoro_available", lambda: True)
+    monkeypatch.setattr(tts_routes, "iter_audio_kokoro", slow_iter)
+
+    async def scenario():
+        response = await stream_tts_response(TTSRequest(text="一。二。", engine="kokoro", stream=True), "kokoro")
+        body = response.body_iterator
+        await body.__anext__()
+        reader = asyncio.ensure_future(body.__anext__())
+        await asyncio.to_thread(started.wait, 5)
+        reader.cancel()  # 断开时第二句的 next() 仍在线程中执行
+        await asyncio.sleep(0.05)
+        release.set()
+        with pytest.raises((asyncio.CancelledError, StopAsyncIteration)):
+            await reader
+        await body.aclose()
+
+    asyncio.run(scenario())
+    assert closed == [True]
+    assert produced == [0, 1]
+
+
+@pytest.fixture
+def cosyvoice_chunks(monkeypatch):
+    """替身 CosyVoice2 stream=True：4 块各 0.25s"""
+    closed = []
+
+    def fake_iter(text, voice=None):
+        try:
+            for _ in range(4):
+                yield sentence(0.25)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(tts_routes, "_check_cosyvoice_available", lambda: True)
+    monkeypatch.setattr(tts_routes, "iter_audio_cosyvoice", fake_iter)
+    return closed
+
+
+def test_cosyvoice_streams_chunked_wav(cosyvoice_chunks):
+    response = TestClient(_app()).post("/v1/tts/generate", json={
+        "text": "你好", "engine": "cosyvoice", "stream": True, "sample_rate": 22050,
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/wav"
+    rate, seconds = decoded(response.content)
+    assert rate == 22050 and abs(seconds - 1.0) < 0.01
+    assert cosyvoice_chunks == [True]
+
+
+def test_websocket_streams_pcm_and_serves_several_requests(cosyvoice_chunks, produced):
+    client = TestClient(_app())
+    with client.websocket_connect("/v1/tts/ws") as ws:
+        ws.send_json({"text": "你好", "engine": "cosyvoice", "sample_rate": 16000})
+        assert ws.receive_json() == {"type": "start", "engine": "cosyvoice", "sample_rate": 16000, "format": "pcm_s16le"}
+        pcm = b""
+        while True:
+            message = ws.receive()
+            if message.get("bytes") is not None:
+                pcm += message["bytes"]
+                continue
+            assert json.loads(message["text"]) == {"type": "end"}
+            break
+        assert abs(len(pcm) / 2 / 16000 - 1.0) < 0.01
+
+        ws.send_json({"text": "一。二。三。", "engine": "kokoro", "return_timestamps": True})
+        assert ws.receive_json()["engine"] == "kokoro"
+        assert ws.receive_json()["type"] == "words"
+        assert ws.receive_bytes()
+
+
+def test_websocket_disconnect_during_synthesis_closes_generator(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    produced, closed = [], []
+
+    def slow_iter(text, voice=None):
+        try:
+            for i in range(5):
+                if i == 1:
+                    started.set()
+                    release.wait(5)
+                produced.append(i)
+                yield sentence(0.1)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(tts_routes, "_check_cosyvoice_available", lambda: True)
+    monkeypatch.setattr(tts_routes, "iter_audio_cosyvoice", slow_iter)
+    with TestClient(_app()).websocket_connect("/v1/tts/ws") as ws:
+        ws.send_json({"text": "你好", "engine": "cosyvoice"})
+        assert ws.receive_json()["type"] == "start"
+        assert ws.receive_bytes()
+        assert started.wait(5)
+        threading.Timer(0.1, release.set).start()
+    assert closed == [True]
+    assert produced == [0, 1]
+
+
+def test_websocket_rejects_non_streaming_engine_and_bad_token(monkeypatch):
+    client = TestClient(_app())
+    with client.websocket_connect("/v1/tts/ws") as ws:
+        ws.send_json({"text": "hi", "engine": "pyttsx3"})
+        error = ws.receive_json()
+        assert error["type"] == "error" and "does not support streaming" in error["message"]
+
+    app = FastAPI()
+    app.include_router(create_tts_routes(_args(), api_key="secret"))
+    with TestClient(app).websocket_connect("/v1/tts/ws?token=wrong") as ws:
+        assert ws.receive_json()["type"] == "error"
+
+
+def _args(cache_dir=None):
+    return SimpleNamespace(cache=SimpleNamespace(
+        cache_dir=str(cache_dir or "."), result_cache_memory_items=0,
+        result_cache_disk_mb=0, result_cache_dir=None,
+    ))
+
+
+def _app(cache_dir=None):
+    app = FastAPI()
+    app.include_router(create_tts_routes(_args(cache_dir)))
+    return app
@@ -0,0 +1,111 @@
+"""
+文件识别 VAD 预过滤单元测试（VAD 与模型均用替身）。
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.api.routers import transcribe_routes
+from bookroom_audio.api.routers.transcribe_streaming.engines.base import EngineUnavailableError
+from bookroom_audio.api.routers.transcribe_streaming.constants import StreamingASREngine
+from bookroom_audio.models import whisper
+from bookroom_audio.services import vad_prefilter
+from bookroom_audio.services.vad_prefilter import SpeechTimeline, prefilter_audio, restore_result
+
+SR = 16000
+
+
+def make_segment(start: float, end: float, text: str) -> Segment:
+    return Segment(
+        id=0, seek=0, start=start, end=end, text=text, tokens=[], avg_logprob=0.0,
+        compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+
+
+def make_args(method: str = "silero") -> SimpleNamespace:
+    return SimpleNamespace(model=SimpleNamespace(
+        asr_engine="whisper", model="tiny", language=None, asr_vad_filter=method,
+    ))
+
+
+def test_timeline_maps_compact_time_back_to_original():
+    # 语音段：1s-3s、10s-12s，拼接后 0-2s、2-4s
+    timeline = SpeechTimeline([(1 * SR, 3 * SR), (10 * SR, 12 * SR)], 20 * SR, SR)
+
+    assert timeline.to_original(0.0) == 1.0
+    assert timeline.to_original(1.5) == 2.5
+    assert timeline.to_original(2.0) == 10.0
+    assert timeline.to_original(2.0, is_end=True) == 3.0  # 段边界上的结束时间归属前一段
+    assert timeline.to_original(3.5, is_end=True) == 11.5
+    assert abs(timeline.skipped_fraction - 0.8) < 1e-9
+
+
+def test_prefilter_concatenates_speech_and_records_stats(monkeypatch):
+    audio = np.arange(10 * SR, dtype=np.float32)
+    monkeypatch.setattr(vad_prefilter, "detect_speech", lambda a, m, sr: [(SR, 2 * SR), (5 * SR, 7 * SR)])
+    before = vad_prefilter.vad_stats()
+
+    compact, timeline = prefilter_audio(audio, "silero")
+
+    assert len(compact) == 3 * SR
+    assert compact[0] == SR and compact[SR] == 5 * SR
+    after = vad_prefilter.vad_stats()
+    assert after["requests"] == before["requests"] + 1
+    assert abs((after["skipped_seconds"] - before["skipped_seconds"]) - 7.0) < 1e-6
+
+
+def test_restore_result_handles_translation():
+    timeline = SpeechTimeline([(4 * SR, 6 * SR)], 10 * SR, SR)
+    result = {
+        'text': 'hi',
+        'segments': [{'text': 'hi', 'start': 0.5, 'end': 1.5}],
+        'translation': {'text': 'hi', 'segments': [{'text': 'hi', 'start': 0.0, 'end': 2.0}]},
+    }
+    restore_result(result, timeline)
+    assert result['segments'][0]['start'] == 4.5
+    assert result['segments'][0]['end'] == 5.5
+    assert result['translation']['segments'][0]['end'] == 6.0
+
+
+def test_fsmn_falls_back_to_silero(monkeypatch):
+    def unavailable(audio, sr):
+        raise EngineUnavailableError(StreamingASREngine.SENSE_VOICE_LOCAL, "funasr package not installed")
+
+    monkeypatch.setattr(vad_prefilter, "_fsmn_regions", unavailable)
+    monkeypatch.setattr(vad_prefilter, "_silero_regions", lambda audio, sr: [(0, 10)])
+    assert vad_prefilter.detect_speech(np.zeros(100, dtype=np.float32), "fsmn") == [(0, 10)]
+
+
+def test_process_audio_task_runs_on_speech_only(monkeypatch):
+    audio = np.zeros(20 * SR, dtype=np.float32)
+    monkeypatch.setattr(vad_prefilter, "detect_speech", lambda a, m, sr: [(8 * SR, 10 * SR)])
+    seen = {}
+
+    async def fake_load_model_task(args, params):
+        seen["samples"] = len(params["audio"])
+        return [make_segment(0.2, 1.8, "hello")]
+
+    monkeypatch.setattr(whisper, "load_model_task", fake_load_model_task)
+    result = asyncio.run(transcribe_routes.process_audio_task(
+        make_args(), audio, None, None, task="transcribe", engine="whisper",
+    ))
+
+    assert seen["samples"] == 2 * SR
+    assert result['segments'][0]['start'] == 8.2
+    assert result['segments'][0]['end'] == 9.8
+
+
+def test_process_audio_task_skips_model_without_speech(monkeypatch):
+    monkeypatch.setattr(vad_prefilter, "detect_speech", lambda a, m, sr: [])
+
+    async def fail(args, params):
+        raise AssertionError("model should not run")
+
+    monkeypatch.setattr(whisper, "load_model_task", fail)
+    result = asyncio.run(transcribe_routes.process_audio_task(
+        make_args(), np.zeros(SR, dtype=np.float32), None, None, task="transcribe", engine="whisper",
+    ))
+    assert result == {'text': '', 'segments': []}
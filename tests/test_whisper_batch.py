@@ -0,0 +1,130 @@
+"""
+Whisper 跨请求微批调度单元测试（run_batch 用替身，不加载真实模型）。
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.models import whisper_batch
+from bookroom_audio.models.whisper_batch import WhisperBatchScheduler, shift_segment
+
+
+KEY = ("tiny", "cpu", "int8")
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.acquired = 0
+
+    @asynccontextmanager
+    async def acquire(self, key, max_replicas=1, keep_alive=-1):
+        self.acquired += 1
+        yield f"model:{key[0]}"
+
+
+def make_args():
+    return SimpleNamespace(model=SimpleNamespace(whisper_replicas=1, model_keep_alive="-1"))
+
+
+def test_requests_in_window_share_one_batch(monkeypatch):
+    calls = []
+
+    def fake_run_batch(model, audios, task, language, chunk_batch_size):
+        calls.append((model, list(audios), task, language))
+        return [[f"{a}-seg"] for a in audios]
+
+    monkeypatch.setattr(whisper_batch, "run_batch", fake_run_batch)
+    monkeypatch.setattr(whisper_batch, "parse_keep_alive", lambda v: -1)
+    pool = FakePool()
+
+    async def main():
+        scheduler = WhisperBatchScheduler(make_args(), pool, 8, 20, 4)
+        return await asyncio.gather(
+            scheduler.submit(KEY, "a", "transcribe", "zh"),
+            scheduler.submit(KEY, "b", "transcribe", "zh"),
+            scheduler.submit(KEY, "c", "transcribe", "en"),
+        )
+
+    results = asyncio.run(main())
+    assert results == [["a-seg"], ["b-seg"], ["c-seg"]]
+    assert sorted(len(c[1]) for c in calls) == [1, 2]
+    assert pool.acquired == 2
+
+
+def test_full_batch_dispatches_without_waiting(monkeypatch):
+    monkeypatch.setattr(
+        whisper_batch, "run_batch", lambda m, audios, t, l, c: [[a] for a in audios]
+    )
+    monkeypatch.setattr(whisper_batch, "parse_keep_alive", lambda v: -1)
+
+    async def main():
+        scheduler = WhisperBatchScheduler(make_args(), FakePool(), 2, 10_000, 4)
+        return await asyncio.wait_for(
+            asyncio.gather(
+                scheduler.submit(KEY, "a", "transcribe", None),
+                scheduler.submit(KEY, "b", "transcribe", None),
+            ),
+            timeout=1.0,
+        )
+
+    assert asyncio.run(main()) == [["a"], ["b"]]
+
+
+def test_batch_failure_propagates_to_every_request(monkeypatch):
+    def boom(*_):
+        raise RuntimeError("decode failed")
+
+    monkeypatch.setattr(whisper_batch, "run_batch", boom)
+    monkeypatch.setattr(whisper_batch, "parse_keep_alive", lambda v: -1)
+
+    async def main():
+        scheduler = WhisperBatchScheduler(make_args(), FakePool(), 4, 10, 4)
+        return await asyncio.gather(
+            scheduler.submit(KEY, "a", "transcribe", "zh"),
+            scheduler.submit(KEY, "b", "transcribe", "zh"),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+
+def test_cancelled_batch_fails_waiting_requests(monkeypatch):
+    class BlockingPool:
+        @asynccontextmanager
+        async def acquire(self, key, max_replicas=1, keep_alive=-1):
+            await asyncio.Event().wait()
+            yield None
+
+    monkeypatch.setattr(whisper_batch, "parse_keep_alive", lambda v: -1)
+
+    async def main():
+        scheduler = WhisperBatchScheduler(make_args(), BlockingPool(), 2, 10_000, 4)
+        requests = asyncio.gather(
+            scheduler.submit(KEY, "a", "transcribe", None),
+            scheduler.submit(KEY, "b", "transcribe", None),
+            return_exceptions=True,
+        )
+        await asyncio.sleep(0.01)
+        # 批次任务由调度器持有；关停时取消它，等待中的请求应立即结束
+        (batch_task,) = scheduler._tasks
+        batch_task.cancel()
+        results = await asyncio.wait_for(requests, timeout=1.0)
+        await asyncio.sleep(0)
+        return results, scheduler._tasks
+
+    results, tasks = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not tasks
+
+
+def test_shift_segment_moves_to_request_timeline():
+    seg = Segment(
+        id=1, seek=0, start=12.5, end=14.0, text="hi", tokens=[], avg_logprob=0.0,
+        compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+    shifted = shift_segment(seg, offset=10.0, limit=3.0)
+    assert (shifted.start, shifted.end) == (2.5, 3.0)
+    assert shifted.text == "hi"
@@ -0,0 +1,89 @@
+"""
+Whisper 转写 + 翻译共享编码单元测试（批量管线与模型均用替身）。
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.models import whisper_dual
+from bookroom_audio.models.whisper_dual import SharedEncoderModel, _interleave, run_both_tasks
+
+
+def make_segment(start: float, text: str) -> Segment:
+    return Segment(
+        id=0, seek=0, start=start, end=start + 1, text=text, tokens=[], avg_logprob=0.0,
+        compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+
+
+class FakeWhisper:
+    feature_extractor = SimpleNamespace(sampling_rate=16000)
+
+    def __init__(self) -> None:
+        self.encoded = 0
+
+    def encode(self, features):
+        self.encoded += 1
+        return f"enc{self.encoded}"
+
+
+def test_shared_encoder_reuses_output_once_per_task():
+    model = FakeWhisper()
+    shared = SharedEncoderModel(model, uses=2)
+    a = np.ones((2, 4), dtype=np.float32)
+    b = np.zeros((2, 4), dtype=np.float32)
+
+    assert shared.encode(a) == "enc1"
+    assert shared.encode(b) == "enc2"
+    assert shared.encode(a) == "enc1"  # 第二个任务命中
+    assert shared.encode(a) == "enc3"  # 已被两个任务取用，重新计算
+    assert (model.encoded, shared.encoder_hits) == (3, 1)
+    assert shared.feature_extractor.sampling_rate == 16000
+
+
+def test_interleave_advances_the_lagging_iterator():
+    order = []
+
+    def gen(tag, starts):
+        for start in starts:
+            order.append((tag, start))
+            yield make_segment(start, tag)
+
+    first, second = _interleave(gen("t", [0, 30, 60]), gen("x", [0, 30]))
+    assert [s.start for s in first] == [0, 30, 60]
+    assert [s.start for s in second] == [0, 30]
+    assert order[:4] == [("t", 0), ("x", 0), ("t", 30), ("x", 30)]
+
+
+class FakePipeline:
+    """按 clip 分批调用 model.encode，每批产出一个 segment"""
+
+    def __init__(self, model) -> None:
+        self.model = model
+
+    def transcribe(self, audio, task, language, clip_timestamps, batch_size):
+        def segments():
+            for i in range(0, len(clip_timestamps), batch_size):
+                batch = clip_timestamps[i:i + batch_size]
+                features = np.array([[c["start"], c["end"]] for c in batch], dtype=np.float32)
+                encoded = self.model.encode(features)
+                yield make_segment(batch[0]["start"], f"{task}:{encoded}")
+
+        return segments(), SimpleNamespace(language=language or "zh")
+
+
+def test_both_tasks_share_every_encoder_batch(monkeypatch):
+    clips = [(i * 16000 * 10, (i + 1) * 16000 * 10) for i in range(6)]
+    monkeypatch.setattr(whisper_dual, "speech_clips", lambda audio, sr: clips)
+    monkeypatch.setattr(whisper_dual, "BatchedInferencePipeline", FakePipeline)
+    model = FakeWhisper()
+
+    transcribed, translated, language = run_both_tasks(
+        model, np.zeros(16000 * 60, dtype=np.float32), None, chunk_batch_size=2
+    )
+    assert model.encoded == 3
+    assert language == "zh"
+    assert [s.text for s in transcribed] == ["transcribe:enc1", "transcribe:enc2", "transcribe:enc3"]
+    assert [s.text for s in translated] == ["translate:enc1", "translate:enc2", "translate:enc3"]
@@ -0,0 +1,167 @@
+"""
+Whisper 模型池单元测试（不加载真实模型，loader 用计数替身）。
+
+覆盖：
+1. 并发首请求单飞加载（只构建一次）
+2. 每个 key 最多 N 个副本，并发请求各占一个副本
+3. 不同 (model, device, compute_type) 互不复用
+4. 空闲超过 keep_alive 后按 key 卸载
+5. 首次加载失败时并发请求共享同一异常，后续请求可重试
+6. 已有副本时扩容失败不报错：退避期间不再扩容，请求排队等待已有副本
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bookroom_audio.models.whisper import WhisperModelPool
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.05, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("load failed")
+        return f"{key[0]}#{n}"
+
+
+KEY = ("tiny", "cpu", "int8")
+
+
+def test_concurrent_first_requests_load_once():
+    loader = CountingLoader()
+    pool = WhisperModelPool(loader)
+
+    async def use():
+        async with pool.acquire(KEY, max_replicas=1) as model:
+            await asyncio.sleep(0.01)
+            return model
+
+    async def main():
+        return await asyncio.gather(*(use() for _ in range(5)))
+
+    models = asyncio.run(main())
+    assert loader.calls == 1
+    assert set(models) == {"tiny#1"}
+
+
+def test_replicas_serve_concurrent_requests():
+    loader = CountingLoader(delay=0.01)
+    pool = WhisperModelPool(loader)
+    seen = []
+
+    async def use():
+        async with pool.acquire(KEY, max_replicas=3) as model:
+            seen.append(model)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        await asyncio.gather(*(use() for _ in range(6)))
+        return pool.status()
+
+    status = asyncio.run(main())
+    assert loader.calls == 3
+    assert len(set(seen)) == 3
+    assert status[0]["replicas"] == 3 and status[0]["in_use"] == 0
+
+
+def test_keys_are_isolated():
+    loader = CountingLoader(delay=0)
+    pool = WhisperModelPool(loader)
+
+    async def main():
+        async with pool.acquire(("tiny", "cpu", "int8")) as a:
+            pass
+        async with pool.acquire(("small", "cpu", "int8")) as b:
+            pass
+        async with pool.acquire(("tiny", "cpu", "float32")) as c:
+            pass
+        return a, b, c
+
+    a, b, c = asyncio.run(main())
+    assert loader.calls == 3
+    assert a.startswith("tiny") and b.startswith("small") and c.startswith("tiny")
+    assert a != c
+
+
+def test_idle_key_is_evicted_after_keep_alive():
+    loader = CountingLoader(delay=0)
+    pool = WhisperModelPool(loader)
+
+    async def main():
+        async with pool.acquire(KEY, keep_alive=0.05):
+            pass
+        assert KEY in pool
+        await asyncio.sleep(0.1)
+        assert KEY not in pool
+        async with pool.acquire(KEY, keep_alive=-1):
+            pass
+        await asyncio.sleep(0.1)
+        assert KEY in pool
+
+    asyncio.run(main())
+    assert loader.calls == 2
+
+
+def test_failed_first_load_is_shared_then_retried():
+    loader = CountingLoader(fail=True)
+    pool = WhisperModelPool(loader)
+
+    async def use():
+        async with pool.acquire(KEY):
+            pass
+
+    async def main():
+        results = await asyncio.gather(*(use() for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert KEY not in pool
+        with pytest.raises(RuntimeError):
+            await use()
+
+    asyncio.run(main())
+    assert loader.calls == 2
+
+
+def test_failed_scale_up_keeps_requests_queued_for_existing_replica():
+    loader = CountingLoader(delay=0.05)
+    pool = WhisperModelPool(loader)
+    used = []
+
+    async def use():
+        async with pool.acquire(KEY, max_replicas=2) as model:
+            used.append(model)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.acquire(KEY, max_replicas=2):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.1)  # 首个副本已加载并被占用
+        loader.fail = True
+        # 一个请求扩容副本（失败），另一个在容量已满时等待：两者都继续排队，不报错
+        users = asyncio.gather(use(), use())
+        await asyncio.sleep(0.2)
+        assert not users.done()
+        release.set()
+        await asyncio.wait_for(users, timeout=1)
+        await holder
+
+    asyncio.run(main())
+    assert used == ["tiny#1", "tiny#1"]
+    # 退避期间只尝试过一次扩容
+    assert loader.calls == 2
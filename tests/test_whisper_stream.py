@@ -0,0 +1,117 @@
+"""
+Whisper 逐段流式输出单元测试（模型用替身，不加载真实模型）。
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.api.routers.transcribe_routes import iter_segment_events
+from bookroom_audio.models import whisper
+from bookroom_audio.models.whisper import SegmentStream, WhisperModelPool
+
+
+def make_segment(i: int) -> Segment:
+    return Segment(
+        id=i, seek=0, start=float(i), end=float(i + 1), text=f" s{i}", tokens=[],
+        avg_logprob=0.0, compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+
+
+class FakeModel:
+    def __init__(self, n: int = 5, delay: float = 0.02, fail_at: int = -1) -> None:
+        self.n = n
+        self.delay = delay
+        self.fail_at = fail_at
+        self.produced = 0
+        self.finished = threading.Event()
+
+    def transcribe(self, audio, task, language):
+        def gen():
+            try:
+                for i in range(self.n):
+                    if i == self.fail_at:
+                        raise RuntimeError("decode failed")
+                    time.sleep(self.delay)
+                    self.produced += 1
+                    yield make_segment(i)
+            finally:
+                self.finished.set()
+        return gen(), SimpleNamespace(language="en", duration=float(self.n))
+
+
+@pytest.fixture
+def args(monkeypatch):
+    monkeypatch.setattr(whisper, "print_transcribing_audio", lambda params: None)
+    monkeypatch.setattr(whisper, "print_model_loading", lambda args, params: None)
+    return SimpleNamespace(model=SimpleNamespace(
+        device="cpu", compute_type="int8", whisper_replicas=1, model_keep_alive="-1",
+    ))
+
+
+def use_model(monkeypatch, model: FakeModel) -> WhisperModelPool:
+    pool = WhisperModelPool(lambda key: model)
+    monkeypatch.setattr(whisper, "model_pool", pool)
+    return pool
+
+
+PARAMS = dict(audio=None, model_size_or_path="tiny", language=None, task="transcribe")
+
+
+def test_segments_then_summary(monkeypatch, args):
+    use_model(monkeypatch, FakeModel(n=3))
+
+    async def main():
+        return [e async for e in iter_segment_events(SegmentStream(args, PARAMS))]
+
+    events = asyncio.run(main())
+    assert [e["type"] for e in events] == ["segment"] * 3 + ["done"]
+    assert events[0]["text"] == " s0" and events[0]["start"] == 0.0
+    assert events[-1] == {
+        "type": "done", "text": " s0 s1 s2", "language": "en", "duration": 3.0, "segments": 3,
+    }
+
+
+def test_first_segment_arrives_before_decoding_finishes(monkeypatch, args):
+    model = FakeModel(n=5, delay=0.1)
+    use_model(monkeypatch, model)
+
+    async def main():
+        stream = SegmentStream(args, PARAMS)
+        async for _ in stream:
+            return model.produced
+
+    assert asyncio.run(main()) < 5
+
+
+def test_early_close_stops_worker_and_releases_replica(monkeypatch, args):
+    model = FakeModel(n=100, delay=0.01)
+    pool = use_model(monkeypatch, model)
+
+    async def main():
+        stream = SegmentStream(args, PARAMS)
+        async for _ in stream:
+            break
+        await stream.aclose()
+        await asyncio.to_thread(model.finished.wait, 2)
+        await asyncio.sleep(0.05)
+        return pool.status()
+
+    status = asyncio.run(main())
+    assert model.produced < 100
+    assert status[0]["in_use"] == 0
+
+
+def test_midway_failure_becomes_error_event(monkeypatch, args):
+    use_model(monkeypatch, FakeModel(n=3, fail_at=2))
+
+    async def main():
+        return [e async for e in iter_segment_events(SegmentStream(args, PARAMS))]
+
+    events = asyncio.run(main())
+    assert [e["type"] for e in events] == ["segment", "segment", "error"]
+    assert "decode failed" in events[-1]["message"]
@@ -0,0 +1,101 @@
+"""
+Whisper 长音频分窗并发识别单元测试（VAD 与模型均用替身）。
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from faster_whisper.transcribe import Segment
+
+from bookroom_audio.models import whisper, whisper_windows
+from bookroom_audio.models.whisper import WhisperModelPool
+from bookroom_audio.models.whisper_windows import (
+    merge_window_segments,
+    split_at_silences,
+    transcribe_long_audio,
+)
+
+SR = 16000
+
+
+def make_segment(start: float, end: float, text: str) -> Segment:
+    return Segment(
+        id=0, seek=0, start=start, end=end, text=text, tokens=[], avg_logprob=0.0,
+        compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+
+
+def test_split_cuts_in_the_middle_of_silences(monkeypatch):
+    regions = [(1, 9), (11, 19), (21, 29), (31, 39)]
+    monkeypatch.setattr(
+        whisper_windows,
+        "get_speech_timestamps",
+        lambda audio, opts, sampling_rate: [{"start": a * SR, "end": b * SR} for a, b in regions],
+    )
+    audio = np.zeros(40 * SR, dtype=np.float32)
+    windows = split_at_silences(audio, window_s=20)
+    assert [start / SR for start, _ in windows] == [0, 20]
+    assert sum(len(w) for _, w in windows) == len(audio)
+
+
+def test_split_without_speech_returns_nothing(monkeypatch):
+    monkeypatch.setattr(whisper_windows, "get_speech_timestamps", lambda *a, **k: [])
+    assert split_at_silences(np.zeros(SR, dtype=np.float32), window_s=30) == []
+
+
+def test_merge_drops_duplicate_text_at_window_edges():
+    merged = merge_window_segments([
+        [make_segment(0, 5, "Hello there."), make_segment(5, 9.8, "How are you?")],
+        [make_segment(10.1, 11, "how are you"), make_segment(11, 15, "Fine.")],
+        [make_segment(14, 14.5, "fine"), make_segment(20, 22, "Bye.")],
+    ])
+    assert [s.text for s in merged] == ["Hello there.", "How are you?", "Fine.", "Bye."]
+
+
+class SlowModel:
+    """记录并发峰值；每个窗口返回一段窗口内时间的 segment"""
+
+    def __init__(self, state: dict) -> None:
+        self.state = state
+
+    def transcribe(self, audio, task, language):
+        with self.state["lock"]:
+            self.state["active"] += 1
+            self.state["peak"] = max(self.state["peak"], self.state["active"])
+            self.state["languages"].append(language)
+            n = len(self.state["languages"])
+        time.sleep(0.05)
+        with self.state["lock"]:
+            self.state["active"] -= 1
+        duration = len(audio) / SR
+        segment = make_segment(0.5, duration - 0.5, f"w{n}")
+        return iter([segment]), SimpleNamespace(language="de")
+
+
+def test_long_audio_runs_windows_on_replicas_concurrently(monkeypatch):
+    state = {"lock": threading.Lock(), "active": 0, "peak": 0, "languages": []}
+    monkeypatch.setattr(whisper, "model_pool", WhisperModelPool(lambda key: SlowModel(state)))
+    monkeypatch.setattr(whisper_windows, "print_transcribing_audio", lambda params: None)
+    monkeypatch.setattr(whisper_windows, "print_model_loading", lambda args, params: None)
+    # 5 个 10s 窗口
+    monkeypatch.setattr(
+        whisper_windows,
+        "split_at_silences",
+        lambda audio, window_s, sr: [(i * 10 * SR, audio[i * 10 * SR:(i + 1) * 10 * SR]) for i in range(5)],
+    )
+    args = SimpleNamespace(model=SimpleNamespace(
+        device="cpu", compute_type="int8", whisper_replicas=3, model_keep_alive="-1", whisper_window_s=10,
+    ))
+    params = dict(
+        audio=np.zeros(50 * SR, dtype=np.float32),
+        model_size_or_path="tiny", language=None, task="transcribe",
+    )
+
+    segments = asyncio.run(transcribe_long_audio(args, params))
+    assert [(s.start, s.end) for s in segments] == [(i * 10 + 0.5, i * 10 + 9.5) for i in range(5)]
+    assert state["peak"] == 3
+    # 首个窗口检测语言，其余窗口沿用
+    assert state["languages"] == [None] + ["de"] * 4